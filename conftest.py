@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(scope='session', autouse=True)
+def temporary_caches():
+    """Кэш pytest-прогона во временном каталоге, как у manage.py test."""
+    from core.runner import temporary_caches
+    with temporary_caches():
+        yield
@@ -0,0 +1,19 @@
+from django.contrib import admin
+
+from .models import Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'name',
+        'status',
+        'attempts',
+        'run_at',
+        'created_at'
+    )
+    list_filter = ('status', 'name')
+    readonly_fields = ('locked_at', 'created_at')
+
+
+admin.site.register(Task, TaskAdmin)
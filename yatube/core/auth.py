@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.utils.functional import SimpleLazyObject
+
+from .cache import get_or_compute, invalidate, model_tag
+
+
+def session_tag(user_id):
+    """Тег пользователя, закэшированного в его сессиях."""
+    return f'session:{model_tag(auth.get_user_model(), user_id)}'
+
+
+def forget_user(user_id):
+    invalidate(session_tag(user_id))
+
+
+def get_user(request):
+    """
+    Пользователь запроса. Без id пользователя в сессии - гость: сессия
+    без cookie при этом не загружается. Иначе - результат auth.get_user
+    (с проверкой хэша пароля), закэшированный по ключу сессии на
+    AUTH_USER_CACHE_TIMEOUT; сбрасывается сохранением пользователя.
+    Версия тега сессии читается из общего хранилища, минуя копию в
+    памяти: сброс в одном процессе сразу действует во всех.
+    """
+    session = request.session
+    if SESSION_KEY not in session:
+        return AnonymousUser()
+    return get_or_compute(
+        f'auth:session:{session.session_key}',
+        lambda: auth.get_user(request),
+        settings.AUTH_USER_CACHE_TIMEOUT,
+        tags=[session_tag(session[SESSION_KEY])],
+    )
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware, берущий пользователя из кэша сессии."""
+
+    def process_request(self, request):
+        request.user = SimpleLazyObject(lambda: get_user(request))
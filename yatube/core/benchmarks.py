@@ -0,0 +1,415 @@
+import random
+import statistics
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from importlib import import_module
+from types import ModuleType
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.handlers.base import BaseHandler
+from django.db import OperationalError, connection
+from django.http import HttpResponse
+from django.template.backends.django import DjangoTemplates
+from django.test import Client, RequestFactory, override_settings
+from django.urls import path, reverse, set_urlconf
+from faker import Faker
+
+from core import paths
+from core.metrics import QueryTimer
+from posts.counters import rebuild_counters
+from posts.feeds import feed
+from posts.paginators import CountedPaginator
+from posts.settings import POSTS_ON_PAGE
+from posts.models import Group, Post, PostCounter, User
+
+# Наборы данных: число постов, авторов и групп
+DATASETS = {
+    '10k': (10_000, 500, 50),
+    '100k': (100_000, 2_000, 200),
+    '1m': (1_000_000, 10_000, 1_000),
+}
+URLCONFS = ('posts.urls', 'users.urls', 'about.urls')
+# Бюджеты маршрутов: запросов к БД и p99 задержки, мс. Страницы,
+# открываемые от имени автора, тратят до 2 запросов на сессию и
+# пользователя (при промахе кэша)
+DEFAULT_BUDGET = {'queries': 5, 'p99_ms': 250}
+BUDGETS = {
+    'posts:index': {'queries': 2},
+    'posts:group_list': {'queries': 3},
+    'posts:profile': {'queries': 3},
+    'posts:post_detail': {'queries': 2},
+    'posts:search': {'queries': 2},
+    'posts:post_create': {'queries': 3},
+    'posts:post_edit': {'queries': 5},
+    # Выгрузка читает всю таблицу: время зависит от её размера
+    'posts:export': {'queries': 3, 'p99_ms': None},
+}
+# Маршруты, которые нельзя открыть без внешних данных
+SKIPPED = {
+    'users:password_reset_confirm': 'нужны uidb64 и token из письма',
+}
+# Доля постов без группы
+NO_GROUP_SHARE = 0.3
+SEED_BATCH = 5_000
+
+
+def percentile(values, percent):
+    """Перцентиль выборки; для одного значения - само значение."""
+    if len(values) < 2:
+        return values[0] if values else 0
+    return statistics.quantiles(values, n=100)[percent - 1]
+
+
+def seed(posts, authors, groups, random_seed=0):
+    """
+    Заполняет БД случайными, но воспроизводимыми авторами, группами и
+    постами: bulk_create пачками, затем пересчёт счётчиков.
+    """
+    fake = Faker('ru_RU')
+    fake.seed_instance(random_seed)
+    rand = random.Random(random_seed)
+    password = make_password(None)
+    User.objects.bulk_create(
+        User(
+            username=f'{fake.user_name()}{number}',
+            first_name=fake.first_name(),
+            last_name=fake.last_name(),
+            password=password,
+        )
+        for number in range(authors)
+    )
+    Group.objects.bulk_create(
+        Group(
+            title=fake.sentence(nb_words=3)[:200],
+            slug=f'group-{number}',
+            description=fake.paragraph(),
+        )
+        for number in range(groups)
+    )
+    author_ids = list(User.objects.values_list('pk', flat=True))
+    group_ids = list(Group.objects.values_list('pk', flat=True))
+    for start in range(0, posts, SEED_BATCH):
+        Post.objects.bulk_create(
+            Post(
+                text=fake.paragraph(nb_sentences=rand.randint(1, 8)),
+                # Авторы и группы неравномерно популярны, как в жизни
+                author_id=author_ids[
+                    int(rand.paretovariate(1.2)) % len(author_ids)
+                ],
+                group_id=None if rand.random() < NO_GROUP_SHARE else (
+                    group_ids[int(rand.paretovariate(1.2)) % len(group_ids)]
+                ),
+            )
+            for _ in range(min(SEED_BATCH, posts - start))
+        )
+    rebuild_counters()
+
+
+def sample():
+    """
+    Объекты для маршрутов с параметрами: самые большие группа и автор,
+    последний пост автора и слово из него для поиска.
+    """
+    author = User.objects.get(pk=PostCounter.objects.filter(
+        author__isnull=False
+    ).order_by('-value').values_list('author', flat=True).first())
+    group = Group.objects.get(pk=PostCounter.objects.filter(
+        group__isnull=False
+    ).order_by('-value').values_list('group', flat=True).first())
+    post = author.posts.first()
+    return {
+        'kwargs': {
+            'slug': group.slug,
+            'username': author.username,
+            'post_id': post.pk,
+        },
+        'query': {'posts:search': {'q': post.text.split()[0]}},
+        'author': author,
+    }
+
+
+def routes():
+    """Имена маршрутов posts, users и about и имена их параметров."""
+    for module in URLCONFS:
+        urlconf = import_module(module)
+        for pattern in urlconf.urlpatterns:
+            yield (
+                f'{urlconf.app_name}:{pattern.name}',
+                list(pattern.pattern.converters),
+            )
+
+
+def request(client, url, data):
+    """Один запрос: статус, время в секундах и число запросов к БД."""
+    timer = QueryTimer()
+    start = time.perf_counter()
+    with connection.execute_wrapper(timer):
+        response = client.get(url, data)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+    return response, time.perf_counter() - start, timer.count
+
+
+def measure(client, url, data, repeat):
+    """Задержки, максимум запросов к БД и пик памяти для страницы."""
+    response, *_ = request(client, url, data)
+    latencies, queries = [], 0
+    for _ in range(repeat):
+        response, latency, count = request(client, url, data)
+        latencies.append(latency)
+        queries = max(queries, count)
+    tracemalloc.start()
+    try:
+        request(client, url, data)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'status': response.status_code,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'queries': queries,
+        'peak_memory_kb': peak / 1024,
+    }
+
+
+def violations(name, result, budgets):
+    budget = {**DEFAULT_BUDGET, **budgets.get(name, {})}
+    found = []
+    if result['status'] >= 500:
+        found.append(f'статус {result["status"]}')
+    for key in ('queries', 'p99_ms'):
+        if budget[key] is not None and result[key] > budget[key]:
+            found.append(f'{key} {result[key]:g} > {budget[key]}')
+    return found
+
+
+def benchmark(repeat=20, budgets=BUDGETS):
+    """
+    Замеряет все маршруты posts, users и about. Страницы, отправляющие
+    гостя на вход, замеряются от имени автора (он же персонал).
+    """
+    objects = sample()
+    author = objects['author']
+    User.objects.filter(pk=author.pk).update(is_staff=True)
+    results = []
+    for name, params in routes():
+        missing = set(params) - set(objects['kwargs'])
+        if name in SKIPPED or missing:
+            results.append({'route': name, 'skipped': SKIPPED.get(
+                name, f'нет значений для {", ".join(sorted(missing))}'
+            )})
+            continue
+        url = reverse(name, kwargs={
+            param: objects['kwargs'][param] for param in params
+        })
+        data = objects['query'].get(name, {})
+        client, user = Client(), 'guest'
+        try:
+            if '/login/' in client.get(url, data).get('Location', ''):
+                client.force_login(author)
+                user = 'author'
+            result = measure(client, url, data, repeat)
+        except Exception as error:
+            result = {'status': 500, 'error': repr(error)}
+        result = {'route': name, 'url': url, 'user': user, **result}
+        result['violations'] = (
+            violations(name, result, budgets) if 'error' not in result
+            else [result['error']]
+        )
+        results.append(result)
+    return results
+
+
+def _write_posts(author, count, barrier, results):
+    client = Client()
+    client.force_login(author)
+    url = reverse('posts:post_create')
+    latencies, errors = [], Counter()
+    barrier.wait()
+    try:
+        for number in range(count):
+            start = time.perf_counter()
+            try:
+                response = client.post(url, {'text': f'Пост {number}'})
+            except OperationalError as error:
+                errors[str(error)] += 1
+                continue
+            if response.status_code != 302:
+                errors[f'статус {response.status_code}'] += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+    finally:
+        # Соединение с БД принадлежит потоку
+        connection.close()
+    results.append((latencies, errors))
+
+
+def concurrent_writes(threads, posts):
+    """
+    Авторы в threads потоках одновременно публикуют по posts постов
+    через post_create: постов в секунду, задержки и ошибки по видам.
+    """
+    password = make_password(None)
+    User.objects.bulk_create(
+        User(username=f'writer{number}', password=password)
+        for number in range(threads)
+    )
+    barrier = threading.Barrier(threads + 1)
+    results = []
+    workers = [
+        threading.Thread(target=_write_posts, args=(
+            author, posts, barrier, results
+        ))
+        for author in User.objects.filter(username__startswith='writer')
+    ]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    latencies = sorted(
+        latency for thread_latencies, _ in results
+        for latency in thread_latencies
+    )
+    errors = sum((thread_errors for _, thread_errors in results), Counter())
+    return {
+        'threads': threads,
+        'written': len(latencies),
+        'stored': Post.objects.count(),
+        'posts_per_second': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'errors': dict(errors),
+    }
+
+
+FILE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+TEMPLATE_CONFIGS = {
+    'без кэша шаблонов': FILE_LOADERS,
+    'кэш шаблонов': [('django.template.loaders.cached.Loader', FILE_LOADERS)],
+}
+
+
+def _timings(function, repeat, setup=None):
+    latencies = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - start)
+    return {
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'mean_ms': statistics.mean(latencies) * 1000,
+    }
+
+
+def render_benchmark(repeat=50):
+    """
+    Время отрисовки первой страницы главной ленты гостю: без кэша
+    шаблонов (как в отладке) и с кэширующим загрузчиком. Кэш карточек
+    сбрасывается перед каждой отрисовкой: меряются сами шаблоны. Плюс
+    время построения пути профиля через reverse() и core.paths.
+    Запускается внутри core.runner.temporary_caches: иначе сброс кэша
+    стирает общий уровень работающего сайта.
+    """
+    options = settings.TEMPLATES[0]
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    page = CountedPaginator(feed(), POSTS_ON_PAGE).page(1)
+    results = {}
+    for label, loaders in TEMPLATE_CONFIGS.items():
+        backend = DjangoTemplates({
+            'NAME': label,
+            'DIRS': options['DIRS'],
+            'APP_DIRS': False,
+            'OPTIONS': {**options['OPTIONS'], 'loaders': loaders},
+        })
+        results[label] = _timings(
+            lambda: backend.get_template('posts/index.html').render(
+                {'page_obj': page}, request
+            ),
+            repeat, setup=cache.clear
+        )
+    usernames = [post.author.username for post in page]
+    results['reverse() профилей страницы'] = _timings(
+        lambda: [
+            reverse('posts:profile', args=[username])
+            for username in usernames
+        ],
+        repeat
+    )
+    results['core.paths профилей страницы'] = _timings(
+        lambda: [
+            paths.build('posts:profile', username) for username in usernames
+        ],
+        repeat
+    )
+    return results
+
+
+def _user_view(request):
+    # Как шаблоны и кэш страниц: определяет, вошел ли пользователь.
+    # В стеке без AuthenticationMiddleware request.user нет
+    user = getattr(request, 'user', AnonymousUser())
+    return HttpResponse(str(user.is_authenticated))
+
+
+# Маршруты замеров middleware: страница без БД и шаблонов
+MIDDLEWARE_URLS = ModuleType('middleware_benchmark_urls')
+MIDDLEWARE_URLS.urlpatterns = [path('', _user_view)]
+
+
+def middleware_benchmark(repeat=500):
+    """
+    Накладные расходы MIDDLEWARE: время запроса через обработчик со
+    стеком из первых i middleware к view, которое только проверяет
+    request.user, для гостя без cookie и для вошедшего пользователя.
+    Разница соседних строк - цена очередного middleware. Возвращает
+    {middleware: {'guest': ..., 'user': ...}}.
+    """
+    client = Client()
+    client.force_login(
+        User.objects.get_or_create(username='middleware-benchmark')[0]
+    )
+    factories = {'guest': RequestFactory(), 'user': RequestFactory()}
+    factories['user'].cookies = client.cookies
+
+    def run(handler, factory):
+        request = factory.get('/')
+        request.urlconf = MIDDLEWARE_URLS
+        return handler.get_response(request)
+
+    results = {}
+    try:
+        for count in range(len(settings.MIDDLEWARE) + 1):
+            with override_settings(MIDDLEWARE=settings.MIDDLEWARE[:count]):
+                handler = BaseHandler()
+                handler.load_middleware()
+            label = (
+                settings.MIDDLEWARE[count - 1] if count
+                else '(без middleware)'
+            )
+            results[label] = {
+                who: _timings(lambda: run(handler, factory), repeat)
+                for who, factory in factories.items()
+            }
+    finally:
+        # Как по сигналу request_finished: urlconf запроса - для потока
+        set_urlconf(None)
+    return results
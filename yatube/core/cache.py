@@ -0,0 +1,404 @@
+"""
+Двухуровневый кэш: LRU в памяти процесса перед общим хранилищем - любым
+бэкендом из CACHES (файлы, таблица SQLite). Подключается как бэкенд
+кэша по умолчанию, поэтому cache.get/set, {% cache %} в шаблонах и
+функции этого модуля работают с обоими уровнями.
+
+Копия в памяти живет не дольше LOCAL_TIMEOUT секунд: на столько процесс
+может отстать от правок, сделанных другими процессами. Версии тегов и
+ключи с префиксами из SHARED_ONLY в память не копируются: их сброс сразу
+виден всем процессам.
+"""
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+MISSING = object()
+
+EVENTS = ('local_hit', 'shared_hit', 'miss', 'stale', 'compute', 'wait')
+
+# Значение get_or_compute в хранилище: версии его тегов на момент
+# вычисления и время, до которого оно свежее и до которого его можно
+# отдавать устаревшим (None - бессрочно)
+Entry = namedtuple('Entry', 'value tags fresh_until stale_until')
+
+_locals = {}
+_stats = {}
+_lock = threading.Lock()
+
+
+class LocalCache:
+    """
+    LRU в памяти процесса. Значения хранятся сериализованными, как в
+    LocMemCache: изменение полученного объекта не меняет кэш.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.data.get(key)
+            if item is None:
+                return MISSING
+            expires, pickled = item
+            if expires <= time.monotonic():
+                del self.data[key]
+                return MISSING
+            self.data.move_to_end(key)
+        return pickle.loads(pickled)
+
+    def set(self, key, value, timeout):
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.data[key] = (time.monotonic() + timeout, pickled)
+            self.data.move_to_end(key)
+            while len(self.data) > self.max_entries:
+                self.data.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+class TieredCache(BaseCache):
+    """
+    Бэкенд кэша из двух уровней. OPTIONS: SHARED - алиас общего
+    хранилища в CACHES, LOCAL_MAX_ENTRIES - размер LRU в памяти,
+    LOCAL_TIMEOUT - время жизни копии в памяти, секунды, LOCK_TIMEOUT -
+    сколько get_or_compute ждет значение, вычисляемое другим процессом,
+    SHARED_ONLY - префиксы ключей, которые читаются только из хранилища.
+    LRU и статистика общие для потоков процесса, как у LocMemCache.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = options.get('SHARED', 'shared')
+        self.local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        self.lock_timeout = options.get('LOCK_TIMEOUT', 10)
+        self.shared_only = tuple(options.get('SHARED_ONLY', ()))
+        with _lock:
+            self.local = _locals.setdefault(
+                location, LocalCache(options.get('LOCAL_MAX_ENTRIES', 1000))
+            )
+            self.counts = _stats.setdefault(location, Counter())
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def _count(self, event):
+        with _lock:
+            self.counts[event] += 1
+
+    def _seconds(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def _is_local(self, key):
+        return not self.shared_only or not key.startswith(self.shared_only)
+
+    def _remember(self, key, value, seconds=None, version=None):
+        """Кладет копию в память не дольше LOCAL_TIMEOUT и seconds."""
+        if not self._is_local(key):
+            return
+        key = self.make_key(key, version)
+        if seconds is not None and seconds <= 0:
+            self.local.delete(key)
+            return
+        if seconds is None or seconds > self.local_timeout:
+            seconds = self.local_timeout
+        self.local.set(key, value, seconds)
+
+    def _lookup(self, key, version=None):
+        """Значение из памяти либо из хранилища (с копией в память)."""
+        value = MISSING
+        if self._is_local(key):
+            value = self.local.get(self.make_key(key, version))
+        if value is not MISSING:
+            self._count('local_hit')
+            return value
+        value = self.shared.get(key, MISSING, version=version)
+        if value is MISSING:
+            self._count('miss')
+            return MISSING
+        self._count('shared_hit')
+        self._remember(key, value, version=version)
+        return value
+
+    def _tag_versions(self, tags):
+        """
+        Текущие версии тегов - время их последней инвалидации в мс, всегда
+        из хранилища. Вытесненная версия заводится заново текущим
+        временем, поэтому значения, вычисленные до вытеснения, не
+        используются.
+        """
+        if not tags:
+            return {}
+        keys = {tag: f'tag:{tag}' for tag in tags}
+        found = self.shared.get_many(list(keys.values()))
+        for key in keys.values():
+            if key not in found:
+                self.shared.add(key, _now_ms(), None)
+                found[key] = self.shared.get(key)
+        return {tag: found[key] for tag, key in keys.items()}
+
+    def _valid(self, entry):
+        return not entry.tags or self._tag_versions(entry.tags) == entry.tags
+
+    def _fresh(self, entry, now):
+        return self._valid(entry) and (
+            entry.fresh_until is None or now < entry.fresh_until
+        )
+
+    def _unwrap(self, value):
+        if isinstance(value, Entry):
+            return value.value if self._fresh(value, time.time()) else MISSING
+        return value
+
+    def get(self, key, default=None, version=None):
+        value = self._unwrap(self._lookup(key, version))
+        return default if value is MISSING else value
+
+    def get_many(self, keys, version=None):
+        found, missing = {}, []
+        for key in keys:
+            value = MISSING
+            if self._is_local(key):
+                value = self.local.get(self.make_key(key, version))
+            if value is MISSING:
+                missing.append(key)
+            else:
+                self._count('local_hit')
+                found[key] = value
+        if missing:
+            shared = self.shared.get_many(missing, version=version)
+            for key in missing:
+                if key in shared:
+                    self._count('shared_hit')
+                    self._remember(key, shared[key], version=version)
+                    found[key] = shared[key]
+                else:
+                    self._count('miss')
+        values = {key: self._unwrap(value) for key, value in found.items()}
+        return {
+            key: value for key, value in values.items()
+            if value is not MISSING
+        }
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._seconds(timeout)
+        self.shared.set(key, value, timeout, version=version)
+        self._remember(key, value, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._seconds(timeout)
+        failed = self.shared.set_many(data, timeout, version=version)
+        for key, value in data.items():
+            if key not in failed:
+                self._remember(key, value, timeout, version)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._seconds(timeout)
+        if not self.shared.add(key, value, timeout, version=version):
+            return False
+        self._remember(key, value, timeout, version)
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self.local.delete(self.make_key(key, version))
+        return self.shared.touch(
+            key, self._seconds(timeout), version=version
+        )
+
+    def incr(self, key, delta=1, version=None):
+        """
+        Увеличивает значение incr хранилища: атомарно, если атомарен его
+        бэкенд (файловый кэш Django - нет). Копия в памяти сбрасывается.
+        Значение get_or_compute увеличивается внутри Entry с прежними
+        тегами и сроками, уже не свежее считается отсутствующим.
+        """
+        self.local.delete(self.make_key(key, version))
+        entry = self.shared.get(key, MISSING, version=version)
+        if not isinstance(entry, Entry):
+            return self.shared.incr(key, delta, version=version)
+        now = time.time()
+        if not self._fresh(entry, now):
+            raise ValueError(f"Key '{key}' not found")
+        value = entry.value + delta
+        self.shared.set(
+            key, entry._replace(value=value),
+            None if entry.stale_until is None else entry.stale_until - now,
+            version=version
+        )
+        return value
+
+    def delete(self, key, version=None):
+        self.local.delete(self.make_key(key, version))
+        self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self.local.delete(self.make_key(key, version))
+        self.shared.delete_many(keys, version=version)
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+    def _compute(self, key, compute, timeout, stale, tags, version, locked):
+        try:
+            # Версии тегов - до вычисления: инвалидация во время него
+            # сделает значение устаревшим
+            versions = self._tag_versions(tags)
+            value = compute()
+            self._count('compute')
+            seconds = self._seconds(timeout)
+            now = time.time()
+            entry = Entry(
+                value, versions,
+                None if seconds is None else now + seconds,
+                None if seconds is None else now + seconds + stale,
+            )
+            self.shared.set(
+                key, entry, None if seconds is None else seconds + stale,
+                version=version
+            )
+            self._remember(key, entry, seconds, version)
+            return value
+        finally:
+            if locked:
+                self.shared.delete(f'{key}:lock', version=version)
+
+    def get_or_compute(
+        self, key, compute, timeout=DEFAULT_TIMEOUT, stale=0, tags=(),
+        version=None
+    ):
+        """
+        Значение key либо результат compute(), сохраненный на timeout
+        секунд. Вычисляет один процесс (блокировка в хранилище), прочие
+        ждут его результат до LOCK_TIMEOUT секунд. Еще stale секунд после
+        timeout значение отдается устаревшим, пока один процесс вычисляет
+        новое. Значение сбрасывает invalidate_tags() любого из tags.
+        """
+        value = self._lookup(key, version)
+        now = time.time()
+        if value is not MISSING and not isinstance(value, Entry):
+            # Положено обычным set()
+            return value
+        if value is not MISSING and self._valid(value):
+            if value.fresh_until is None or now < value.fresh_until:
+                return value.value
+            if now < value.stale_until:
+                if self._acquire(key, version):
+                    return self._compute(
+                        key, compute, timeout, stale, tags, version, True
+                    )
+                self._count('stale')
+                return value.value
+        if self._acquire(key, version):
+            return self._compute(
+                key, compute, timeout, stale, tags, version, True
+            )
+        self._count('wait')
+        deadline = time.monotonic() + self.lock_timeout
+        delay = 0.01
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
+            value = self.shared.get(key, MISSING, version=version)
+            if isinstance(value, Entry) and self._fresh(value, time.time()):
+                self._remember(key, value, version=version)
+                return value.value
+        # Вычислявший процесс не успел или упал
+        return self._compute(
+            key, compute, timeout, stale, tags, version, False
+        )
+
+    def _acquire(self, key, version):
+        return self.shared.add(
+            f'{key}:lock', 1, self.lock_timeout, version=version
+        )
+
+    def invalidate_tags(self, *tags):
+        """Сбрасывает значения get_or_compute с любым из tags."""
+        keys = [f'tag:{tag}' for tag in tags]
+        current = self.shared.get_many(keys)
+        self.shared.set_many({
+            key: max(_now_ms(), current.get(key, 0) + 1) for key in keys
+        }, None)
+
+    def stats(self):
+        """Счётчики обращений процесса и доля попаданий."""
+        with _lock:
+            stats = {event: self.counts[event] for event in EVENTS}
+        hits = stats['local_hit'] + stats['shared_hit']
+        total = hits + stats['miss']
+        stats['hit_ratio'] = hits / total if total else 0
+        return stats
+
+    def reset_stats(self):
+        with _lock:
+            self.counts.clear()
+
+
+def model_tag(model, pk):
+    """Тег значений, зависящих от объекта модели model с ключом pk."""
+    return f'{model._meta.label_lower}:{pk}'
+
+
+def get_or_compute(key, compute, timeout=DEFAULT_TIMEOUT, stale=0, tags=()):
+    """
+    TieredCache.get_or_compute кэша по умолчанию; для кэша других
+    бэкендов - get_or_set без тегов и защиты от одновременного
+    вычисления.
+    """
+    cache = caches['default']
+    if isinstance(cache, TieredCache):
+        return cache.get_or_compute(key, compute, timeout, stale, tags)
+    return cache.get_or_set(key, compute, timeout)
+
+
+def invalidate(*tags):
+    """Сбрасывает значения с любым из тегов в кэше по умолчанию."""
+    cache = caches['default']
+    if isinstance(cache, TieredCache):
+        cache.invalidate_tags(*tags)
+
+
+def render_metrics():
+    """Статистика двухуровневых кэшей в текстовом формате Prometheus."""
+    lines = [
+        '# HELP yatube_cache_events_total Обращения к кэшу по исходу',
+        '# TYPE yatube_cache_events_total counter',
+    ]
+    for alias in sorted(settings.CACHES):
+        cache = caches[alias]
+        if not isinstance(cache, TieredCache):
+            continue
+        for event, value in cache.stats().items():
+            if event != 'hit_ratio':
+                lines.append(
+                    f'yatube_cache_events_total{{cache="{alias}",'
+                    f'event="{event}"}} {value}'
+                )
+    return '\n'.join(lines) + '\n'
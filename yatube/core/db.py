@@ -0,0 +1,59 @@
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+
+
+def configure_sqlite(connection):
+    """Выставляет соединению SQLite прагмы из SQLITE_PRAGMAS."""
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_locked(error):
+    return 'database is locked' in str(error)
+
+
+def retry_on_lock(function):
+    """
+    Выполняет function в транзакции и повторяет её, если SQLite вернул
+    «database is locked»: таймаут ожидания не спасает, когда две
+    транзакции читали и обе пытаются начать запись. До
+    DATABASE_LOCK_RETRIES повторов с растущей случайной паузой; внутри
+    внешней транзакции повтор невозможен, и ошибка пробрасывается.
+    """
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        retries = settings.DATABASE_LOCK_RETRIES
+        for attempt in range(retries + 1):
+            try:
+                with transaction.atomic():
+                    return function(*args, **kwargs)
+            except OperationalError as error:
+                if (
+                    not is_locked(error)
+                    or attempt == retries
+                    or connection.in_atomic_block
+                ):
+                    raise
+            time.sleep(
+                settings.DATABASE_LOCK_RETRY_DELAY * 2 ** attempt
+                * random.uniform(0.5, 1.5)
+            )
+    return wrapper
+
+
+def retry_writes_on_lock(view):
+    """retry_on_lock для изменяющих запросов к view; GET и HEAD - как есть."""
+    retried = retry_on_lock(view)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+        # Каждая попытка заново строит форму и перечитывает пост
+        return retried(request, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,115 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core import benchmarks
+from core.runner import temporary_caches
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержки, число запросов к БД и пик памяти всех страниц '
+        'posts, users и about на тестовой БД со сгенерированными данными; '
+        'завершается ошибкой при превышении бюджетов'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dataset', choices=tuple(benchmarks.DATASETS), default='10k',
+            help='Набор данных: число постов, авторов и групп'
+        )
+        parser.add_argument('--posts', type=int, help='Число постов')
+        parser.add_argument('--authors', type=int, help='Число авторов')
+        parser.add_argument('--groups', type=int, help='Число групп')
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько раз замерять каждую страницу'
+        )
+        parser.add_argument(
+            '--budgets',
+            help='JSON-файл с бюджетами {"маршрут": {"queries": N, '
+                 '"p99_ms": M}} поверх встроенных'
+        )
+        parser.add_argument(
+            '--output', help='Файл для результатов в JSON'
+        )
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help='Не удалять тестовую БД (и не заполнять её повторно)'
+        )
+        parser.add_argument(
+            '--no-gate', action='store_true',
+            help='Не завершаться ошибкой при превышении бюджетов'
+        )
+
+    def budgets(self, path):
+        budgets = dict(benchmarks.BUDGETS)
+        if path:
+            with open(path, encoding='utf-8') as file:
+                for name, budget in json.load(file).items():
+                    budgets[name] = {**budgets.get(name, {}), **budget}
+        return budgets
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"Маршрут":<34}{"p50":>8}{"p99":>8}{"SQL":>5}{"КБ":>8}'
+        )
+        for result in results:
+            if 'skipped' in result:
+                self.stdout.write(
+                    f'{result["route"]:<34}пропущен: {result["skipped"]}'
+                )
+                continue
+            line = f'{result["route"]:<34}'
+            if 'error' not in result:
+                line += (
+                    f'{result["p50_ms"]:>8.1f}{result["p99_ms"]:>8.1f}'
+                    f'{result["queries"]:>5}{result["peak_memory_kb"]:>8.0f}'
+                )
+            if result['violations']:
+                line = self.style.ERROR(
+                    f'{line}  {"; ".join(result["violations"])}'
+                )
+            self.stdout.write(line)
+
+    def handle(self, *args, **options):
+        budgets = self.budgets(options['budgets'])
+        dataset = dict(zip(
+            ('posts', 'authors', 'groups'),
+            benchmarks.DATASETS[options['dataset']]
+        ))
+        for key in dataset:
+            if options[key] is not None:
+                dataset[key] = options[key]
+        if settings.DEBUG:
+            self.stderr.write(self.style.WARNING(
+                'DEBUG включён: замеры завышены журналом запросов к БД'
+            ))
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options['keepdb']
+        )
+        try:
+            with temporary_caches():
+                if not benchmarks.Post.objects.exists():
+                    self.stdout.write(f'Заполнение БД: {dataset}')
+                    benchmarks.seed(**dataset)
+                results = benchmarks.benchmark(options['repeat'], budgets)
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options['keepdb']
+            )
+        self.report(results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump({
+                    'dataset': dataset,
+                    'debug': settings.DEBUG,
+                    'repeat': options['repeat'],
+                    'results': results,
+                }, file, ensure_ascii=False, indent=2)
+        failed = [result for result in results if result.get('violations')]
+        if failed and not options['no_gate']:
+            raise CommandError(f'Превышены бюджеты маршрутов: {len(failed)}')
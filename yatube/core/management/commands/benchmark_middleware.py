@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core import benchmarks
+from core.runner import temporary_caches
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет накладные расходы middleware из MIDDLEWARE на запрос '
+        'гостя и вошедшего пользователя'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=500,
+            help='Сколько запросов замерять для каждого стека'
+        )
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with temporary_caches():
+                results = benchmarks.middleware_benchmark(options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        self.stdout.write(
+            f'{"Стек до middleware":<52}{"гость p50, мс":>15}'
+            f'{"автор p50, мс":>15}'
+        )
+        for label, result in results.items():
+            self.stdout.write(
+                f'{label:<52}{result["guest"]["p50_ms"]:>15.3f}'
+                f'{result["user"]["p50_ms"]:>15.3f}'
+            )
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core import benchmarks
+from core.runner import temporary_caches
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет отрисовку страницы ленты без кэша шаблонов и с ним, '
+        'а также построение путей через reverse() и core.paths'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=1000,
+            help='Постов в тестовой БД'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=50,
+            help='Сколько раз замерять каждый вариант'
+        )
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with temporary_caches():
+                benchmarks.seed(options['posts'], 50, 10)
+                results = benchmarks.render_benchmark(options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        self.stdout.write(f'{"Вариант":<34}{"p50, мс":>10}{"p99, мс":>10}')
+        for label, result in results.items():
+            self.stdout.write(
+                f'{label:<34}{result["p50_ms"]:>10.3f}'
+                f'{result["p99_ms"]:>10.3f}'
+            )
@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+
+from core import benchmarks
+from core.runner import temporary_caches
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузка записью: авторы в нескольких потоках одновременно '
+        'публикуют посты в тестовую БД SQLite в файле. С --baseline - '
+        'настройки Django по умолчанию, для сравнения'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=16,
+            help='Число одновременно пишущих авторов'
+        )
+        parser.add_argument(
+            '--posts', type=int, default=50,
+            help='Постов от каждого автора'
+        )
+        parser.add_argument(
+            '--baseline', action='store_true',
+            help='Без прагм SQLITE_PRAGMAS, ожидания блокировки и повторов'
+        )
+
+    def run(self, options):
+        old_name = connection.settings_dict['NAME']
+        directory = tempfile.mkdtemp()
+        # Тестовая БД в файле: в памяти SQLite блокирует иначе
+        connection.settings_dict['TEST']['NAME'] = os.path.join(
+            directory, 'benchmark.sqlite3'
+        )
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with temporary_caches():
+                return benchmarks.concurrent_writes(
+                    options['threads'], options['posts']
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def handle(self, *args, **options):
+        if options['threads'] < 1 or options['posts'] < 1:
+            raise CommandError('Число потоков и постов должно быть > 0')
+        if connection.vendor != 'sqlite':
+            raise CommandError('Замер рассчитан на SQLite')
+        if settings.DEBUG:
+            self.stderr.write(self.style.WARNING(
+                'DEBUG включён: замеры завышены журналом запросов к БД'
+            ))
+        if options['baseline']:
+            connection.settings_dict['OPTIONS'] = {}
+            with override_settings(
+                SQLITE_PRAGMAS={}, DATABASE_LOCK_RETRIES=0
+            ):
+                result = self.run(options)
+        else:
+            result = self.run(options)
+        self.stdout.write(
+            f'Потоков: {result["threads"]}, записано постов: '
+            f'{result["written"]} (в БД {result["stored"]})\n'
+            f'Постов в секунду: {result["posts_per_second"]:.1f}, '
+            f'p50 {result["p50_ms"]:.1f} мс, p99 {result["p99_ms"]:.1f} мс'
+        )
+        for error, count in sorted(result['errors'].items()):
+            self.stdout.write(self.style.ERROR(f'{count} × {error}'))
@@ -0,0 +1,109 @@
+import http.client
+import threading
+import time
+from itertools import cycle
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест: сравнивает запросы в секунду и задержки p50/p99 '
+        'развёрнутых серверов, например WSGI (gunicorn yatube.wsgi) и '
+        'ASGI (uvicorn yatube.asgi:application)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'targets', nargs='+',
+            help='Адреса серверов, например http://127.0.0.1:8000'
+        )
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Путь страницы; можно указать несколько, по умолчанию /'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=100,
+            help='Число одновременных клиентов'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=2000,
+            help='Число запросов к каждому серверу'
+        )
+        parser.add_argument(
+            '--timeout', type=float, default=30,
+            help='Таймаут запроса, секунды'
+        )
+
+    def client(self, target, paths, count, timeout, results):
+        """Клиент с постоянным соединением: count запросов по кругу путей."""
+        connection = http.client.HTTPConnection(
+            target.hostname, target.port, timeout=timeout
+        )
+        paths = cycle(paths)
+        latencies, errors = [], 0
+        for _ in range(count):
+            start = time.perf_counter()
+            try:
+                connection.request('GET', next(paths))
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                errors += 1
+                continue
+            if response.status >= 500:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+        connection.close()
+        results.append((latencies, errors))
+
+    def run(self, target, paths, options):
+        concurrency = min(options['concurrency'], options['requests'])
+        per_client, extra = divmod(options['requests'], concurrency)
+        results = []
+        threads = [
+            threading.Thread(target=self.client, args=(
+                target, paths, per_client + (number < extra),
+                options['timeout'], results
+            ))
+            for number in range(concurrency)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        latencies = sorted(
+            latency for client_latencies, _ in results
+            for latency in client_latencies
+        )
+        return {
+            'rps': len(latencies) / elapsed,
+            'p50': percentile(latencies, 50) * 1000,
+            'p99': percentile(latencies, 99) * 1000,
+            'errors': sum(errors for _, errors in results),
+        }
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError('Число клиентов и запросов должно быть > 0')
+        paths = options['paths'] or ['/']
+        self.stdout.write(
+            f'{"Сервер":<32}{"запросов/с":>12}{"p50, мс":>10}'
+            f'{"p99, мс":>10}{"ошибок":>8}'
+        )
+        for url in options['targets']:
+            target = urlsplit(url)
+            if target.scheme != 'http' or not target.hostname:
+                raise CommandError(f'Ожидается адрес http://: {url}')
+            stats = self.run(target, paths, options)
+            self.stdout.write(
+                f'{url:<32}{stats["rps"]:>12.1f}{stats["p50"]:>10.1f}'
+                f'{stats["p99"]:>10.1f}{stats["errors"]:>8}'
+            )
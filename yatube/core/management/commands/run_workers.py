@@ -0,0 +1,52 @@
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Task
+from core.tasks import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет задачи очереди core.tasks пулом потоков. Можно '
+        'запустить несколько процессов: задачу получит один из них'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=settings.TASKS_WORKERS,
+            help='Число потоков-воркеров'
+        )
+        parser.add_argument(
+            '--poll', type=float, default=settings.TASKS_POLL_INTERVAL,
+            help='Пауза между проверками пустой очереди, секунды'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться'
+        )
+
+    def handle(self, *args, **options):
+        if options['threads'] < 1:
+            raise CommandError('Число потоков должно быть > 0')
+        stop = threading.Event()
+        workers = [
+            Worker(stop, options['poll'], once=options['once'])
+            for _ in range(options['threads'])
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                # join с таймаутом, чтобы Ctrl+C прерывал ожидание
+                while worker.is_alive():
+                    worker.join(options['poll'])
+        except KeyboardInterrupt:
+            self.stdout.write('Завершение: воркеры доделывают задачи')
+            stop.set()
+            for worker in workers:
+                worker.join()
+        failed = Task.objects.filter(status=Task.FAILED).count()
+        if failed:
+            self.stderr.write(f'Задач с ошибкой: {failed}')
@@ -0,0 +1,154 @@
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+# Границы корзин гистограмм: секунды для времени, штуки для запросов
+TIME_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+METRICS = (
+    (
+        'yatube_request_duration_seconds',
+        'Время обработки запроса, с', TIME_BUCKETS
+    ),
+    (
+        'yatube_db_duration_seconds',
+        'Время запросов к БД за запрос, с', TIME_BUCKETS
+    ),
+    (
+        'yatube_db_queries',
+        'Число запросов к БД за запрос', QUERY_BUCKETS
+    ),
+)
+
+
+class Histogram:
+    """Накопительная гистограмма в формате Prometheus."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Гистограммы метрик по именам view; своя у каждого процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+
+    def observe(self, view, values):
+        with self.lock:
+            for (name, _, buckets), value in zip(METRICS, values):
+                key = (name, view)
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram(buckets)
+                self.histograms[key].observe(value)
+
+    def clear(self):
+        with self.lock:
+            self.histograms.clear()
+
+    def render(self):
+        """Метрики в текстовом формате Prometheus."""
+        lines = []
+        with self.lock:
+            for name, help_text, buckets in METRICS:
+                lines += [
+                    f'# HELP {name} {help_text}',
+                    f'# TYPE {name} histogram',
+                ]
+                for (metric, view), histogram in sorted(
+                    self.histograms.items()
+                ):
+                    if metric != name:
+                        continue
+                    label = f'view="{view}"'
+                    total = 0
+                    for bound, count in zip(
+                        buckets + ('+Inf',), histogram.counts
+                    ):
+                        total += count
+                        lines.append(
+                            f'{name}_bucket{{{label},le="{bound}"}} {total}'
+                        )
+                    lines += [
+                        f'{name}_sum{{{label}}} {histogram.sum}',
+                        f'{name}_count{{{label}}} {histogram.count}',
+                    ]
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+class QueryTimer:
+    """Обёртка execute_wrapper: считает запросы к БД и их время."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """
+    Замеряет время запроса, число и время запросов к БД для доли
+    METRICS_SAMPLE_RATE запросов: копит гистограммы по именам view и
+    отдаёт замеры в заголовке Server-Timing - персоналу, а при
+    METRICS_SERVER_TIMING всем. При METRICS_ENABLED = False исключается
+    из цепочки middleware.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.METRICS_SAMPLE_RATE
+        self.server_timing = settings.METRICS_SERVER_TIMING
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+        match = getattr(request, 'resolver_match', None)
+        registry.observe(
+            match.view_name if match else '<unresolved>',
+            (duration, timer.duration, timer.count)
+        )
+        user = getattr(request, 'user', None)
+        if self.server_timing or (user is not None and user.is_staff):
+            response['Server-Timing'] = (
+                f'app;dur={duration * 1000:.1f}, '
+                f'db;dur={timer.duration * 1000:.1f};'
+                f'desc="{timer.count} queries"'
+            )
+        return response
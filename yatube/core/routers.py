@@ -0,0 +1,83 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+# Cookie «читать с основной БД до»: время в секундах от эпохи
+STICKY_COOKIE = 'db_primary_until'
+SAFE_METHODS = ('GET', 'HEAD')
+
+_state = threading.local()
+
+
+def replica():
+    """Реплика, с которой читает текущий запрос, либо None."""
+    return getattr(_state, 'replica', None)
+
+
+class ReplicaRouter:
+    """
+    Направляет чтение на реплику, выбранную ReplicaMiddleware для
+    запроса; запись, миграции и всё вне таких запросов - на default.
+    """
+
+    def db_for_read(self, model, **hints):
+        return replica()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики - копии default: объекты из них можно связывать
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Реплики получают схему вместе с данными основной БД
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaMiddleware:
+    """
+    Читает страницы DATABASE_REPLICA_VIEWS со случайной реплики из
+    DATABASE_REPLICAS. После успешного изменяющего запроса пользователь
+    DATABASE_REPLICA_LAG секунд (допустимое отставание реплик) читает с
+    основной БД и видит свои правки. Без реплик исключается из цепочки
+    middleware.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.replicas = settings.DATABASE_REPLICAS
+        self.views = frozenset(settings.DATABASE_REPLICA_VIEWS)
+        self.lag = settings.DATABASE_REPLICA_LAG
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.replica = None
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                STICKY_COOKIE, f'{time.time() + self.lag:.0f}',
+                max_age=self.lag, httponly=True, samesite='Lax'
+            )
+        return response
+
+    def sticky(self, request):
+        try:
+            return float(request.COOKIES[STICKY_COOKIE]) > time.time()
+        except (KeyError, ValueError):
+            return False
+
+    def process_view(self, request, view, args, kwargs):
+        if (
+            request.method in SAFE_METHODS
+            and request.resolver_match.view_name in self.views
+            and not self.sticky(request)
+        ):
+            # Одна реплика на весь запрос: страница согласована сама с собой
+            _state.replica = random.choice(self.replicas)
@@ -0,0 +1,39 @@
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+@contextmanager
+def temporary_caches():
+    """
+    Общий уровень кэша во временном каталоге и отдельный уровень в
+    памяти: тесты и замеры вызывают cache.clear() и не должны стирать
+    кэш в BASE_DIR/cache, которым пользуется работающий сайт.
+    """
+    directory = tempfile.mkdtemp(prefix='yatube-cache-')
+    try:
+        with override_settings(CACHES={
+            **settings.CACHES,
+            'default': {**settings.CACHES['default'], 'LOCATION': directory},
+            'shared': {**settings.CACHES['shared'], 'LOCATION': directory},
+        }):
+            yield directory
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+class TestRunner(DiscoverRunner):
+    """Тесты с кэшем из temporary_caches."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.caches = temporary_caches()
+        self.caches.__enter__()
+
+    def teardown_test_environment(self, **kwargs):
+        self.caches.__exit__(None, None, None)
+        super().teardown_test_environment(**kwargs)
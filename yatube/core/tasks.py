@@ -0,0 +1,144 @@
+import json
+import logging
+import random
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+def task(function):
+    """
+    Регистрирует функцию как задачу очереди: function.delay(*args,
+    **kwargs) ставит её вызов в очередь. Аргументы должны сериализоваться
+    в JSON.
+    """
+    name = f'{function.__module__}.{function.__qualname__}'
+    registry[name] = function
+    function.task_name = name
+    function.delay = lambda *args, **kwargs: enqueue(name, args, kwargs)
+    return function
+
+
+def enqueue(name, args=(), kwargs=None, countdown=0):
+    """
+    Ставит задачу в очередь строкой Task в текущей транзакции: воркеры
+    увидят её только после фиксации, при откате она пропадет вместе с
+    остальными изменениями. При TASKS_EAGER задача выполняется сразу.
+    """
+    if settings.TASKS_EAGER:
+        return resolve(name)(*args, **(kwargs or {}))
+    return Task.objects.create(
+        name=name,
+        arguments=json.dumps([list(args), kwargs or {}]),
+        run_at=timezone.now() + timedelta(seconds=countdown),
+    )
+
+
+def resolve(name):
+    # Импорт модуля задачи регистрирует её
+    return registry.get(name) or import_string(name)
+
+
+def backoff(attempts):
+    """Задержка перед повтором: экспоненциальная, с разбросом ±20 %."""
+    delay = settings.TASKS_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def claim():
+    """
+    Берет в работу готовую задачу либо зависшую дольше TASKS_LOCK_TIMEOUT
+    (её воркер упал); None, если таких нет.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TASKS_LOCK_TIMEOUT)
+    candidates = Task.objects.filter(
+        Q(status=Task.PENDING, run_at__lte=now)
+        | Q(status=Task.RUNNING, locked_at__lt=stale)
+    ).values_list('pk', 'status', 'locked_at')[:10]
+    for pk, status, locked_at in candidates:
+        # Условный UPDATE: из нескольких воркеров задачу получит один
+        if Task.objects.filter(
+            pk=pk, status=status, locked_at=locked_at
+        ).update(
+            status=Task.RUNNING, locked_at=now, attempts=F('attempts') + 1
+        ):
+            return Task.objects.get(pk=pk)
+    return None
+
+
+def execute(task):
+    """
+    Выполняет задачу в транзакции. Выполненная удаляется из очереди,
+    упавшая откладывается по backoff, после TASKS_MAX_ATTEMPTS попыток
+    остается в состоянии FAILED.
+    """
+    args, kwargs = json.loads(task.arguments)
+    try:
+        with transaction.atomic():
+            resolve(task.name)(*args, **kwargs)
+    except Exception:
+        logger.exception('Задача %s #%s упала', task.name, task.pk)
+        queued = Task.objects.filter(pk=task.pk)
+        if task.attempts >= settings.TASKS_MAX_ATTEMPTS:
+            queued.update(
+                status=Task.FAILED, locked_at=None,
+                last_error=traceback.format_exc()
+            )
+        else:
+            queued.update(
+                status=Task.PENDING, locked_at=None,
+                last_error=traceback.format_exc(),
+                run_at=timezone.now() + backoff(task.attempts)
+            )
+        return False
+    Task.objects.filter(pk=task.pk).delete()
+    return True
+
+
+def run_pending():
+    """Выполняет в текущем потоке все готовые задачи; возвращает их число."""
+    done = 0
+    while True:
+        task = claim()
+        if task is None:
+            return done
+        execute(task)
+        done += 1
+
+
+class Worker(threading.Thread):
+    """Поток-воркер: берет задачи, пока не выставлено событие stop."""
+
+    def __init__(self, stop, poll_interval, once=False):
+        super().__init__(daemon=True)
+        self.stop = stop
+        self.poll_interval = poll_interval
+        self.once = once
+
+    def run(self):
+        try:
+            while not self.stop.is_set():
+                # Как между запросами: закрыть устаревшие соединения с БД
+                close_old_connections()
+                task = claim()
+                if task is not None:
+                    execute(task)
+                elif self.once:
+                    return
+                else:
+                    self.stop.wait(self.poll_interval)
+        finally:
+            connection.close()
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+
+from .cache import render_metrics
+from .metrics import registry
+
+# В именах картинок - хэш содержимого, в именах миниатюр sorl-thumbnail -
+# хэш имени исходника и параметров, поэтому браузеры могут хранить их год
+# без перепроверки
+MEDIA_MAX_AGE = 60 * 60 * 24 * 365
+
+
+@staff_member_required
+def metrics(request):
+    """Гистограммы MetricsMiddleware и статистика кэша для Prometheus."""
+    return HttpResponse(
+        registry.render() + render_metrics(),
+        content_type='text/plain; version=0.0.4'
+    )
+
+
+def media(request, path):
+    """
+    Файлы MEDIA_ROOT с заголовками вечного кэширования, только при
+    DEBUG. В продакшене их должен отдавать фронтенд-сервер с такими же
+    заголовками.
+    """
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    patch_cache_control(
+        response, public=True, max_age=MEDIA_MAX_AGE, immutable=True
+    )
+    return response
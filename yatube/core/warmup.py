@@ -0,0 +1,46 @@
+import logging
+import os
+
+from django.template import TemplateSyntaxError, engines
+from django.template.loaders.cached import Loader as CachedLoader
+
+logger = logging.getLogger(__name__)
+
+
+def template_names(loader):
+    """Имена .html-шаблонов из каталогов загрузчиков кэширующего."""
+    names = set()
+    for inner in loader.loaders:
+        for directory in inner.get_dirs():
+            for root, _, files in os.walk(directory):
+                names.update(
+                    os.path.relpath(os.path.join(root, file), directory)
+                    for file in files if file.endswith('.html')
+                )
+    return sorted(names)
+
+
+def warm_up_templates():
+    """
+    Компилирует все шаблоны в кэш кэширующего загрузчика, чтобы первые
+    запросы процесса не разбирали их сами; возвращает число шаблонов.
+    Без кэширующего загрузчика (в отладке) ничего не делает.
+    """
+    count = 0
+    for backend in engines.all():
+        engine = getattr(backend, 'engine', None)
+        if engine is None:
+            continue
+        for loader in engine.template_loaders:
+            if not isinstance(loader, CachedLoader):
+                continue
+            for name in template_names(loader):
+                try:
+                    engine.get_template(name)
+                except TemplateSyntaxError:
+                    # Например, шаблон приложения с тегами не из
+                    # INSTALLED_APPS: он и при запросе не загрузится
+                    logger.warning('Шаблон %s не скомпилирован', name)
+                    continue
+                count += 1
+    return count
@@ -0,0 +1,156 @@
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from core.cache import get_or_compute, invalidate, model_tag
+
+from . import shards
+from .models import Group, PostCounter, User
+from .settings import FEED_COUNT_STALE, FEED_COUNT_TTL
+
+# Тег числа постов общей ленты; у лент групп и авторов - теги группы и
+# автора
+FEED_TAG = 'posts:feed'
+
+
+def feed_key(group_id=None, author_id=None):
+    if group_id is not None:
+        return f'posts:count:group:{group_id}'
+    if author_id is not None:
+        return f'posts:count:author:{author_id}'
+    return 'posts:count:all'
+
+
+def _pk(obj):
+    return getattr(obj, 'pk', obj)
+
+
+def feed_count(group=None, author=None):
+    """
+    Число постов в ленте: общей, группы или автора (объект или его pk).
+    Берется из кэша, при промахе - из PostCounter и кладется в кэш на
+    FEED_COUNT_TTL. Считает один процесс; еще FEED_COUNT_STALE секунд,
+    пока он считает, отдается прежнее число.
+    """
+    group_id, author_id = _pk(group), _pk(author)
+    if group_id is not None:
+        tags = [model_tag(Group, group_id)]
+    elif author_id is not None:
+        tags = [model_tag(User, author_id)]
+    else:
+        tags = [FEED_TAG]
+    return get_or_compute(
+        feed_key(group_id, author_id),
+        lambda: posts_count(group=group, author=author),
+        FEED_COUNT_TTL, FEED_COUNT_STALE, tags
+    )
+
+
+def _scope(group=None, author=None):
+    if group is not None:
+        return {'group_id': _pk(group)}
+    if author is not None:
+        return {'author_id': _pk(author)}
+    return {}
+
+
+def _counter(scope):
+    """Фильтр строки PostCounter ленты; пустой scope - общая лента."""
+    return scope or {'total': True}
+
+
+def _get_or_create(scope):
+    return PostCounter.objects.get_or_create(
+        **_counter(scope), defaults={'value': shards.count_posts(**scope)}
+    )[0]
+
+
+def posts_count(group=None, author=None):
+    """
+    Число постов группы, автора или всех постов из денормализованного
+    PostCounter.
+    """
+    scope = _scope(group, author)
+    value = PostCounter.objects.filter(**_counter(scope)).values_list(
+        'value', flat=True
+    ).first()
+    if value is None:
+        value = _get_or_create(scope).value
+    return value
+
+
+def _bump(delta, **scope):
+    # Не ниже нуля: отставший счётчик не должен ронять удаление поста
+    # на ограничении PositiveIntegerField
+    updated = PostCounter.objects.filter(**_counter(scope)).update(
+        value=Greatest(F('value') + delta, 0)
+    )
+    # Недостающий счётчик создается только при росте: при каскадном
+    # удалении автора строка для него создаваться не должна
+    if not updated and delta > 0:
+        _get_or_create(scope)
+
+
+def _invalidate(tags):
+    invalidate(*tags)
+    # Другой процесс мог пересчитать число до фиксации транзакции
+    transaction.on_commit(lambda: invalidate(*tags))
+
+
+def shift_counts(delta, group_id=None, author_id=None, total=True):
+    """
+    Сдвигает на delta денормализованные в PostCounter счётчики лент, в
+    которые входит пост, и сбрасывает их закэшированные числа.
+    """
+    tags = []
+    if total:
+        _bump(delta)
+        tags.append(FEED_TAG)
+    if group_id is not None:
+        _bump(delta, group_id=group_id)
+        tags.append(model_tag(Group, group_id))
+    if author_id is not None:
+        _bump(delta, author_id=author_id)
+        tags.append(model_tag(User, author_id))
+    if tags:
+        _invalidate(tags)
+
+
+def rebuild_counters():
+    """Пересчитывает все PostCounter по таблицам постов и сбрасывает кэш."""
+    authors, groups = Counter(), Counter()
+    for posts in shards.post_querysets():
+        posts = posts.order_by()
+        authors.update(dict(
+            posts.values_list('author').annotate(Count('pk'))
+        ))
+        groups.update(dict(
+            posts.filter(group__isnull=False).values_list(
+                'group'
+            ).annotate(Count('pk'))
+        ))
+    with transaction.atomic():
+        PostCounter.objects.all().delete()
+        PostCounter.objects.bulk_create(
+            [
+                PostCounter(author_id=author_id, value=value)
+                for author_id, value in authors.items()
+            ] + [
+                PostCounter(group_id=group_id, value=value)
+                for group_id, value in groups.items()
+            ] + [
+                PostCounter(total=True, value=sum(authors.values()))
+            ]
+        )
+    cache.delete_many(
+        [feed_key()]
+        + [feed_key(group_id=pk) for pk in Group.objects.values_list(
+            'pk', flat=True
+        )]
+        + [feed_key(author_id=pk) for pk in User.objects.values_list(
+            'pk', flat=True
+        )]
+    )
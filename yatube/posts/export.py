@@ -0,0 +1,90 @@
+import csv
+import heapq
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from . import shards
+
+# Столбцы выгрузки и поля, из которых они берутся. Имена author, group,
+# text и pub_date совпадают с форматом import_posts
+COLUMNS = (
+    ('id', 'pk'),
+    ('text', 'text'),
+    ('pub_date', 'pub_date'),
+    ('updated_at', 'updated_at'),
+    ('author', 'author__username'),
+    ('author_first_name', 'author__first_name'),
+    ('author_last_name', 'author__last_name'),
+    ('group', 'group__slug'),
+    ('group_title', 'group__title'),
+)
+FORMATS = {
+    'jsonl': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+CHUNK_SIZE = 2000
+# Сколько строк склеивать в один кусок потока
+LINES_PER_CHUNK = 100
+
+
+def rows(chunk_size=CHUNK_SIZE):
+    """
+    Кортежи значений постов по возрастанию id без создания моделей; на
+    PostgreSQL - через серверный курсор, на других СУБД - порциями
+    fetchmany. При шардировании выгрузки шардов сливаются по id.
+    """
+    return heapq.merge(*[
+        posts.order_by('pk').values_list(
+            *[field for _, field in COLUMNS]
+        ).iterator(chunk_size=chunk_size)
+        for posts in shards.post_querysets()
+    ], key=lambda row: row[0])
+
+
+class _Echo:
+    """Псевдофайл для csv.writer: возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def _lines(fmt, values):
+    headers = [header for header, _ in COLUMNS]
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(headers)
+        for row in values:
+            yield writer.writerow(row)
+        return
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in values:
+        yield encoder.encode(dict(zip(headers, row))) + '\n'
+
+
+def stream(fmt='jsonl', compress=False, chunk_size=CHUNK_SIZE):
+    """
+    Выгрузка постов кусками байтов в формате fmt (jsonl или csv),
+    при compress - сжатая gzip. Память не зависит от числа постов.
+    """
+    compressor = compress and zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    chunk = []
+    for line in _lines(fmt, rows(chunk_size)):
+        chunk.append(line)
+        if len(chunk) < LINES_PER_CHUNK:
+            continue
+        data = ''.join(chunk).encode()
+        chunk = []
+        if compressor:
+            data = compressor.compress(data)
+        if data:
+            yield data
+    data = ''.join(chunk).encode()
+    if compressor:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
+
+
+def filename(fmt='jsonl', compress=False):
+    return f'posts.{fmt}' + ('.gz' if compress else '')
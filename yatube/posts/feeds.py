@@ -0,0 +1,67 @@
+from . import shards
+from .models import FeedEntry, Post
+
+
+class Feed:
+    """
+    Лента постов поверх FeedEntry: срез читает id из компактной таблицы
+    ленты и догружает посты одним запросом in_bulk. Поддерживает
+    filter/order_by и срезы, которых достаточно пагинаторам.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    @property
+    def ordered(self):
+        return self.entries.ordered
+
+    def filter(self, *args, **kwargs):
+        return Feed(self.entries.filter(*args, **kwargs))
+
+    def order_by(self, *fields):
+        # pk - это post: сортировка по нему подтянула бы ordering Post
+        return Feed(self.entries.order_by(*[
+            field.replace('pk', 'post_id') for field in fields
+        ]))
+
+    def count(self):
+        return self.entries.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        ids = list(self.entries.values_list('pk', flat=True)[key])
+        if not ids:
+            return []
+        posts = self.posts(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+    def posts(self, ids):
+        """Посты ленты по id из той же БД, что и записи."""
+        return Post.objects.using(self.entries.db).for_feed().in_bulk(ids)
+
+
+def feed(group=None, author=None):
+    """
+    Лента: общая, группы или автора. При шардировании лента автора
+    читается из его шарда, остальные сливаются из всех шардов.
+    """
+    entries = FeedEntry.objects.all()
+    if group is not None:
+        entries = entries.filter(group=group)
+    if author is not None:
+        return Feed(entries.filter(author=author).using(
+            shards.database_for_author(author.pk)
+        ))
+    if shards.enabled():
+        return shards.ShardedFeed([
+            Feed(entries.using(shard)) for shard in shards.post_databases()
+        ])
+    return Feed(entries)
@@ -7,3 +7,11 @@ class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         fields = ('text', 'group')
+
+
+class PostImageForm(forms.ModelForm):
+    """Картинка поста: выводится рядом с PostForm на тот же пост."""
+
+    class Meta:
+        model = Post
+        fields = ('image',)
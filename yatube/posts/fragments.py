@@ -0,0 +1,28 @@
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.utils.dateformat import format as date_format
+
+# Варианты карточки поста в includes/post_card.html
+CARD_KINDS = ('index', 'group', 'profile')
+
+
+def card_keys(pk, updated_at):
+    """Ключи кэша всех вариантов карточки поста."""
+    # Должны совпадать с vary_on тега {% cache %} в post_card.html
+    version = date_format(updated_at, 'U.u')
+    return [
+        make_template_fragment_key('post_card', [pk, kind, version])
+        for kind in CARD_KINDS
+    ]
+
+
+def forget_cards(posts):
+    """
+    Удаляет из кэша карточки постов: экземпляров или пар (pk, updated_at).
+    """
+    keys = []
+    for post in posts:
+        if not isinstance(post, tuple):
+            post = (post.pk, post.updated_at)
+        keys.extend(card_keys(*post))
+    cache.delete_many(keys)
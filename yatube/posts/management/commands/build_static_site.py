@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import static_site
+
+
+class Command(BaseCommand):
+    help = (
+        'Отрисовывает публичные страницы в STATIC_SITE_ROOT: новые и '
+        'изменившиеся с прошлой сборки'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--root', default=settings.STATIC_SITE_ROOT,
+            help='Каталог статической копии'
+        )
+        parser.add_argument(
+            '--processes', type=int, default=settings.STATIC_SITE_PROCESSES,
+            help='Процессов отрисовки (по умолчанию - по числу процессоров)'
+        )
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Отрисовать все страницы, например после правки шаблонов'
+        )
+
+    def handle(self, *args, **options):
+        result = static_site.build(
+            options['root'], options['processes'], options['full']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            'Отрисовано: {rendered}, оставлено Django: {skipped}, '
+            'удалено: {removed}, без изменений: {unchanged}'.format(**result)
+        ))
@@ -0,0 +1,111 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+
+from posts.admin import PostAdmin
+from posts.models import FeedEntry, Post
+from posts.settings import POSTS_ON_PAGE
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает планы и время запросов id лент index, group_posts и '
+        'profile к FeedEntry и списка постов в админке с индексами и без них'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько раз выполнять каждый запрос для замера времени'
+        )
+        parser.add_argument(
+            '--copy', action='store_true',
+            help='БД - тестовая или копия: разрешить сравнение без индексов '
+                 'на СУБД, кроме SQLite'
+        )
+
+    def feeds(self):
+        """
+        Запросы id первых страниц лент для самых больших группы и автора
+        и первой страницы списка постов в админке.
+        """
+        entries = FeedEntry.objects.order_by()
+        group = entries.filter(group__isnull=False).values('group').annotate(
+            total=Count('pk')
+        ).order_by('-total').first()
+        author = entries.values('author').annotate(
+            total=Count('pk')
+        ).order_by('-total').first()
+        feeds = {'index': FeedEntry.objects.all()}
+        if group:
+            feeds['group_posts'] = FeedEntry.objects.filter(
+                group=group['group']
+            )
+        if author:
+            feeds['profile'] = FeedEntry.objects.filter(
+                author=author['author']
+            )
+        queries = {
+            name: queryset.values_list('pk', flat=True)[:POSTS_ON_PAGE]
+            for name, queryset in feeds.items()
+        }
+        queries['admin'] = Post.objects.values_list('pk', flat=True)[
+            :PostAdmin.list_per_page
+        ]
+        return queries
+
+    def measure(self, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(queryset.all())
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings) * 1000
+
+    def explain(self, queryset, title):
+        sql, params = queryset.query.sql_with_params()
+        # Комментарий делает текст запроса уникальным: sqlite3 кэширует
+        # подготовленные EXPLAIN и не перестраивает их после DROP INDEX
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'{connection.ops.explain_query_prefix()} {sql} /* {title} */',
+                params
+            )
+            return '\n'.join(
+                ' '.join(str(column) for column in row)
+                for row in cursor.fetchall()
+            )
+
+    def report(self, title, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        for name, queryset in self.feeds().items():
+            self.stdout.write(
+                f'{name}: медиана {self.measure(queryset, repeat):.2f} мс'
+            )
+            self.stdout.write(self.explain(queryset, title))
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite' and not options['copy']:
+            # Файл SQLite легко скопировать, а на сервере СУБД DROP INDEX
+            # блокирует таблицу для всех запросов (на PostgreSQL - ACCESS
+            # EXCLUSIVE) до отката транзакции
+            raise CommandError(
+                'Сравнение без индексов блокирует таблицу ленты до конца '
+                'замеров: запускайте команду на копии БД с --copy'
+            )
+        repeat = options['repeat']
+        self.report('С индексами', repeat)
+        # Индексы удаляются внутри транзакции, которая затем откатывается
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for model in (FeedEntry, Post):
+                    for index in model._meta.indexes:
+                        cursor.execute(
+                            'DROP INDEX '
+                            f'{connection.ops.quote_name(index.name)}'
+                        )
+            self.report('Без индексов', repeat)
+            transaction.set_rollback(True)
@@ -0,0 +1,58 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import export
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты с данными авторов и групп в JSONL или CSV '
+        'потоком, без загрузки таблицы в память'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл для выгрузки; "-" - стандартный вывод'
+        )
+        parser.add_argument(
+            '--format', choices=tuple(export.FORMATS), default='jsonl',
+            help='Формат выгрузки'
+        )
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Сжимать выгрузку gzip'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=export.CHUNK_SIZE,
+            help='Сколько строк читать из БД за раз'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if path == '-':
+            output = sys.stdout.buffer
+        else:
+            try:
+                output = open(path, 'wb')
+            except OSError as error:
+                raise CommandError(error)
+        start = time.perf_counter()
+        size = 0
+        try:
+            for data in export.stream(
+                options['format'], options['gzip'], options['chunk_size']
+            ):
+                output.write(data)
+                size += len(data)
+        finally:
+            if path == '-':
+                output.flush()
+            else:
+                output.close()
+        # Итог - в stderr, чтобы не смешиваться с выгрузкой в stdout
+        self.stderr.write(self.style.SUCCESS(
+            f'Выгружено {size} байт за {time.perf_counter() - start:.1f} с'
+        ))
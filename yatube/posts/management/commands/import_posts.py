@@ -0,0 +1,187 @@
+import csv
+import json
+import sys
+import time
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts import shards
+from posts.forms import PostForm
+from posts.models import Group, Post, User
+
+# Сколько ключей искать одним запросом: SQLite ограничивает число
+# параметров запроса
+LOOKUP_CHUNK = 500
+
+
+class Lookup:
+    """Кэш key -> pk, пополняемый одним запросом на пачку строк."""
+
+    def __init__(self, queryset, field):
+        self.queryset = queryset
+        self.field = field
+        self.cache = {}
+
+    def load(self, keys):
+        missing = list({key for key in keys if key not in self.cache})
+        for start in range(0, len(missing), LOOKUP_CHUNK):
+            chunk = missing[start:start + LOOKUP_CHUNK]
+            self.cache.update(dict.fromkeys(chunk))
+            self.cache.update(self.queryset.filter(
+                **{f'{self.field}__in': chunk}
+            ).values_list(self.field, 'pk'))
+
+    def __getitem__(self, key):
+        return self.cache[key]
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты из JSONL или CSV (поля text, author, group, '
+        'pub_date) пачками через bulk_create'
+    )
+    stealth_options = ('stdin',)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл с постами; "-" - стандартный ввод'
+        )
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'),
+            help='Формат входных данных; по умолчанию - по расширению файла'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько постов вставлять одной транзакцией'
+        )
+
+    def rows(self, stream, fmt):
+        """Пары (номер строки, словарь полей) без чтения файла целиком."""
+        if fmt == 'csv':
+            reader = csv.DictReader(stream)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as error:
+                yield number, ValidationError(f'некорректный JSON: {error}')
+                continue
+            if not isinstance(row, dict):
+                row = ValidationError('ожидается JSON-объект')
+            yield number, row
+
+    def build(self, row):
+        """Пост из строки импорта; проверки - как у PostForm."""
+        if isinstance(row, ValidationError):
+            raise row
+        fields = PostForm.base_fields
+        text = fields['text'].clean(row.get('text'))
+        for field in ('author', 'group', 'pub_date'):
+            if row.get(field) and not isinstance(row[field], str):
+                raise ValidationError(
+                    f'{field}: ожидается строка, а не {row[field]!r}'
+                )
+        author_id = self.authors[row.get('author')]
+        if author_id is None:
+            raise ValidationError(
+                f'автор {row.get("author")!r} не найден'
+            )
+        group_id = None
+        if row.get('group'):
+            group_id = self.groups[row['group']]
+            if group_id is None:
+                raise ValidationError(
+                    fields['group'].error_messages['invalid_choice']
+                )
+        # Без даты пост получит время вставки
+        pub_date = None
+        if row.get('pub_date'):
+            pub_date = parse_datetime(row['pub_date'])
+            if pub_date is None:
+                raise ValidationError(
+                    f'некорректная дата {row["pub_date"]!r}'
+                )
+            if timezone.is_naive(pub_date):
+                pub_date = timezone.make_aware(pub_date)
+        return Post(
+            text=text,
+            author_id=author_id,
+            group_id=group_id,
+            pub_date=pub_date,
+            updated_at=pub_date,
+        )
+
+    def import_batch(self, batch):
+        rows = [row for _, row in batch if isinstance(row, dict)]
+        # Нестроковые значения (списки, объекты JSON) отклонит build
+        self.authors.load(
+            row.get('author') for row in rows
+            if isinstance(row.get('author'), str)
+        )
+        self.groups.load(
+            row['group'] for row in rows if isinstance(row.get('group'), str)
+        )
+        posts = []
+        for number, row in batch:
+            try:
+                posts.append(self.build(row))
+            except ValidationError as error:
+                self.skipped += 1
+                self.stderr.write(f'Строка {number}: {"; ".join(error)}')
+        # PostQuerySet.bulk_create сам выполняется в транзакции; при
+        # шардировании посты пишутся в шарды авторов
+        shards.bulk_create(
+            posts, batch_size=self.batch_size, keep_dates=True
+        )
+        return len(posts)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or (
+            'csv' if path.lower().endswith('.csv') else 'jsonl'
+        )
+        self.batch_size = options['batch_size']
+        if self.batch_size < 1:
+            raise CommandError('--batch-size должен быть положительным')
+        self.authors = Lookup(User.objects.all(), 'username')
+        self.groups = Lookup(Group.objects.all(), 'slug')
+        self.skipped = 0
+        imported = 0
+        if path == '-':
+            stream = options.get('stdin') or sys.stdin
+        else:
+            try:
+                stream = open(path, encoding='utf-8', newline='')
+            except OSError as error:
+                raise CommandError(error)
+        start = time.perf_counter()
+        rows = self.rows(stream, fmt)
+        try:
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                imported += self.import_batch(batch)
+                if options['verbosity'] > 1:
+                    self.stdout.write(
+                        f'{imported} постов, '
+                        f'{imported / (time.perf_counter() - start):.0f}'
+                        f' постов/с'
+                    )
+        finally:
+            if path != '-':
+                stream.close()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано постов: {imported}, пропущено: {self.skipped} '
+            f'за {elapsed:.1f} с ({imported / (elapsed or 1):.0f} постов/с)'
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts import shards
+from posts.models import FeedEntry
+
+
+class Command(BaseCommand):
+    help = 'Пересоздает материализованную ленту FeedEntry по таблице постов'
+
+    def handle(self, *args, **options):
+        count = 0
+        # При шардировании лента каждого шарда строится по его постам
+        for database in shards.post_databases():
+            entries = FeedEntry.objects.using(database)
+            entries.rebuild()
+            count += entries.count()
+        self.stdout.write(self.style.SUCCESS(f'Записей в ленте: {count}'))
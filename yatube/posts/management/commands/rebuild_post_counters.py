@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import rebuild_counters
+from posts.models import PostCounter
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счётчики постов авторов и групп'
+
+    def handle(self, *args, **options):
+        rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано счётчиков: {PostCounter.objects.count()}'
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from posts import shards
+from posts.models import Post
+from posts.rendering import backfill
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает готовый HTML текста и анонса постов, например '
+        'после смены EXCERPT_LENGTH'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Постов в одном UPDATE'
+        )
+        parser.add_argument(
+            '--missing', action='store_true',
+            help='Только посты без готового HTML'
+        )
+
+    def handle(self, *args, **options):
+        count = 0
+        for database in shards.post_databases():
+            posts = Post.objects.using(database)
+            if options['missing']:
+                posts = posts.filter(text_html='')
+            count += backfill(posts, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Обновлено постов: {count}'))
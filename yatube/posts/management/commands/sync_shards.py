@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import shards
+from posts.models import Group, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует пользователей и группы во все шарды постов: например, '
+        'после подключения шардов к БД с готовыми пользователями'
+    )
+
+    def handle(self, *args, **options):
+        if not shards.enabled():
+            raise CommandError('Шарды не настроены: YATUBE_DB_SHARDS пуст')
+        for model in (User, Group):
+            count = 0
+            for instance in model.objects.using('default').iterator():
+                shards.mirror(instance)
+                count += 1
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {count}')
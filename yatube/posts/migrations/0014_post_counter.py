@@ -0,0 +1,55 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    # migrate --database=shardN заполняет таблицы своей БД
+    alias = schema_editor.connection.alias
+    Post = apps.get_model('posts', 'Post')
+    PostCounter = apps.get_model('posts', 'PostCounter')
+    posts = Post.objects.using(alias).order_by()
+    PostCounter.objects.using(alias).bulk_create(
+        [
+            PostCounter(author_id=author_id, value=value)
+            for author_id, value in posts.values_list(
+                'author'
+            ).annotate(models.Count('pk'))
+        ] + [
+            PostCounter(group_id=group_id, value=value)
+            for group_id, value in posts.filter(
+                group__isnull=False
+            ).values_list('group').annotate(models.Count('pk'))
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0013_auto_20220322_2058'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostCounter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.PositiveIntegerField(default=0, verbose_name='Число постов')),
+                ('author', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='post_counter', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('group', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='post_counter', to='posts.Group', verbose_name='Группа')),
+            ],
+            options={
+                'verbose_name': 'Счётчик постов',
+                'verbose_name_plural': 'Счётчики постов',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='postcounter',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('author__isnull', False), ('group__isnull', True)), models.Q(('author__isnull', True), ('group__isnull', False)), _connector='OR'), name='post_counter_author_xor_group'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
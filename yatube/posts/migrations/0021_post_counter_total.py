@@ -0,0 +1,47 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:17
+
+from django.db import migrations, models
+
+
+def fill_total(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    Post = apps.get_model('posts', 'Post')
+    PostCounter = apps.get_model('posts', 'PostCounter')
+    PostCounter.objects.using(alias).create(
+        total=True, value=Post.objects.using(alias).count()
+    )
+
+
+def drop_total(apps, schema_editor):
+    PostCounter = apps.get_model('posts', 'PostCounter')
+    PostCounter.objects.using(schema_editor.connection.alias).filter(
+        total=True
+    ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_post_image_upload_to'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='postcounter',
+            name='post_counter_author_xor_group',
+        ),
+        migrations.AddField(
+            model_name='postcounter',
+            name='total',
+            field=models.BooleanField(default=False, verbose_name='Все посты'),
+        ),
+        migrations.AddConstraint(
+            model_name='postcounter',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('author__isnull', False), ('group__isnull', True), ('total', False)), models.Q(('author__isnull', True), ('group__isnull', False), ('total', False)), models.Q(('author__isnull', True), ('group__isnull', True), ('total', True)), _connector='OR'), name='post_counter_single_scope'),
+        ),
+        migrations.AddConstraint(
+            model_name='postcounter',
+            constraint=models.UniqueConstraint(condition=models.Q(total=True), fields=('total',), name='post_counter_single_total'),
+        ),
+        migrations.RunPython(fill_total, drop_total),
+    ]
@@ -1,9 +1,45 @@
+import hashlib
+import os
+from contextlib import ExitStack
+
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import (
+    DEFAULT_DB_ALIAS, connections, models, router, transaction
+)
+from django.dispatch import Signal
+
+from core import paths
+from core.db import retry_on_lock
 
+from .rendering import render_text
 
 User = get_user_model()
 
+# Сколько постов обновлять одним UPDATE в PostQuerySet.bulk_create с
+# keep_dates: SQLite ограничивает число параметров запроса
+KEEP_DATES_CHUNK = 100
+
+# Вместо post_save для постов PostQuerySet.bulk_create: отправляется в
+# транзакции вставки, получатели поддерживают счётчики и кэш
+bulk_created = Signal(providing_args=['posts', 'using'])
+
+
+def profile_url(username):
+    return paths.build('posts:profile', username)
+
+
+def image_upload_to(instance, filename):
+    """
+    Имя картинки с хэшем содержимого, как у ManifestStaticFilesStorage:
+    под одним именем всегда один и тот же файл, и его можно кэшировать
+    навечно.
+    """
+    digest = hashlib.md5()
+    for chunk in instance.image.chunks():
+        digest.update(chunk)
+    name, ext = os.path.splitext(os.path.basename(filename))
+    return f'posts/{name}.{digest.hexdigest()[:12]}{ext}'
+
 
 class Group(models.Model):
     title = models.CharField(
@@ -23,6 +59,103 @@ class Group(models.Model):
     def __str__(self):
         return self.title
 
+    def get_absolute_url(self):
+        return paths.build('posts:group_list', self.slug)
+
+
+class PostQuerySet(models.QuerySet):
+
+    def for_feed(self):
+        """
+        Посты для лент: автор и группа подтягиваются одним JOIN,
+        из связанных таблиц читаются только выводимые в шаблонах поля.
+        """
+        return self.select_related('author', 'group').only(
+            'text', 'text_html', 'excerpt_html', 'is_truncated',
+            'pub_date', 'updated_at', 'image', 'author', 'group',
+            'author__username', 'author__first_name', 'author__last_name',
+            'group__title', 'group__slug',
+        )
+
+    def create(self, **kwargs):
+        # Без явного using() БД выбирает роутер по самому посту: при
+        # шардировании - шард автора
+        post = self.model(**kwargs)
+        post.save(force_insert=True, using=self._db)
+        return post
+
+    def _keep_dates(self, objs, dates, last_id):
+        """
+        Возвращает постам даты, заданные до вставки: auto_now_add и
+        auto_now заменили их временем вставки.
+        """
+        if objs[0].pk is None:
+            # SQLite не возвращает id вставленных строк: это строки с id
+            # больше last_id, в порядке вставки. last_id, INSERT и это
+            # чтение - одна транзакция, и SQLite не даст другому писателю
+            # вклиниться: чужая запись после чтения last_id делает INSERT
+            # ошибкой «database is locked», и bulk_create повторяет пачку
+            ids = self.model.objects.using(self.db).filter(
+                pk__gt=last_id
+            ).order_by('pk').values_list('pk', flat=True)
+            for post, pk in zip(objs, ids):
+                post.pk = pk
+        kept = [(post, date) for post, date in zip(objs, dates) if date]
+        for start in range(0, len(kept), KEEP_DATES_CHUNK):
+            chunk = kept[start:start + KEEP_DATES_CHUNK]
+            self.model.objects.using(self.db).filter(
+                pk__in=[post.pk for post, _ in chunk]
+            ).update(**{
+                field: models.Case(
+                    *[
+                        models.When(pk=post.pk, then=models.Value(date))
+                        for post, date in chunk
+                    ],
+                    output_field=models.DateTimeField()
+                )
+                for field in ('pub_date', 'updated_at')
+            })
+            for post, date in chunk:
+                post.pub_date = post.updated_at = date
+
+    def bulk_create(self, objs, *args, keep_dates=False, **kwargs):
+        """
+        bulk_create с записями ленты и сигналом bulk_created. При
+        keep_dates заданная у поста pub_date (она же updated_at)
+        сохраняется вместо времени вставки - для импорта архива.
+        """
+        # post_save не вызывается: записи ленты добавляются одним
+        # INSERT ... SELECT для постов с id больше прежнего максимума,
+        # счётчики обновляют получатели bulk_created
+        objs = list(objs)
+        for post in objs:
+            post.render_text()
+        dates = [post.pub_date for post in objs]
+        return retry_on_lock(self._bulk_create)(
+            objs, dates, keep_dates, *args, **kwargs
+        )
+
+    def _bulk_create(self, objs, dates, keep_dates, *args, **kwargs):
+        # Счётчики - в БД по умолчанию (её транзакцию открывает
+        # retry_on_lock), посты и лента - в БД queryset
+        with ExitStack() as stack:
+            if self.db != DEFAULT_DB_ALIAS:
+                stack.enter_context(transaction.atomic(using=self.db))
+            last_id = self.model.objects.using(self.db).order_by(
+                '-pk'
+            ).values_list('pk', flat=True).first()
+            objs = super().bulk_create(objs, *args, **kwargs)
+            if keep_dates and any(dates):
+                # До записей ленты: они копируют pub_date постов
+                self._keep_dates(objs, dates, last_id or 0)
+            FeedEntry.objects.using(self.db).append(last_id or 0)
+            bulk_created.send(self.model, posts=objs, using=self.db)
+        return objs
+
+
+# Поля, которые Post.render_text() вычисляет по text
+RENDERED_FIELDS = ('text_html', 'excerpt_html', 'is_truncated')
+
 
 class Post(models.Model):
     text = models.TextField(
@@ -33,6 +166,10 @@ class Post(models.Model):
         auto_now_add=True,
         verbose_name='Дата публикации'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -48,11 +185,212 @@ class Post(models.Model):
         verbose_name='Группа',
         help_text='Группа, к которой будет относиться пост'
     )
+    image = models.ImageField(
+        upload_to=image_upload_to,
+        blank=True,
+        verbose_name='Картинка',
+        help_text='Картинка к посту'
+    )
+    # Готовый HTML текста и анонса: шаблоны лент не прогоняют текст
+    # через linebreaks и truncatechars при каждой отрисовке
+    text_html = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name='HTML текста'
+    )
+    excerpt_html = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name='HTML анонса'
+    )
+    is_truncated = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Анонс обрезан'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
+        # Ленты читаются из FeedEntry; по ordering постов без фильтров
+        # листается список постов в админке (explain_feeds, admin)
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'], name='post_feed_idx'),
+        ]
 
     def __str__(self):
         return self.text[:15]
+
+    def get_absolute_url(self):
+        return paths.build('posts:post_detail', self.pk)
+
+    def get_author_url(self):
+        return profile_url(self.author.username)
+
+    def render_text(self):
+        """Заново строит HTML текста и анонса по text."""
+        self.text_html, self.excerpt_html, self.is_truncated = render_text(
+            self.text
+        )
+
+    def save(self, *args, **kwargs):
+        self.render_text()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, *RENDERED_FIELDS}
+        # Счётчики PostCounter обновляются сигналами в той же транзакции;
+        # у поста из шарда - своя транзакция в шарде для записи ленты
+        using = kwargs.get('using') or router.db_for_write(
+            Post, instance=self
+        )
+        with ExitStack() as stack:
+            stack.enter_context(transaction.atomic())
+            if using != DEFAULT_DB_ALIAS:
+                stack.enter_context(transaction.atomic(using=using))
+            super().save(*args, **kwargs)
+
+
+class PostCounter(models.Model):
+    """
+    Денормализованное число постов автора либо группы. Единственная
+    строка с total - число постов общей ленты.
+    """
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='post_counter',
+        blank=True,
+        null=True,
+        verbose_name='Автор'
+    )
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='post_counter',
+        blank=True,
+        null=True,
+        verbose_name='Группа'
+    )
+    total = models.BooleanField(
+        default=False,
+        verbose_name='Все посты'
+    )
+    value = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число постов'
+    )
+
+    class Meta:
+        verbose_name = 'Счётчик постов'
+        verbose_name_plural = 'Счётчики постов'
+        constraints = [
+            models.CheckConstraint(
+                check=(
+                    models.Q(
+                        author__isnull=False, group__isnull=True, total=False
+                    )
+                    | models.Q(
+                        author__isnull=True, group__isnull=False, total=False
+                    )
+                    | models.Q(
+                        author__isnull=True, group__isnull=True, total=True
+                    )
+                ),
+                name='post_counter_single_scope',
+            ),
+            models.UniqueConstraint(
+                fields=['total'],
+                condition=models.Q(total=True),
+                name='post_counter_single_total',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.author or self.group or "Все посты"}: {self.value}'
+
+
+class FeedEntryQuerySet(models.QuerySet):
+
+    def _insert_from_posts(self, where='', params=()):
+        """INSERT ... SELECT записей для постов, отобранных условием where."""
+        quote = connections[self.db].ops.quote_name
+        entry = quote(self.model._meta.db_table)
+        post = quote(Post._meta.db_table)
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {entry} (post_id, pub_date, author_id, '
+                f'group_id) SELECT id, pub_date, author_id, group_id '
+                f'FROM {post} ' + where.format(entry=entry, post=post),
+                params
+            )
+
+    def append(self, after_id):
+        """Добавляет записи для постов с id больше after_id."""
+        self._insert_from_posts(
+            'WHERE {post}.id > %s AND NOT EXISTS (SELECT 1 FROM {entry} '
+            'WHERE {entry}.post_id = {post}.id)',
+            [after_id]
+        )
+
+    def rebuild(self):
+        """Пересоздает ленту по таблице постов."""
+        with transaction.atomic(using=self.db):
+            self.all().delete()
+            self._insert_from_posts()
+
+
+class FeedEntry(models.Model):
+    """
+    Запись материализованной ленты: ключ сортировки и поля фильтров
+    без текста поста. Ленты читают из неё срезы id.
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='feed_entry',
+        verbose_name='Пост'
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False,
+        verbose_name='Автор'
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        blank=True,
+        null=True,
+        db_index=False,
+        verbose_name='Группа'
+    )
+
+    objects = FeedEntryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        ordering = ('-pub_date', '-post_id')
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-post'], name='feed_entry_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-post'],
+                name='feed_entry_group_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-post'],
+                name='feed_entry_author_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id}: {self.pub_date}'
@@ -0,0 +1,199 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition
+
+from core.routers import replica
+
+from . import shards
+from .models import Post
+
+# Поколение, общее для всех страниц: меняется при правке групп и имен
+# авторов, которые выводятся во всех лентах
+SITE = 'site'
+# Поколение главной ленты
+INDEX = 'index'
+
+
+def group_scope(slug):
+    return f'group:{slug}'
+
+
+def author_scope(username):
+    return f'author:{username}'
+
+
+def _generation_key(scope):
+    return f'posts:generation:{scope}'
+
+
+def _now():
+    return int(time.time() * 1000)
+
+
+def generations(*scopes):
+    """
+    Текущие поколения областей - время их последнего изменения в мс.
+    Вытесненное из кэша поколение заводится заново текущим временем,
+    поэтому страницы, закэшированные до вытеснения, не используются.
+    """
+    keys = [_generation_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, _now(), None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def bump(*scopes):
+    """Сдвигает поколения областей: их закэшированные страницы устаревают."""
+    keys = [_generation_key(scope) for scope in scopes]
+    current = cache.get_many(keys)
+    cache.set_many({
+        key: max(_now(), current.get(key, 0) + 1) for key in keys
+    }, None)
+
+
+def _versions(request, scope):
+    """Поколения SITE и области страницы, одни на весь запрос."""
+    if not hasattr(request, '_page_versions'):
+        request._page_versions = generations(SITE, scope)
+    return request._page_versions
+
+
+def _timestamp(milliseconds):
+    return datetime.fromtimestamp(milliseconds / 1000, timezone.utc)
+
+
+def _digest(*parts):
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def feed_condition(scope):
+    """
+    Условный GET для ленты: валидаторы строятся из поколений ленты без
+    запросов к БД, ETag учитывает страницу и пользователя (шапка сайта
+    у каждого своя). Страница с реплики валидаторов не получает: она
+    могла не застать правку, уже сдвинувшую поколение.
+    """
+    def etag(request, **kwargs):
+        if replica():
+            return None
+        return _digest(
+            request.path,
+            request.GET.get('page'),
+            request.GET.get('cursor'),
+            _versions(request, scope(**kwargs)),
+            request.user.pk,
+        )
+
+    def last_modified(request, **kwargs):
+        if replica():
+            return None
+        return _timestamp(max(_versions(request, scope(**kwargs))))
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def _post_state(request, post_id):
+    if not hasattr(request, '_post_state'):
+        request._post_state = Post.objects.using(
+            shards.database_for_post(post_id)
+        ).filter(pk=post_id).values_list(
+            'pub_date', 'updated_at', 'author__username'
+        ).first()
+    return request._post_state
+
+
+def _post_versions(request, post_id):
+    """
+    Поколения SITE и ленты автора поста: новые посты автора меняют число
+    в карточке, а посты других авторов страницу поста не меняют.
+    """
+    return _versions(request, author_scope(_post_state(request, post_id)[2]))
+
+
+def _post_etag(request, post_id):
+    state = None if replica() else _post_state(request, post_id)
+    if state is None:
+        return None
+    pub_date, updated_at = state[:2]
+    return _digest(
+        post_id,
+        pub_date.timestamp(),
+        updated_at.timestamp(),
+        _post_versions(request, post_id),
+        request.user.pk,
+    )
+
+
+def _post_last_modified(request, post_id):
+    state = None if replica() else _post_state(request, post_id)
+    if state is None:
+        return None
+    # Новые посты автора (число в карточке) и правки групп и имен не
+    # меняют updated_at, но сдвигают поколения ленты автора и SITE
+    return max(
+        state[1], _timestamp(max(_post_versions(request, post_id)))
+    )
+
+
+# Условный GET для страницы поста: дата публикации, дата изменения,
+# поколения SITE и ленты автора и пользователь; с реплики - без них
+post_condition = condition(
+    etag_func=_post_etag, last_modified_func=_post_last_modified
+)
+
+
+def anonymous_page_cache(scope):
+    """
+    Кэширует страницу для анонимных GET/HEAD-запросов.
+    scope(**kwargs) по аргументам view возвращает область страницы;
+    ключ строится из пути, параметров page/cursor и поколений SITE и
+    области. ETag и Last-Modified выставляет feed_condition.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            timeout = settings.POSTS_PAGE_CACHE_TIMEOUT
+            if replica():
+                # Страница с отстающей реплики может не содержать правку,
+                # уже сдвинувшую поколение: храним её не дольше отставания
+                timeout = min(timeout, settings.DATABASE_REPLICA_LAG)
+            if (
+                not timeout
+                or request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated
+            ):
+                return view(request, *args, **kwargs)
+            key = 'posts:page:' + _digest(
+                request.path,
+                request.GET.get('page'),
+                request.GET.get('cursor'),
+                _versions(request, scope(**kwargs)),
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+            else:
+                response = view(request, *args, **kwargs)
+                if (
+                    response.status_code == 200
+                    and not request.META.get('CSRF_COOKIE_USED')
+                    and not response.cookies
+                ):
+                    cache.set(key, (
+                        response.content, response['Content-Type']
+                    ), timeout)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
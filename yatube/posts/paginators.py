@@ -0,0 +1,222 @@
+import collections.abc
+
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import force_bytes
+from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from .settings import NUMBERED_PAGES, PAGE_WINDOW
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class WindowedPage(Page):
+
+    @property
+    def last_number(self):
+        """
+        Номер последней страницы, доступной по номеру: первые
+        NUMBERED_PAGES страниц и текущая.
+        """
+        return min(
+            self.paginator.num_pages, max(NUMBERED_PAGES, self.number)
+        )
+
+    @property
+    def page_window(self):
+        """
+        Номера страниц для навигации: первая, последняя из доступных по
+        номеру и PAGE_WINDOW соседей текущей; пропуски обозначены None.
+        """
+        last = self.last_number
+        numbers = sorted({1, last} | set(range(
+            max(1, self.number - PAGE_WINDOW),
+            min(last, self.number + PAGE_WINDOW) + 1
+        )))
+        window = []
+        for previous, number in zip([0] + numbers, numbers):
+            if number - previous > 1:
+                window.append(None)
+            window.append(number)
+        return window
+
+    @property
+    def next_cursor(self):
+        """
+        Курсор следующей страницы, если она уже не доступна по номеру.
+        """
+        if self.has_next() and self.number >= self.last_number:
+            return CursorPaginator.encode(NEXT, self.object_list[-1])
+        return None
+
+
+class CountedPaginator(Paginator):
+    """
+    Пагинатор, получающий число объектов от функции count (например,
+    из кэша счётчиков) вместо COUNT(*) по всему queryset.
+    """
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._count = count
+
+    @cached_property
+    def count(self):
+        if self._count is None:
+            return super().count
+        return self._count()
+
+    def _set_count(self, count):
+        self.count = count
+        self.__dict__.pop('num_pages', None)
+
+    def page(self, number):
+        """
+        Страница по номеру. Счётчик может быть приблизительным, поэтому
+        верхняя граница номера проверяется по выборке, а не по count:
+        читается на одну запись больше страницы, и count уточняется.
+        Номера дальше count больше чем на страницу отсекаются без запроса.
+        """
+        if isinstance(number, float) and not number.is_integer():
+            raise PageNotAnInteger(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(number)
+        if number < 1 or number > self.num_pages + 1:
+            raise EmptyPage(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if len(rows) > self.per_page:
+            self._set_count(max(self.count, bottom + len(rows)))
+        elif rows or number == 1:
+            self._set_count(bottom + len(rows))
+        else:
+            raise EmptyPage(number)
+        return self._get_page(rows[:self.per_page], number, self)
+
+    def get_page(self, number):
+        try:
+            return self.page(number)
+        except PageNotAnInteger:
+            return self.page(1)
+        except EmptyPage:
+            pass
+        try:
+            return self.page(self.num_pages)
+        except EmptyPage:
+            return self.page(1)
+
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
+
+
+class CursorPage(collections.abc.Sequence):
+    """
+    Страница ленты, выбранная по курсору, без подсчёта общего числа.
+    Номера и места в ленте у нее нет, поэтому это не Page.
+    """
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return '<Cursor page>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self.has_next():
+            return self.paginator.encode(NEXT, self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous():
+            return self.paginator.encode(PREVIOUS, self.object_list[0])
+        return None
+
+
+class CursorPaginator(Paginator):
+    """
+    Пагинатор по ключу (pub_date, pk): страница выбирается условием
+    WHERE по последней записи предыдущей страницы, без OFFSET и COUNT(*).
+    """
+    is_cursor = True
+
+    @staticmethod
+    def encode(direction, post):
+        return urlsafe_base64_encode(force_bytes(
+            f'{direction}|{post.pub_date.isoformat()}|{post.pk}'
+        ))
+
+    def decode(self, cursor):
+        try:
+            direction, pub_date, pk = urlsafe_base64_decode(
+                cursor
+            ).decode().split('|')
+            pub_date = parse_datetime(pub_date)
+            pk = int(pk)
+        except (TypeError, ValueError):
+            raise InvalidCursor(cursor)
+        if direction not in (NEXT, PREVIOUS) or pub_date is None:
+            raise InvalidCursor(cursor)
+        return direction, pub_date, pk
+
+    def get_page(self, cursor):
+        """Возвращает страницу по курсору; для пустого или битого - первую."""
+        try:
+            direction, pub_date, pk = self.decode(cursor)
+        except InvalidCursor:
+            return self._first_page()
+        if direction == NEXT:
+            rows = list(self.object_list.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            ).order_by('-pub_date', '-pk')[:self.per_page + 1])
+            return CursorPage(
+                rows[:self.per_page], self,
+                has_next=len(rows) > self.per_page,
+                has_previous=True,
+            )
+        rows = list(self.object_list.filter(
+            Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+        ).order_by('pub_date', 'pk')[:self.per_page + 1])
+        return CursorPage(
+            rows[:self.per_page][::-1], self,
+            has_next=True,
+            has_previous=len(rows) > self.per_page,
+        )
+
+    def _first_page(self):
+        rows = list(
+            self.object_list.order_by('-pub_date', '-pk')[:self.per_page + 1]
+        )
+        return CursorPage(
+            rows[:self.per_page], self,
+            has_next=len(rows) > self.per_page,
+            has_previous=False,
+        )
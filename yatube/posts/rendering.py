@@ -0,0 +1,45 @@
+from django.template.defaultfilters import linebreaks_filter, truncatechars
+
+from .settings import EXCERPT_LENGTH
+
+
+def render_text(text):
+    """
+    HTML текста поста, как {{ text|linebreaks }}, и анонса, как
+    {{ text|truncatechars:EXCERPT_LENGTH|linebreaks }}, с экранированием;
+    третье значение - обрезан ли анонс.
+    """
+    html = linebreaks_filter(text, autoescape=True)
+    if len(text) <= EXCERPT_LENGTH:
+        return html, html, False
+    excerpt = linebreaks_filter(
+        truncatechars(text, EXCERPT_LENGTH), autoescape=True
+    )
+    return html, excerpt, True
+
+
+def backfill(posts, batch_size=500):
+    """
+    Пересчитывает HTML текста и анонса постов queryset posts пачками
+    по возрастанию pk; возвращает число постов. Работает и с
+    историческими моделями миграций.
+    """
+    count, last_pk = 0, 0
+    rows = posts.model._base_manager.using(posts.db)
+    while True:
+        batch = list(
+            posts.filter(pk__gt=last_pk).order_by('pk').only('text')[
+                :batch_size
+            ]
+        )
+        if not batch:
+            return count
+        for post in batch:
+            post.text_html, post.excerpt_html, post.is_truncated = (
+                render_text(post.text)
+            )
+        rows.bulk_update(
+            batch, ['text_html', 'excerpt_html', 'is_truncated']
+        )
+        count += len(batch)
+        last_pk = batch[-1].pk
@@ -0,0 +1,236 @@
+import heapq
+import re
+from itertools import islice
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models.expressions import RawSQL
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+from django.utils.module_loading import import_string
+
+from . import shards
+from .models import Post
+
+# Управляющие символы: NUL обрывает строку запроса FTS5
+CONTROL_CHARACTERS = re.compile(r'[\x00-\x1f\x7f]')
+
+
+class SimpleBackend:
+    """Поиск подстрок без индекса: для СУБД без полнотекстового поиска."""
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.using = using
+        self.connection = connections[using]
+
+    def install(self):
+        pass
+
+    def rebuild(self):
+        pass
+
+    @staticmethod
+    def terms(query):
+        """Слова запроса без управляющих символов."""
+        return CONTROL_CHARACTERS.sub(' ', query).split()
+
+    def filter(self, queryset, query):
+        for term in self.terms(query):
+            queryset = queryset.filter(text__icontains=term)
+        return queryset
+
+    def search(self, query, after=None, limit=10):
+        """
+        Список (score, pk) лучших совпадений по возрастанию score, pk;
+        after - пара (score, pk), после которой продолжать выдачу.
+        """
+        if not self.terms(query):
+            return []
+        posts = self.filter(
+            Post.objects.using(self.using).order_by('-pk'), query
+        )
+        if after is not None:
+            posts = posts.filter(pk__lt=after[1])
+        return [(-pk, pk) for pk in posts.values_list('pk', flat=True)[
+            :limit
+        ]]
+
+
+class SQLiteFTSBackend(SimpleBackend):
+    """
+    Инвертированный индекс FTS5 над posts_post.text (external content),
+    синхронизируемый триггерами; ранжирование по bm25.
+    """
+    table = 'posts_post_fts'
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT 1 FROM sqlite_master WHERE name = %s', [self.table]
+            )
+            created = cursor.fetchone() is None
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} '
+                f"USING fts5(text, content='posts_post', content_rowid='id', "
+                f"tokenize='unicode61')"
+            )
+            # Триггеры ставятся заново после каждой миграции: SQLite
+            # пересоздает posts_post при изменении схемы, теряя их
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {self.table}_ai '
+                f'AFTER INSERT ON posts_post BEGIN '
+                f'INSERT INTO {self.table}(rowid, text) '
+                f'VALUES (new.id, new.text); END'
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {self.table}_ad '
+                f'AFTER DELETE ON posts_post BEGIN '
+                f'INSERT INTO {self.table}({self.table}, rowid, text) '
+                f"VALUES ('delete', old.id, old.text); END"
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {self.table}_au '
+                f'AFTER UPDATE OF text ON posts_post BEGIN '
+                f'INSERT INTO {self.table}({self.table}, rowid, text) '
+                f"VALUES ('delete', old.id, old.text); "
+                f'INSERT INTO {self.table}(rowid, text) '
+                f'VALUES (new.id, new.text); END'
+            )
+        if created:
+            self.rebuild()
+
+    def rebuild(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {self.table}({self.table}) VALUES ('rebuild')"
+            )
+
+    def match(self, query):
+        # Каждое слово - отдельная фраза: пользовательский ввод не
+        # разбирается как синтаксис запросов FTS5
+        return ' '.join(
+            '"{}"'.format(term.replace('"', '""'))
+            for term in self.terms(query)
+        )
+
+    def filter(self, queryset, query):
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s',
+            [self.match(query)]
+        ))
+
+    def search(self, query, after=None, limit=10):
+        if not self.terms(query):
+            return []
+        sql = (
+            f'SELECT rank, rowid FROM {self.table} '
+            f'WHERE {self.table} MATCH %s'
+        )
+        params = [self.match(query)]
+        if after is not None:
+            sql += ' AND (rank > %s OR (rank = %s AND rowid > %s))'
+            params += [after[0], after[0], after[1]]
+        sql += ' ORDER BY rank, rowid LIMIT %s'
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params + [limit])
+            return cursor.fetchall()
+
+
+class PostgresBackend(SimpleBackend):
+    """Поиск по to_tsvector(text) с GIN-индексом; ранжирование ts_rank."""
+    vector = "to_tsvector('{config}', text)"
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        super().__init__(using)
+        self.config = settings.POSTS_SEARCH_CONFIG
+        self.vector = self.vector.format(config=self.config)
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS posts_post_text_tsv '
+                f'ON posts_post USING GIN ({self.vector})'
+            )
+
+    def filter(self, queryset, query):
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT id FROM posts_post WHERE {self.vector} '
+            f"@@ plainto_tsquery('{self.config}', %s)",
+            [' '.join(self.terms(query))]
+        ))
+
+    def search(self, query, after=None, limit=10):
+        query = ' '.join(self.terms(query))
+        if not query:
+            return []
+        score = (
+            f"-ts_rank({self.vector}, plainto_tsquery('{self.config}', %s))"
+        )
+        sql = (
+            f'SELECT * FROM (SELECT {score} AS score, id FROM posts_post '
+            f"WHERE {self.vector} @@ plainto_tsquery('{self.config}', %s)"
+            f') AS found'
+        )
+        params = [query, query]
+        if after is not None:
+            sql += ' WHERE score > %s OR (score = %s AND id > %s)'
+            params += [after[0], after[0], after[1]]
+        sql += ' ORDER BY score, id LIMIT %s'
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params + [limit])
+            return cursor.fetchall()
+
+
+BACKENDS = {
+    'sqlite': 'posts.search.SQLiteFTSBackend',
+    'postgresql': 'posts.search.PostgresBackend',
+}
+
+
+def get_backend(using=DEFAULT_DB_ALIAS):
+    """Бэкенд из POSTS_SEARCH_BACKEND, по умолчанию - по СУБД."""
+    path = settings.POSTS_SEARCH_BACKEND or BACKENDS.get(
+        connections[using].vendor, 'posts.search.SimpleBackend'
+    )
+    return import_string(path)(using)
+
+
+def install_index(using=DEFAULT_DB_ALIAS, **kwargs):
+    """Обработчик post_migrate: создает индекс и триггеры бэкенда."""
+    get_backend(using).install()
+
+
+def encode_cursor(score, pk):
+    return urlsafe_base64_encode(force_bytes(f'{score!r}|{pk}'))
+
+
+def decode_cursor(cursor):
+    try:
+        score, pk = urlsafe_base64_decode(cursor).decode().split('|')
+        return float(score), int(pk)
+    except (TypeError, ValueError):
+        return None
+
+
+def search_posts(query, cursor=None, limit=10):
+    """
+    Страница результатов поиска: посты в порядке релевантности и курсор
+    следующей страницы (None, если она пуста). При шардировании выдачи
+    шардов сливаются по (score, pk).
+    """
+    after = decode_cursor(cursor) if cursor else None
+    found = list(islice(heapq.merge(*[
+        get_backend(database or DEFAULT_DB_ALIAS).search(
+            query, after, limit + 1
+        )
+        for database in shards.post_databases()
+    ]), limit + 1))
+    posts = {}
+    for queryset in shards.post_querysets(
+        pk__in=[pk for _, pk in found[:limit]]
+    ):
+        posts.update(queryset.for_feed().in_bulk())
+    next_cursor = None
+    if len(found) > limit:
+        next_cursor = encode_cursor(*found[limit - 1])
+    return [posts[pk] for _, pk in found[:limit] if pk in posts], next_cursor
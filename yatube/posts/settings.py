@@ -1,2 +1,19 @@
 # Кастомные константы приложения Posts
 POSTS_ON_PAGE = 10
+# Сколько соседних номеров страниц показывать слева и справа от текущей
+PAGE_WINDOW = 2
+# Сколько первых страниц ленты открываются по номеру (?page=N); дальше
+# навигация идет по курсору, без OFFSET
+NUMBERED_PAGES = 5
+# Время жизни закэшированных счётчиков постов в лентах, секунды
+FEED_COUNT_TTL = 60 * 15
+# Сколько секунд после FEED_COUNT_TTL отдавать прежнее число, пока оно
+# пересчитывается
+FEED_COUNT_STALE = 60
+# Размеры миниатюр картинок постов: геометрия и параметры sorl-thumbnail.
+# Создаются при загрузке картинки, шаблоны берут только готовые
+THUMBNAIL_SIZES = {
+    'card': ('960x339', {'crop': 'center', 'upscale': True}),
+}
+# Длина анонса поста в ленте профиля, символов
+EXCERPT_LENGTH = 300
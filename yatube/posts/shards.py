@@ -0,0 +1,234 @@
+import heapq
+import random
+import threading
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import Post
+
+# Id поста в шардированном режиме: миллисекунды от EPOCH_MS, номер
+# шарда и счётчик. Id уникальны без общей последовательности, а шард
+# поста читается из его id
+EPOCH_MS = 1_577_836_800_000  # 2020-01-01
+SHARD_BITS = 6
+SEQUENCE_BITS = 14
+SHARD_MASK = (1 << SHARD_BITS) - 1
+SEQUENCE_MASK = (1 << SEQUENCE_BITS) - 1
+
+SHARDED_MODELS = ('posts.Post', 'posts.FeedEntry')
+
+
+def enabled():
+    return bool(settings.POSTS_SHARDS)
+
+
+def post_databases():
+    """БД с постами: шарды либо одна БД по умолчанию (None - роутеры)."""
+    return settings.POSTS_SHARDS or [None]
+
+
+def shard_for_author(author_id):
+    """Карта шардов: посты автора живут в шарде по остатку от его id."""
+    shards = settings.POSTS_SHARDS
+    return shards[author_id % len(shards)]
+
+
+def database_for_author(author_id):
+    """Шард постов автора; без шардирования - None."""
+    return shard_for_author(author_id) if enabled() else None
+
+
+def database_for_post(post_id):
+    """Шард поста по его id; без шардирования - None."""
+    if not enabled():
+        return None
+    index = (post_id >> SEQUENCE_BITS) & SHARD_MASK
+    shards = settings.POSTS_SHARDS
+    # Чужой id ищется в БД по умолчанию, где постов нет: будет 404
+    return shards[index] if index < len(shards) else DEFAULT_DB_ALIAS
+
+
+class IdGenerator:
+    """
+    Генератор id постов. Счётчик внутри миллисекунды начинается со
+    случайного числа, чтобы процессы, пишущие в один шард, не совпадали.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last_ms = 0
+        self.sequence = 0
+
+    def __call__(self, shard_index):
+        with self.lock:
+            now = int(time.time() * 1000) - EPOCH_MS
+            if now > self.last_ms:
+                self.last_ms = now
+                self.sequence = random.randrange(SEQUENCE_MASK + 1) // 2
+            else:
+                self.sequence += 1
+                if self.sequence > SEQUENCE_MASK:
+                    # Счётчик исчерпан: берем следующую миллисекунду
+                    self.last_ms += 1
+                    self.sequence = 0
+            return (
+                self.last_ms << (SHARD_BITS + SEQUENCE_BITS)
+                | shard_index << SEQUENCE_BITS
+                | self.sequence
+            )
+
+
+next_id = IdGenerator()
+
+
+def new_post_id(author_id):
+    shard = shard_for_author(author_id)
+    return next_id(settings.POSTS_SHARDS.index(shard))
+
+
+def post_querysets(**filters):
+    """Посты, отобранные filters, в каждой БД с постами."""
+    return [
+        Post.objects.using(database).filter(**filters)
+        for database in post_databases()
+    ]
+
+
+def count_posts(**filters):
+    return sum(queryset.count() for queryset in post_querysets(**filters))
+
+
+def bulk_create(posts, **kwargs):
+    """
+    Post.objects.bulk_create с раскладкой постов по шардам авторов.
+    Без save() сигнал не назначит id, поэтому они берутся здесь же.
+    """
+    if not enabled():
+        return Post.objects.bulk_create(posts, **kwargs)
+    by_shard = {}
+    for post in posts:
+        post.pk = new_post_id(post.author_id)
+        by_shard.setdefault(shard_for_author(post.author_id), []).append(post)
+    return [
+        post
+        for shard, shard_posts in by_shard.items()
+        for post in Post.objects.using(shard).bulk_create(
+            shard_posts, **kwargs
+        )
+    ]
+
+
+def mirror(instance):
+    """
+    Копирует пользователя или группу во все шарды: на них ссылаются
+    посты шарда.
+    """
+    model = type(instance)
+    fields = {
+        field.attname: getattr(instance, field.attname)
+        for field in model._meta.concrete_fields
+    }
+    for shard in settings.POSTS_SHARDS:
+        # Без save(): копия не должна вызывать сигналы
+        rows = model._base_manager.using(shard)
+        if not rows.filter(pk=instance.pk).update(**fields):
+            rows.bulk_create([model(**fields)])
+
+
+def unmirror(instance):
+    """Удаляет копии из шардов вместе с постами шарда (каскадом)."""
+    for shard in settings.POSTS_SHARDS:
+        type(instance)._base_manager.using(shard).filter(
+            pk=instance.pk
+        ).delete()
+
+
+class ShardRouter:
+    """
+    Посты и записи лент - в шард автора, если он известен из подсказки
+    instance (сохраняемый объект, связанный пост или автор). Выборки без
+    подсказки указывают БД явно через database_for_* из этого модуля.
+    """
+
+    def _database(self, model, instance=None, **hints):
+        if not enabled() or model._meta.label not in SHARDED_MODELS:
+            return None
+        if instance is None:
+            return None
+        if instance._meta.label == settings.AUTH_USER_MODEL:
+            return shard_for_author(instance.pk)
+        author_id = getattr(instance, 'author_id', None)
+        if author_id is not None:
+            return shard_for_author(author_id)
+        return None
+
+    db_for_read = _database
+    db_for_write = _database
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Пользователи и группы есть в каждом шарде
+        return True if enabled() else None
+
+
+class ShardedFeed:
+    """
+    Лента из нескольких шардов: срез [start:stop] читает первые stop
+    записей ленты каждого шарда и сливает их heapq.merge по ключу
+    (pub_date, post_id), затем догружает посты из их шардов.
+    Поддерживает тот же интерфейс, что posts.feeds.Feed.
+    """
+
+    def __init__(self, feeds, descending=True):
+        self.feeds = feeds
+        self.descending = descending
+
+    ordered = True
+
+    def filter(self, *args, **kwargs):
+        return ShardedFeed(
+            [feed.filter(*args, **kwargs) for feed in self.feeds],
+            self.descending
+        )
+
+    def order_by(self, *fields):
+        return ShardedFeed(
+            [feed.order_by(*fields) for feed in self.feeds],
+            fields[0].startswith('-')
+        )
+
+    def count(self):
+        return sum(feed.count() for feed in self.feeds)
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start, stop = key.start or 0, key.stop
+        keys = heapq.merge(
+            *[
+                [
+                    (pub_date, pk, feed)
+                    for pub_date, pk in feed.entries.values_list(
+                        'pub_date', 'pk'
+                    )[:stop]
+                ]
+                for feed in self.feeds
+            ],
+            key=lambda row: row[:2],
+            reverse=self.descending
+        )
+        rows = list(islice(keys, start, stop))
+        posts = {}
+        for feed in self.feeds:
+            ids = [pk for _, pk, source in rows if source is feed]
+            if ids:
+                posts.update(feed.posts(ids))
+        return [posts[pk] for _, pk, _ in rows if pk in posts]
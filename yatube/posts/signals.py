@@ -0,0 +1,205 @@
+from collections import Counter
+from itertools import chain
+
+from django.conf import settings
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from core.cache import invalidate, model_tag
+
+from . import counters, page_cache, shards, tasks
+from .fragments import forget_cards
+from .models import FeedEntry, Group, Post, User, bulk_created
+
+# Поля автора, которые выводятся в карточках постов
+AUTHOR_CARD_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def _image_name(instance):
+    image = instance.__dict__.get('image')
+    return getattr(image, 'name', image) or None
+
+
+@receiver(post_init, sender=Post)
+def remember_feeds(sender, instance, **kwargs):
+    """Запоминает группу, автора и картинку поста, с которыми он загружен."""
+    # Через __dict__, чтобы не догружать отложенные (only/defer) поля
+    instance._loaded_feeds = (
+        instance.__dict__.get('group_id'),
+        instance.__dict__.get('author_id'),
+    )
+    instance._loaded_image = _image_name(instance)
+
+
+@receiver(pre_save, sender=Post)
+def assign_shard_id(sender, instance, **kwargs):
+    # Автоинкремент шарда дал бы одинаковые id в разных шардах
+    if instance.pk is None and shards.enabled():
+        instance.pk = shards.new_post_id(instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+def update_counts_on_save(sender, instance, created, **kwargs):
+    if created:
+        counters.shift_counts(1, instance.group_id, instance.author_id)
+    else:
+        old_group_id, old_author_id = instance._loaded_feeds
+        if old_group_id != instance.group_id:
+            counters.shift_counts(-1, group_id=old_group_id, total=False)
+            counters.shift_counts(1, group_id=instance.group_id, total=False)
+        if old_author_id != instance.author_id:
+            counters.shift_counts(-1, author_id=old_author_id, total=False)
+            counters.shift_counts(
+                1, author_id=instance.author_id, total=False
+            )
+
+
+@receiver(bulk_created, sender=Post)
+def update_counts_on_bulk_create(sender, posts, **kwargs):
+    counters.shift_counts(len(posts))
+    for author_id, count in Counter(
+        post.author_id for post in posts
+    ).items():
+        counters.shift_counts(count, author_id=author_id, total=False)
+    for group_id, count in Counter(
+        post.group_id for post in posts if post.group_id is not None
+    ).items():
+        counters.shift_counts(count, group_id=group_id, total=False)
+
+
+@receiver(post_delete, sender=Post)
+def update_counts_on_delete(sender, instance, **kwargs):
+    counters.shift_counts(-1, instance.group_id, instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+def update_feed_entry(sender, instance, created, using, **kwargs):
+    # Запись ленты - в БД поста; удаляется вместе с ним каскадно
+    entries = FeedEntry.objects.db_manager(using)
+    fields = {
+        'pub_date': instance.pub_date,
+        'author_id': instance.author_id,
+        'group_id': instance.group_id,
+    }
+    if created:
+        entries.create(post=instance, **fields)
+    elif instance._loaded_feeds != (instance.group_id, instance.author_id):
+        if not entries.filter(post=instance).update(**fields):
+            entries.create(post=instance, **fields)
+
+
+@receiver(post_save, sender=Post)
+def schedule_thumbnails(sender, instance, **kwargs):
+    # Миниатюры создают воркеры очереди, а не запрос и не отрисовка ленты
+    if _image_name(instance) not in (None, instance._loaded_image):
+        tasks.generate_thumbnails.delay(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def forget_post_cards(sender, instance, **kwargs):
+    # При правке карточка устаревает сама: в её ключе есть updated_at
+    forget_cards([instance])
+
+
+def _bump_pages(group_ids, author_ids):
+    """Сдвигает поколения общей ленты и лент групп и авторов."""
+    page_cache.bump(
+        page_cache.INDEX,
+        *[
+            page_cache.group_scope(slug) for slug in Group.objects.filter(
+                pk__in=group_ids
+            ).values_list('slug', flat=True)
+        ],
+        *[
+            page_cache.author_scope(username)
+            for username in User.objects.filter(
+                pk__in=author_ids
+            ).values_list('username', flat=True)
+        ],
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_post_pages(sender, instance, **kwargs):
+    _bump_pages(
+        {instance.group_id, instance._loaded_feeds[0]} - {None},
+        {instance.author_id, instance._loaded_feeds[1]} - {None},
+    )
+
+
+@receiver(bulk_created, sender=Post)
+def bump_bulk_created_pages(sender, posts, **kwargs):
+    _bump_pages(
+        {post.group_id for post in posts} - {None},
+        {post.author_id for post in posts},
+    )
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_changed(sender, instance, created=False, **kwargs):
+    # pre_delete: после удаления группы у постов уже не будет group_id,
+    # поэтому их карточки перечисляются сразу, а сбрасываются в очереди
+    if kwargs['signal'] is pre_delete:
+        tasks.forget_post_cards.delay([
+            [pk, updated_at.isoformat()]
+            for pk, updated_at in chain.from_iterable(
+                posts.values_list('pk', 'updated_at')
+                for posts in shards.post_querysets(group=instance)
+            )
+        ])
+    elif not created:
+        tasks.forget_group_cards.delay(instance.pk)
+    page_cache.bump(page_cache.SITE)
+
+
+@receiver(post_init, sender=User)
+def remember_author_names(sender, instance, **kwargs):
+    instance._loaded_names = tuple(
+        instance.__dict__.get(field) for field in AUTHOR_CARD_FIELDS
+    )
+
+
+@receiver(post_save, sender=User)
+def author_changed(sender, instance, created, **kwargs):
+    names = tuple(getattr(instance, field) for field in AUTHOR_CARD_FIELDS)
+    if not created and names != instance._loaded_names:
+        invalidate(model_tag(User, instance.pk))
+        tasks.forget_author_cards.delay(instance.pk)
+        page_cache.bump(page_cache.SITE)
+    instance._loaded_names = names
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=User)
+def invalidate_cache_tags(sender, instance, **kwargs):
+    # Значения core.cache с тегом объекта; автора - при смене имени выше
+    invalidate(model_tag(sender, instance.pk))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_save, sender=User)
+def mirror_to_shards(sender, instance, using, **kwargs):
+    if using not in settings.POSTS_SHARDS:
+        shards.mirror(instance)
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=User)
+def unmirror_from_shards(sender, instance, using, **kwargs):
+    if using not in settings.POSTS_SHARDS:
+        shards.unmirror(instance)
+
+
+@receiver(post_save, sender=Post)
+def remember_saved_feeds(sender, instance, **kwargs):
+    # Подключен последним: обработчики выше видят прежние группу, автора
+    # и картинку
+    instance._loaded_feeds = (instance.group_id, instance.author_id)
+    instance._loaded_image = _image_name(instance)
@@ -0,0 +1,252 @@
+"""
+Статическая копия публичных страниц для анонимных пользователей.
+
+Страница с путем /group/slug/ лежит в group/slug/index.html каталога
+STATIC_SITE_ROOT, её N-я страница (?page=N) - в group/slug/page-N.html.
+Фронтовый веб-сервер отдает файл, если он есть и у запроса нет cookie
+сессии, иначе передает запрос Django.
+
+Сборка инкрементальная: manifest.json хранит подпись каждого файла -
+хэш состояния данных, из которых он отрисован, - и заново отрисовываются
+только файлы с изменившейся подписью. Правка поста меняет подписи его
+страницы и страниц его лент (общей, группы и автора), правка группы или
+имени автора - всех страниц, как сдвиг поколения SITE в page_cache.
+"""
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import posixpath
+import tempfile
+from functools import partial
+from io import BytesIO
+from urllib.parse import unquote
+
+import django
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.db.models import Count, Max
+from django.urls import reverse
+
+from core import paths
+
+from . import shards
+from .models import Group, profile_url
+from .settings import POSTS_ON_PAGE
+
+MANIFEST = 'manifest.json'
+ABOUT_PAGES = ('about:author', 'about:tech')
+
+_handler = None
+
+
+def _digest(*parts):
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def file_name(path, page=1):
+    """
+    Файл страницы относительно STATIC_SITE_ROOT; None для пути, который
+    вышел бы за его пределы (например, профиль пользователя «..»).
+    """
+    name = unquote(path).lstrip('/') + (
+        'index.html' if page == 1 else f'page-{page}.html'
+    )
+    if posixpath.normpath(name) != name or name.startswith('../'):
+        return None
+    return name
+
+
+def _merge(states, key, count, updated):
+    state = states.setdefault(key, [0, None])
+    state[0] += count
+    state[1] = max(filter(None, (state[1], updated)), default=None)
+
+
+def feed_states():
+    """
+    Состояния лент: число постов и время последней правки поста общей
+    ленты (ключ None), групп (slug) и авторов (username), а также имена
+    авторов - по всем БД с постами.
+    """
+    states, names = {}, set()
+    for posts in shards.post_querysets():
+        # order_by() убирает ordering модели из GROUP BY
+        posts = posts.order_by()
+        total = posts.aggregate(count=Count('pk'), updated=Max('updated_at'))
+        _merge(states, None, total['count'], total['updated'])
+        for slug, count, updated in posts.exclude(group=None).values_list(
+            'group__slug'
+        ).annotate(Count('pk'), Max('updated_at')):
+            _merge(states, ('group', slug), count, updated)
+        for *author, count, updated in posts.values_list(
+            'author__username', 'author__first_name', 'author__last_name'
+        ).annotate(Count('pk'), Max('updated_at')):
+            _merge(states, ('author', author[0]), count, updated)
+            names.add(tuple(author))
+    return states, names
+
+
+def pages():
+    """
+    Страницы сайта: {файл: (путь, номер страницы, подпись)}. Профили
+    выводятся только для авторов с постами.
+    """
+    states, names = feed_states()
+    groups = list(Group.objects.values_list('slug', 'title', 'description'))
+    site = _digest(sorted(groups), sorted(names))
+    feeds = [(reverse('posts:index'), states.get(None, [0, None]))]
+    feeds += [
+        (paths.build('posts:group_list', slug),
+         states.get(('group', slug), [0, None]))
+        for slug, _, _ in groups
+    ]
+    feeds += [
+        (profile_url(username), states[('author', username)])
+        for username, _, _ in names
+    ]
+    found = {}
+
+    def add(path, page, signature):
+        name = file_name(path, page)
+        if name is not None:
+            found[name] = (path, page, signature)
+
+    for path, state in feeds:
+        for page in range(1, max(1, math.ceil(state[0] / POSTS_ON_PAGE)) + 1):
+            add(path, page, _digest(site, state, page))
+    for posts in shards.post_querysets():
+        for pk, updated, username in posts.order_by().values_list(
+            'pk', 'updated_at', 'author__username'
+        ):
+            # На странице поста - число постов автора
+            add(
+                paths.build('posts:post_detail', pk), 1,
+                _digest(site, updated, states[('author', username)][0])
+            )
+    for view_name in ABOUT_PAGES:
+        add(reverse(view_name), 1, '')
+    return found
+
+
+def _get_handler():
+    global _handler
+    if _handler is None:
+        _handler = BaseHandler()
+        _handler.load_middleware()
+    return _handler
+
+
+def _write(filename, content):
+    """Записывает файл атомарно: веб-сервер не увидит его недописанным."""
+    directory = os.path.dirname(filename)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(descriptor, 'wb') as file:
+        file.write(content)
+    # mkstemp создает файл с правами 0600
+    os.chmod(temporary, 0o644)
+    os.replace(temporary, filename)
+
+
+def render(root, job):
+    """
+    Отрисовывает страницу анонимным GET-запросом через все middleware и
+    записывает файл. Возвращает (файл, записан ли он): страницы с
+    ошибкой, cookie или CSRF-токеном остаются Django.
+    """
+    name, path, page = job
+    request = WSGIRequest({
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': f'page={page}' if page > 1 else '',
+        'SERVER_NAME': settings.STATIC_SITE_HOST,
+        'SERVER_PORT': '80',
+        'HTTP_HOST': settings.STATIC_SITE_HOST,
+        'wsgi.input': BytesIO(),
+        'wsgi.url_scheme': 'http',
+    })
+    response = _get_handler().get_response(request)
+    if (
+        response.status_code != 200
+        or response.streaming
+        or response.cookies
+        or request.META.get('CSRF_COOKIE_USED')
+    ):
+        return name, False
+    _write(os.path.join(root, name), response.content)
+    return name, True
+
+
+def _init_worker():
+    django.setup()
+
+
+def _render_all(root, jobs, processes):
+    if processes == 1 or len(jobs) < 2:
+        return [render(root, job) for job in jobs]
+    # Дочерние процессы не должны делить соединения с родителем
+    connections.close_all()
+    with multiprocessing.Pool(processes, initializer=_init_worker) as pool:
+        return list(pool.imap_unordered(
+            partial(render, root), jobs, chunksize=16
+        ))
+
+
+def _load_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _remove(root, name):
+    filename = os.path.join(root, name)
+    try:
+        os.remove(filename)
+        os.removedirs(os.path.dirname(filename))
+    except OSError:
+        # Файла уже нет либо в каталоге остались другие
+        pass
+
+
+def build(root=None, processes=None, full=False):
+    """
+    Собирает статическую копию в root (по умолчанию STATIC_SITE_ROOT) в
+    processes процессах (None - по числу процессоров). Отрисовывает
+    новые и изменившиеся страницы, при full - все; удаляет файлы
+    исчезнувших страниц. Возвращает число отрисованных, пропущенных
+    (остались Django), удаленных и неизменных файлов.
+    """
+    root = root or settings.STATIC_SITE_ROOT
+    os.makedirs(root, exist_ok=True)
+    manifest = _load_manifest(root)
+    current = pages()
+    jobs = [
+        (name, path, page)
+        for name, (path, page, signature) in current.items()
+        if full
+        or manifest.get(name) != signature
+        or not os.path.exists(os.path.join(root, name))
+    ]
+    results = dict(_render_all(root, jobs, processes))
+    stale = set(manifest) - set(current)
+    stale.update(name for name, written in results.items() if not written)
+    for name in stale:
+        _remove(root, name)
+    _write(os.path.join(root, MANIFEST), json.dumps({
+        name: signature
+        for name, (_, _, signature) in current.items()
+        if results.get(name, name in manifest)
+    }, ensure_ascii=False, sort_keys=True).encode())
+    rendered = sum(results.values())
+    return {
+        'rendered': rendered,
+        'skipped': len(results) - rendered,
+        'removed': len(set(manifest) - set(current)),
+        'unchanged': len(current) - len(results),
+    }
@@ -0,0 +1,47 @@
+from itertools import chain
+
+from django.utils.dateparse import parse_datetime
+
+from core.tasks import task
+
+from . import page_cache, shards, thumbnails
+from .fragments import forget_cards
+
+
+@task
+def generate_thumbnails(post_id):
+    """Создает миниатюры картинки поста."""
+    thumbnails.generate(post_id)
+
+
+@task
+def forget_group_cards(group_id):
+    """Сбрасывает карточки постов переименованной группы."""
+    forget_cards(chain.from_iterable(
+        posts.values_list('pk', 'updated_at')
+        for posts in shards.post_querysets(group_id=group_id)
+    ))
+    # Страницы, отрисованные до сброса, могли взять старые карточки
+    page_cache.bump(page_cache.SITE)
+
+
+@task
+def forget_author_cards(author_id):
+    """Сбрасывает карточки постов автора, сменившего имя."""
+    forget_cards(chain.from_iterable(
+        posts.values_list('pk', 'updated_at')
+        for posts in shards.post_querysets(author_id=author_id)
+    ))
+    page_cache.bump(page_cache.SITE)
+
+
+@task
+def forget_post_cards(posts):
+    """
+    Сбрасывает карточки постов по парам [pk, updated_at в ISO 8601],
+    собранным до того, как посты нельзя будет найти (удаление группы).
+    """
+    forget_cards(
+        (pk, parse_datetime(updated_at)) for pk, updated_at in posts
+    )
+    page_cache.bump(page_cache.SITE)
@@ -0,0 +1,11 @@
+from django import template
+
+from ..thumbnails import cached_thumbnail
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_thumbnail(image, size='card'):
+    """Готовая миниатюра картинки поста либо None; ресайза здесь нет."""
+    return cached_thumbnail(image, size)
@@ -0,0 +1,80 @@
+import asyncio
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from core.asgi import WsgiToAsgi
+from posts.models import Post, User
+
+INDEX_URL = reverse('posts:index')
+SEARCH_URL = reverse('posts:search')
+
+
+class AsgiTest(TransactionTestCase):
+
+    def setUp(self):
+        self.application = WsgiToAsgi(WSGIHandler(), max_workers=2)
+        self.addCleanup(self.application.executor.shutdown)
+
+    def request(self, path, query_string=b''):
+        """Запрос к ASGI-приложению; возвращает статус, заголовки и тело."""
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(self.application({
+            'type': 'http',
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'query_string': query_string,
+            'headers': [(b'host', b'testserver')],
+            'server': ('testserver', 80),
+            'client': ('127.0.0.1', 50000),
+        }, receive, send))
+        start, *body = messages
+        self.assertFalse(body[-1].get('more_body'))
+        return (
+            start['status'],
+            dict(start['headers']),
+            b''.join(message['body'] for message in body).decode(),
+        )
+
+    def test_feed_via_asgi(self):
+        """Тест страниц постов через ASGI: view выполняется в пуле потоков."""
+        Post.objects.create(
+            author=User.objects.create_user(username='AutoTestUser'),
+            text='Текст. Автотест. ASGI',
+        )
+        CASES = [
+            (INDEX_URL, b'', 200, 'Текст. Автотест. ASGI'),
+            (SEARCH_URL, 'q=автотест'.encode(), 200, 'Текст. Автотест'),
+            ('/unexisting_page/', b'', 404, ''),
+        ]
+        for path, query_string, status, text in CASES:
+            with self.subTest(path=path):
+                code, headers, content = self.request(path, query_string)
+                self.assertEqual(code, status)
+                self.assertIn(b'content-type', headers)
+                self.assertIn(text, content)
+
+    def test_repeated_headers(self):
+        """Тест склейки повторных заголовков, Cookie - через «; »."""
+        environ = self.application.environ({
+            'method': 'GET',
+            'path': INDEX_URL,
+            'headers': [
+                (b'cookie', b'a=1'),
+                (b'cookie', b'b=2'),
+                (b'accept', b'text/html'),
+                (b'accept', b'*/*'),
+            ],
+        }, None)
+        self.assertEqual(environ['HTTP_COOKIE'], 'a=1; b=2')
+        self.assertEqual(environ['HTTP_ACCEPT'], 'text/html,*/*')
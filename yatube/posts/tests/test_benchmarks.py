@@ -0,0 +1,91 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase
+
+from core import benchmarks
+from posts.models import FeedEntry, Post, PostCounter
+
+POSTS, AUTHORS, GROUPS = 60, 4, 3
+
+
+class BenchmarkTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        benchmarks.seed(POSTS, AUTHORS, GROUPS)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_seed(self):
+        """Тест заполнения БД: посты, лента и счётчики согласованы."""
+        self.assertEqual(Post.objects.count(), POSTS)
+        self.assertEqual(FeedEntry.objects.count(), POSTS)
+        self.assertEqual(
+            sum(PostCounter.objects.filter(
+                author__isnull=False
+            ).values_list('value', flat=True)),
+            POSTS
+        )
+
+    def test_benchmark_covers_routes_within_query_budgets(self):
+        """
+        Тест замеров всех маршрутов posts, users и about в бюджетах
+        запросов. Задержку на двух замерах не проверить: её бюджеты
+        проверяет команда benchmark.
+        """
+        budgets = {
+            name: {**benchmarks.BUDGETS.get(name, {}), 'p99_ms': None}
+            for name, _ in benchmarks.routes()
+        }
+        results = {
+            result['route']: result
+            for result in benchmarks.benchmark(repeat=2, budgets=budgets)
+        }
+        for module in benchmarks.URLCONFS:
+            urlconf = import_module(module)
+            for pattern in urlconf.urlpatterns:
+                name = f'{urlconf.app_name}:{pattern.name}'
+                with self.subTest(route=name):
+                    result = results[name]
+                    if name in benchmarks.SKIPPED:
+                        self.assertIn('skipped', result)
+                        continue
+                    self.assertEqual(result['status'], 200)
+                    self.assertEqual(result['violations'], [])
+                    self.assertGreater(result['peak_memory_kb'], 0)
+
+    def test_violations(self):
+        """Тест проверки бюджетов запросов и задержки."""
+        result = {'status': 200, 'queries': 3, 'p99_ms': 10}
+        CASES = [
+            ({'route': {'queries': 3, 'p99_ms': 10}}, []),
+            ({'route': {'queries': 2}}, ['queries 3 > 2']),
+            ({'route': {'p99_ms': 5}}, ['p99_ms 10 > 5']),
+            ({'route': {'queries': 2, 'p99_ms': None}}, ['queries 3 > 2']),
+        ]
+        for budgets, expected in CASES:
+            with self.subTest(budgets=budgets):
+                self.assertEqual(
+                    benchmarks.violations('route', result, budgets), expected
+                )
+
+    def test_render_benchmark(self):
+        """Тест замеров отрисовки ленты и построения путей."""
+        results = benchmarks.render_benchmark(repeat=2)
+        self.assertEqual(len(results), len(benchmarks.TEMPLATE_CONFIGS) + 2)
+        for label, result in results.items():
+            with self.subTest(label=label):
+                self.assertGreater(result['mean_ms'], 0)
+
+    def test_middleware_benchmark(self):
+        """Тест замеров стека MIDDLEWARE: строка на каждый middleware."""
+        results = benchmarks.middleware_benchmark(repeat=2)
+        self.assertEqual(len(results), len(settings.MIDDLEWARE) + 1)
+        for label, result in results.items():
+            for who in ('guest', 'user'):
+                with self.subTest(label=label, who=who):
+                    self.assertGreater(result[who]['mean_ms'], 0)
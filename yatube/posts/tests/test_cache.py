@@ -0,0 +1,239 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.tasks import run_pending
+from posts.models import Group, Post, User
+
+SLUG = 'TestGroupSlug'
+NICK = 'AutoTestUser'
+INDEX_URL = reverse('posts:index')
+GROUP_URL = reverse('posts:group_list', args=[SLUG])
+PROFILE_URL = reverse('posts:profile', args=[NICK])
+FEED_URLS = (INDEX_URL, GROUP_URL, PROFILE_URL)
+
+
+class PostCardCacheTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username=NICK, first_name='Иван', last_name='Тестов'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=SLUG,
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+        self.post = Post.objects.create(
+            author=self.user, group=self.group, text='Исходный текст'
+        )
+
+    def assertInFeeds(self, text, urls=FEED_URLS):
+        for url in urls:
+            with self.subTest(url=url, text=text):
+                self.assertContains(self.guest.get(url), text)
+
+    def test_cards_are_cached(self):
+        """Тест повторного вывода карточки из кэша без запроса к БД."""
+        self.assertInFeeds('Исходный текст')
+        Post.objects.filter(pk=self.post.pk).update(text='Тихая правка')
+        self.assertInFeeds('Исходный текст')
+
+    def test_post_change_invalidates_cards(self):
+        """Тест сброса карточек при изменении и удалении поста."""
+        self.assertInFeeds('Исходный текст')
+        self.post.text = 'Новый текст'
+        self.post.save()
+        self.assertInFeeds('Новый текст')
+        self.post.delete()
+        for url in FEED_URLS:
+            with self.subTest(url=url):
+                self.assertNotContains(self.guest.get(url), 'Новый текст')
+
+    def test_group_change_invalidates_cards(self):
+        """Тест сброса карточек при переименовании группы."""
+        self.assertInFeeds(f'#{self.group.title}', [INDEX_URL, PROFILE_URL])
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        run_pending()
+        self.assertInFeeds('#Новое название', [INDEX_URL, PROFILE_URL])
+
+    def test_group_delete_invalidates_cards(self):
+        """Тест сброса карточек в очереди после удаления группы."""
+        self.assertInFeeds(f'#{self.group.title}', [INDEX_URL, PROFILE_URL])
+        Group.objects.filter(pk=self.group.pk).delete()
+        run_pending()
+        for url in (INDEX_URL, PROFILE_URL):
+            with self.subTest(url=url):
+                self.assertNotContains(
+                    self.guest.get(url), f'#{self.group.title}'
+                )
+
+    def test_author_change_invalidates_cards(self):
+        """Тест сброса карточек при смене имени автора."""
+        self.assertInFeeds('Иван Тестов', [INDEX_URL, GROUP_URL])
+        author = User.objects.get(pk=self.user.pk)
+        author.first_name = 'Пётр'
+        author.save()
+        run_pending()
+        self.assertInFeeds('Пётр Тестов', [INDEX_URL, GROUP_URL])
+
+
+@override_settings(POSTS_PAGE_CACHE_TIMEOUT=60)
+class AnonymousPageCacheTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=NICK)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=SLUG,
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+        self.author = Client()
+        self.author.force_login(self.user)
+        Post.objects.create(
+            author=self.user, group=self.group, text='Исходный текст'
+        )
+
+    def test_anonymous_pages_are_cached(self):
+        """Тест отдачи повторного анонимного запроса из кэша."""
+        for url in FEED_URLS:
+            with self.subTest(url=url):
+                first = self.guest.get(url)
+                second = self.guest.get(url)
+                self.assertIsNotNone(first.context)
+                self.assertIsNone(second.context)
+                self.assertEqual(first.content, second.content)
+                self.assertEqual(first['ETag'], second['ETag'])
+                self.assertIn('Last-Modified', second)
+
+    def test_conditional_get(self):
+        """Тест ответа 304 на запрос с актуальным ETag."""
+        for url in FEED_URLS:
+            with self.subTest(url=url):
+                etag = self.guest.get(url)['ETag']
+                response = self.guest.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_post_change_bumps_generation(self):
+        """Тест устаревания закэшированных страниц при новом посте."""
+        etags = {url: self.guest.get(url)['ETag'] for url in FEED_URLS}
+        Post.objects.create(
+            author=self.user, group=self.group, text='Новый пост'
+        )
+        for url in FEED_URLS:
+            with self.subTest(url=url):
+                response = self.guest.get(url, HTTP_IF_NONE_MATCH=etags[url])
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'Новый пост')
+
+    def test_bulk_create_bumps_generation(self):
+        """Тест устаревания закэшированных страниц после bulk_create."""
+        etags = {url: self.guest.get(url)['ETag'] for url in FEED_URLS}
+        Post.objects.bulk_create([
+            Post(author=self.user, group=self.group, text='Новый пост')
+        ])
+        for url in FEED_URLS:
+            with self.subTest(url=url):
+                response = self.guest.get(url, HTTP_IF_NONE_MATCH=etags[url])
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'Новый пост')
+
+    def test_group_change_bumps_site_generation(self):
+        """Тест устаревания всех страниц при переименовании группы."""
+        self.guest.get(PROFILE_URL)
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        run_pending()
+        self.assertContains(self.guest.get(PROFILE_URL), 'Новое название')
+
+    def test_authenticated_bypass_cache(self):
+        """Тест обхода кэша для авторизованных пользователей."""
+        for url in FEED_URLS:
+            with self.subTest(url=url):
+                self.author.get(url)
+                response = self.author.get(url)
+                self.assertIsNotNone(response.context)
+                self.assertNotEqual(
+                    response['ETag'], self.guest.get(url)['ETag']
+                )
+
+
+class PostConditionalGetTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=NICK)
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+        self.author = Client()
+        self.author.force_login(self.user)
+        self.post = Post.objects.create(
+            author=self.user, text='Исходный текст'
+        )
+        self.url = reverse('posts:post_detail', args=[self.post.pk])
+
+    def test_post_detail_not_modified(self):
+        """Тест ответа 304 на странице поста по ETag и Last-Modified."""
+        response = self.guest.get(self.url)
+        CASES = [
+            {'HTTP_IF_NONE_MATCH': response['ETag']},
+            {'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']},
+        ]
+        for headers in CASES:
+            with self.subTest(headers=headers):
+                self.assertEqual(
+                    self.guest.get(self.url, **headers).status_code, 304
+                )
+
+    def test_post_edit_changes_validators(self):
+        """Тест обновления updated_at и ETag при редактировании поста."""
+        etag = self.guest.get(self.url)['ETag']
+        updated_at = self.post.updated_at
+        self.author.post(
+            reverse('posts:post_edit', args=[self.post.pk]),
+            data={'text': 'Новый текст'}
+        )
+        self.post.refresh_from_db()
+        self.assertGreater(self.post.updated_at, updated_at)
+        response = self.guest.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Новый текст')
+
+    def test_new_post_of_author_changes_etag(self):
+        """Тест смены ETag при изменении числа постов автора."""
+        etag = self.guest.get(self.url)['ETag']
+        Post.objects.create(author=self.user, text='Ещё один пост')
+        self.assertNotEqual(self.guest.get(self.url)['ETag'], etag)
+
+    def test_other_author_post_keeps_etag(self):
+        """Тест: пост другого автора не меняет ETag страницы поста."""
+        etag = self.guest.get(self.url)['ETag']
+        other = User.objects.create_user(username='OtherAutoTestUser')
+        Post.objects.create(author=other, text='Пост другого автора')
+        response = self.guest.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_validators_depend_on_user(self):
+        """Тест разных ETag для автора и гостя."""
+        self.assertNotEqual(
+            self.guest.get(self.url)['ETag'],
+            self.author.get(self.url)['ETag']
+        )
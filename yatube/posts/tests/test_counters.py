@@ -0,0 +1,173 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.paginator import Paginator
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from posts.counters import feed_count, posts_count
+from posts.models import Group, Post, PostCounter, User
+from posts.paginators import CountedPaginator
+
+NICK = 'AutoTestUser'
+NICK_1 = 'AutoTestUser1'
+
+
+class FeedCountersTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=NICK)
+        cls.user_1 = User.objects.create_user(username=NICK_1)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='TestGroupSlug',
+            description='Тестовое описание',
+        )
+        cls.group_1 = Group.objects.create(
+            title='Тестовая группа 1',
+            slug='TestGroupSlug1',
+            description='Тестовое описание 1',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            author=self.user, group=self.group, text='Текст. Автотест'
+        )
+
+    def counts(self):
+        return (
+            feed_count(),
+            feed_count(group=self.group),
+            feed_count(group=self.group_1),
+            feed_count(author=self.user),
+            feed_count(author=self.user_1),
+        )
+
+    def test_counts_follow_post_changes(self):
+        """Тест инкрементального обновления счётчиков лент."""
+        self.assertEqual(self.counts(), (1, 1, 0, 1, 0))
+        Post.objects.create(author=self.user_1, text='Текст. Без группы')
+        self.assertEqual(self.counts(), (2, 1, 0, 1, 1))
+        self.post.group = self.group_1
+        self.post.author = self.user_1
+        self.post.save()
+        self.assertEqual(self.counts(), (2, 0, 1, 0, 2))
+        self.post.delete()
+        self.assertEqual(self.counts(), (1, 0, 0, 0, 1))
+
+    def test_cached_count_skips_database(self):
+        """Тест чтения счётчика из кэша без COUNT(*)."""
+        feed_count(group=self.group)
+        with self.assertNumQueries(0):
+            self.assertEqual(feed_count(group=self.group), 1)
+
+    def test_total_count_without_counting_posts(self):
+        """Тест: после записи общее число постов читается из PostCounter."""
+        feed_count()
+        Post.objects.create(author=self.user_1, text='Текст. Без группы')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(feed_count(), 2)
+        self.assertEqual(
+            [query['sql'].split(' FROM ')[1].split()[0] for query in queries],
+            ['"posts_postcounter"']
+        )
+
+    def test_denormalized_counters(self):
+        """Тест поддержки PostCounter при создании, переносе и удалении."""
+        def counts():
+            return {
+                (counter.author_id, counter.group_id): counter.value
+                for counter in PostCounter.objects.all()
+            }
+        self.assertEqual(counts(), {
+            (None, None): 1,
+            (self.user.pk, None): 1,
+            (None, self.group.pk): 1,
+        })
+        self.post.author = self.user_1
+        self.post.group = self.group_1
+        self.post.save()
+        self.assertEqual(counts(), {
+            (None, None): 1,
+            (self.user.pk, None): 0,
+            (self.user_1.pk, None): 1,
+            (None, self.group.pk): 0,
+            (None, self.group_1.pk): 1,
+        })
+        self.post.delete()
+        self.assertEqual(set(counts().values()), {0})
+
+    def test_bulk_create_then_delete(self):
+        """Тест счётчиков после bulk_create и удаления всех постов."""
+        Post.objects.bulk_create(
+            Post(author=self.user, group=self.group, text=f'Пост № {i}')
+            for i in range(2)
+        )
+        self.assertEqual(posts_count(author=self.user), 3)
+        self.assertEqual(posts_count(group=self.group), 3)
+        Post.objects.all().delete()
+        self.assertEqual(posts_count(author=self.user), 0)
+        self.assertEqual(posts_count(group=self.group), 0)
+
+    def test_bulk_create_updates_cached_counts(self):
+        """Тест закэшированных счётчиков лент после bulk_create."""
+        self.assertEqual(self.counts(), (1, 1, 0, 1, 0))
+        Post.objects.bulk_create([
+            Post(author=self.user_1, group=self.group_1, text='Пост № 1'),
+            Post(author=self.user_1, text='Пост № 2'),
+        ])
+        self.assertEqual(self.counts(), (3, 1, 1, 1, 2))
+
+    def test_counter_not_below_zero(self):
+        """Тест: отставший счётчик не уходит ниже нуля при удалении."""
+        PostCounter.objects.update(value=0)
+        self.post.delete()
+        self.assertEqual(set(
+            PostCounter.objects.values_list('value', flat=True)
+        ), {0})
+
+    def test_rebuild_counters_command(self):
+        """Тест пересчёта счётчиков командой rebuild_post_counters."""
+        Post.objects.bulk_create(
+            Post(author=self.user_1, group=self.group, text=f'Пост № {i}')
+            for i in range(3)
+        )
+        PostCounter.objects.filter(group=self.group).update(value=100)
+        call_command('rebuild_post_counters', stdout=StringIO())
+        self.assertEqual(posts_count(group=self.group), 4)
+        self.assertEqual(posts_count(author=self.user), 1)
+        self.assertEqual(posts_count(author=self.user_1), 3)
+        self.assertEqual(posts_count(group=self.group_1), 0)
+        self.assertEqual(posts_count(), 4)
+        self.assertEqual(feed_count(group=self.group), 4)
+
+
+class PageWindowTest(TestCase):
+
+    def test_page_window(self):
+        """
+        Тест окна номеров страниц в навигации: по номеру доступны первые
+        NUMBERED_PAGES страниц и текущая.
+        """
+        CASES = [
+            (1, 1, [1]),
+            (1, 3, [1, 2, 3]),
+            (1, 20, [1, 2, 3, None, 5]),
+            (10, 20, [1, None, 8, 9, 10]),
+            (4, 20, [1, 2, 3, 4, 5]),
+            (20, 20, [1, None, 18, 19, 20]),
+        ]
+        for number, pages, window in CASES:
+            with self.subTest(number=number, pages=pages):
+                paginator = CountedPaginator(
+                    range(pages), 1, count=lambda: pages
+                )
+                self.assertIsInstance(paginator, Paginator)
+                self.assertEqual(
+                    paginator.page(number).page_window, window
+                )
@@ -0,0 +1,95 @@
+from datetime import datetime, timezone
+from unittest import mock
+
+from django.db import OperationalError, connection, transaction
+from django.db.backends.signals import connection_created
+from django.db.models import QuerySet
+from django.test import TransactionTestCase, override_settings
+
+from core.db import retry_on_lock
+from posts.counters import posts_count
+from posts.models import FeedEntry, Group, Post, User
+
+
+@override_settings(DATABASE_LOCK_RETRIES=2, DATABASE_LOCK_RETRY_DELAY=0)
+class RetryOnLockTest(TransactionTestCase):
+
+    def flaky(self, failures, error='database is locked'):
+        calls = []
+
+        @retry_on_lock
+        def create_group():
+            calls.append(1)
+            Group.objects.create(slug=f'group-{len(calls)}')
+            if len(calls) <= failures:
+                raise OperationalError(error)
+            return len(calls)
+
+        return create_group, calls
+
+    def test_retried_in_new_transaction(self):
+        """Тест повтора транзакции с откатом неудачных попыток."""
+        create_group, _ = self.flaky(failures=2)
+        self.assertEqual(create_group(), 3)
+        self.assertEqual(
+            list(Group.objects.values_list('slug', flat=True)), ['group-3']
+        )
+
+    def test_gives_up(self):
+        """Тест проброса ошибки после DATABASE_LOCK_RETRIES повторов."""
+        create_group, calls = self.flaky(failures=3)
+        with self.assertRaises(OperationalError):
+            create_group()
+        self.assertEqual(len(calls), 3)
+        self.assertFalse(Group.objects.exists())
+
+    def test_other_errors_not_retried(self):
+        """Тест: ошибки, кроме блокировки, не повторяются."""
+        create_group, calls = self.flaky(failures=1, error='no such table')
+        with self.assertRaises(OperationalError):
+            create_group()
+        self.assertEqual(len(calls), 1)
+
+    def test_not_retried_in_outer_transaction(self):
+        """Тест: внутри внешней транзакции повторять нельзя."""
+        create_group, calls = self.flaky(failures=1)
+        with self.assertRaises(OperationalError):
+            with transaction.atomic():
+                create_group()
+        self.assertEqual(len(calls), 1)
+
+    def test_bulk_create_retried(self):
+        """Тест повтора bulk_create постов целиком при блокировке."""
+        user = User.objects.create_user(username='AutoTestUser')
+        date = datetime(2010, 1, 2, tzinfo=timezone.utc)
+        bulk_create = QuerySet.bulk_create
+        calls = []
+
+        def flaky(queryset, objs, *args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+            return bulk_create(queryset, objs, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, 'bulk_create', flaky):
+            Post.objects.bulk_create([
+                Post(author=user, text=f'Пост № {i}', pub_date=date)
+                for i in range(3)
+            ], keep_dates=True)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(
+            set(Post.objects.values_list('pub_date', flat=True)), {date}
+        )
+        self.assertEqual(FeedEntry.objects.count(), 3)
+        self.assertEqual(posts_count(author=user), 3)
+
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -1234})
+    def test_pragmas_on_connect(self):
+        """Тест прагм SQLITE_PRAGMAS у нового соединения."""
+        # Тестовая БД в памяти не переоткрывается: сигнал шлем сами
+        connection_created.send(
+            sender=connection.__class__, connection=connection
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -1234)
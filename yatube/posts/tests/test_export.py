@@ -0,0 +1,95 @@
+import csv
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+NICK = 'AutoTestUser'
+STAFF = 'StaffUser'
+SLUG = 'TestGroupSlug'
+EXPORT_URL = reverse('posts:export')
+
+
+class ExportPostsTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=NICK, first_name='Имя')
+        cls.staff = User.objects.create_user(username=STAFF, is_staff=True)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=SLUG,
+            description='Тестовое описание',
+        )
+        Post.objects.create(author=cls.user, group=cls.group, text='Пост 1')
+        Post.objects.create(author=cls.user, text='Пост "2",\nвторой')
+
+    def setUp(self):
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def export(self, fmt, compress=False):
+        response = self.staff_client.get(
+            EXPORT_URL, {'format': fmt, 'gzip': '1' if compress else ''}
+        )
+        self.assertEqual(response.status_code, 200)
+        content = b''.join(response.streaming_content)
+        return gzip.decompress(content) if compress else content
+
+    def test_export_formats(self):
+        """Тест выгрузки JSONL и CSV, в том числе сжатой gzip."""
+        for compress in (False, True):
+            with self.subTest(compress=compress):
+                rows = [
+                    json.loads(line)
+                    for line in self.export('jsonl', compress).splitlines()
+                ]
+                self.assertEqual(
+                    [(row['text'], row['author'], row['group'])
+                     for row in rows],
+                    [('Пост 1', NICK, SLUG), ('Пост "2",\nвторой', NICK, None)]
+                )
+                self.assertEqual(rows[0]['author_first_name'], 'Имя')
+                rows = list(csv.DictReader(StringIO(
+                    self.export('csv', compress).decode()
+                )))
+                self.assertEqual(
+                    [row['text'] for row in rows],
+                    ['Пост 1', 'Пост "2",\nвторой']
+                )
+
+    def test_export_is_staff_only(self):
+        """Тест: выгрузка недоступна анонимам и обычным пользователям."""
+        author_client = Client()
+        author_client.force_login(self.user)
+        for client in (Client(), author_client):
+            with self.subTest(client=client):
+                response = client.get(EXPORT_URL)
+                self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            self.staff_client.get(EXPORT_URL, {'format': 'xml'}).status_code,
+            400
+        )
+
+    def test_export_import_round_trip(self):
+        """Тест: выгрузка export_posts загружается через import_posts."""
+        file = tempfile.NamedTemporaryFile(suffix='.jsonl', delete=False)
+        file.close()
+        self.addCleanup(os.remove, file.name)
+        call_command('export_posts', file.name, stderr=StringIO())
+        Post.objects.all().delete()
+        call_command(
+            'import_posts', file.name, stdout=StringIO(), stderr=StringIO()
+        )
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', 'group__slug')),
+            [('Пост "2",\nвторой', None), ('Пост 1', SLUG)]
+        )
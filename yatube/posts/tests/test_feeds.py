@@ -0,0 +1,81 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.feeds import feed
+from posts.models import FeedEntry, Group, Post, User
+
+NICK = 'AutoTestUser'
+NICK_1 = 'AutoTestUser1'
+
+
+class FeedEntryTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=NICK)
+        cls.user_1 = User.objects.create_user(username=NICK_1)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='TestGroupSlug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        self.post = Post.objects.create(
+            author=self.user, group=self.group, text='Текст. Автотест'
+        )
+
+    def entries(self):
+        return list(FeedEntry.objects.values_list(
+            'post', 'pub_date', 'author', 'group'
+        ))
+
+    def posts(self):
+        return list(Post.objects.values_list(
+            'pk', 'pub_date', 'author', 'group'
+        ))
+
+    def test_entries_follow_posts(self):
+        """Тест поддержки ленты при создании, правке и удалении постов."""
+        self.assertEqual(self.entries(), self.posts())
+        Post.objects.create(author=self.user_1, text='Текст. Без группы')
+        self.assertEqual(self.entries(), self.posts())
+        self.post.author = self.user_1
+        self.post.group = None
+        self.post.save()
+        self.assertEqual(self.entries(), self.posts())
+        self.post.delete()
+        self.assertEqual(self.entries(), self.posts())
+
+    def test_bulk_create_appends_entries(self):
+        """Тест добавления записей ленты при bulk_create."""
+        Post.objects.bulk_create(
+            Post(author=self.user_1, text=f'Пост № {i}') for i in range(3)
+        )
+        self.assertEqual(self.entries(), self.posts())
+
+    def test_rebuild_feed_command(self):
+        """Тест пересоздания ленты командой rebuild_feed."""
+        FeedEntry.objects.all().delete()
+        call_command('rebuild_feed', stdout=StringIO())
+        self.assertEqual(self.entries(), self.posts())
+
+    def test_feed_slices_hydrate_posts(self):
+        """Тест срезов ленты: id из FeedEntry, посты одним in_bulk."""
+        Post.objects.bulk_create(
+            Post(author=self.user_1, text=f'Пост № {i}') for i in range(3)
+        )
+        CASES = [
+            ('index', feed(), Post.objects.all()),
+            ('group', feed(group=self.group), self.group.posts.all()),
+            ('profile', feed(author=self.user_1), self.user_1.posts.all()),
+        ]
+        for name, posts, expected in CASES:
+            with self.subTest(feed=name):
+                expected_page = list(expected[0:2])
+                with self.assertNumQueries(2):
+                    self.assertEqual(posts[0:2], expected_page)
+                self.assertEqual(len(posts), expected.count())
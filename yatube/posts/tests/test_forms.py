@@ -1,4 +1,5 @@
 from django import forms
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase
 from django.urls import reverse
 
@@ -92,7 +93,8 @@ class PostCreateFormTest(TestCase):
             self.POST_EDIT_URL,
         ]
         for url in urls:
-            form = self.author.get(url).context['form']
+            context = self.author.get(url).context
+            form = context['form']
             with self.subTest(url=url, form=form):
                 self.assertIsInstance(
                     form.fields.get('text'), forms.fields.CharField
@@ -100,3 +102,20 @@ class PostCreateFormTest(TestCase):
                 self.assertIsInstance(
                     form.fields.get('group'), forms.fields.ChoiceField
                 )
+                self.assertIsInstance(
+                    context['image_form'].fields.get('image'),
+                    forms.fields.ImageField
+                )
+
+    def test_not_an_image_rejected(self):
+        """Тест: файл не-картинка не принимается, пост не создается."""
+        posts_total = Post.objects.count()
+        response = self.author.post(POST_CREATE_URL, {
+            'text': 'Пост с файлом',
+            'image': SimpleUploadedFile(
+                'file.gif', b'not an image', content_type='image/gif'
+            ),
+        })
+        self.assertEqual(Post.objects.count(), posts_total)
+        self.assertTrue(response.context['image_form'].errors['image'])
+        self.assertContains(response, 'alert-danger')
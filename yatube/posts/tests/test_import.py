@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.counters import feed_count
+from posts.models import FeedEntry, Group, Post, User
+
+NICK = 'AutoTestUser'
+SLUG = 'TestGroupSlug'
+
+
+class ImportPostsTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=NICK)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=SLUG,
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def import_posts(self, *args, **kwargs):
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            'import_posts', *args, stdout=stdout, stderr=stderr, **kwargs
+        )
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_jsonl_from_stdin(self):
+        """Тест импорта JSONL пачками со стандартного ввода."""
+        rows = [
+            {'text': f'Пост № {i}', 'author': NICK, 'group': SLUG}
+            for i in range(5)
+        ] + [
+            {'text': 'Архивный пост', 'author': NICK,
+             'pub_date': '2010-01-02T03:04:05+00:00'},
+        ]
+        stdin = StringIO('\n'.join(json.dumps(row) for row in rows))
+        with self.assertNumQueries(44):
+            # Автор и группа ищутся только для первой пачки, далее - из
+            # кэша; на пачку - транзакция с INSERT постов и записей ленты
+            # и UPDATE счётчиков автора и группы, затем slug групп и имена
+            # авторов для сдвига поколений лент; в первой пачке счётчики
+            # создаются, в последней - id и UPDATE даты архивного поста
+            self.import_posts('--batch-size', '2', stdin=stdin)
+        self.assertEqual(Post.objects.count(), 6)
+        self.assertEqual(feed_count(group=self.group), 5)
+        self.assertEqual(feed_count(author=self.user), 6)
+        archived = Post.objects.get(text='Архивный пост')
+        self.assertEqual(
+            archived.pub_date,
+            datetime(2010, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        )
+        self.assertEqual(archived.updated_at, archived.pub_date)
+        self.assertIsNone(archived.group)
+        self.assertEqual(
+            FeedEntry.objects.get(post=archived).pub_date, archived.pub_date
+        )
+        self.assertEqual(
+            list(Post.objects.values_list('text', flat=True))[-1],
+            'Архивный пост'
+        )
+
+    def test_import_csv_skips_invalid_rows(self):
+        """Тест импорта CSV: строки, не прошедшие проверку, пропускаются."""
+        with tempfile.NamedTemporaryFile(
+            'w', suffix='.csv', delete=False, encoding='utf-8'
+        ) as file:
+            file.write(
+                'text,author,group,pub_date\n'
+                f'Верный пост,{NICK},{SLUG},\n'
+                f',{NICK},,\n'
+                'Пост,Незнакомец,,\n'
+                f'Пост,{NICK},no-such-group,\n'
+                f'Пост,{NICK},,вчера\n'
+            )
+        self.addCleanup(os.remove, file.name)
+        stdout, stderr = self.import_posts(file.name)
+        self.assertEqual(
+            list(Post.objects.values_list('text', flat=True)), ['Верный пост']
+        )
+        self.assertIn('пропущено: 4', stdout)
+        for line in (3, 4, 5, 6):
+            with self.subTest(line=line):
+                self.assertIn(f'Строка {line}:', stderr)
+
+    def test_import_jsonl_skips_non_string_values(self):
+        """Тест импорта JSONL: автор, группа и дата не строкой пропускаются."""
+        rows = [
+            {'text': 'Верный пост', 'author': NICK},
+            {'text': 'Пост', 'author': [NICK]},
+            {'text': 'Пост', 'author': NICK, 'group': {'slug': SLUG}},
+            {'text': 'Пост', 'author': NICK, 'pub_date': 20100102},
+        ]
+        stdout, stderr = self.import_posts(stdin=StringIO(
+            '\n'.join(json.dumps(row) for row in rows)
+        ))
+        self.assertEqual(
+            list(Post.objects.values_list('text', flat=True)), ['Верный пост']
+        )
+        self.assertIn('пропущено: 3', stdout)
+        for line in (2, 3, 4):
+            with self.subTest(line=line):
+                self.assertIn(f'Строка {line}:', stderr)
+
+    def test_new_posts_keep_auto_dates(self):
+        """Тест: после импорта даты новых постов снова ставятся сами."""
+        self.import_posts(stdin=StringIO(json.dumps(
+            {'text': 'Пост', 'author': NICK, 'pub_date': '2010-01-02T00:00'}
+        )))
+        post = Post.objects.create(author=self.user, text='Новый пост')
+        self.assertGreater(post.pub_date.year, 2010)
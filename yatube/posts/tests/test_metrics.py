@@ -0,0 +1,90 @@
+import re
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.metrics import registry
+from posts.models import User
+
+INDEX_URL = reverse('posts:index')
+METRICS_URL = reverse('metrics')
+
+
+@override_settings(
+    METRICS_ENABLED=True, METRICS_SAMPLE_RATE=1, METRICS_SERVER_TIMING=False
+)
+class MetricsMiddlewareTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(
+            username='StaffUser', is_staff=True
+        )
+
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+        self.guest = Client()
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def test_server_timing(self):
+        """Тест заголовка Server-Timing с временем и числом запросов к БД."""
+        response = self.staff_client.get(INDEX_URL)
+        queries = re.search(
+            r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="(\d+) queries"$',
+            response['Server-Timing']
+        )
+        self.assertIsNotNone(queries)
+        self.assertGreater(int(queries.group(1)), 0)
+
+    def test_server_timing_for_staff_only(self):
+        """
+        Тест: посетителям Server-Timing не отдается, а замер копится;
+        при METRICS_SERVER_TIMING заголовок получают все.
+        """
+        self.assertFalse(
+            self.guest.get(INDEX_URL).has_header('Server-Timing')
+        )
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:index"} 1',
+            registry.render().splitlines()
+        )
+        with self.settings(METRICS_SERVER_TIMING=True):
+            self.assertTrue(
+                Client().get(INDEX_URL).has_header('Server-Timing')
+            )
+
+    def test_metrics_endpoint(self):
+        """Тест гистограмм по view в формате Prometheus."""
+        self.guest.get(INDEX_URL)
+        self.guest.get(INDEX_URL)
+        content = self.staff_client.get(METRICS_URL).content.decode()
+        for line in (
+            '# TYPE yatube_request_duration_seconds histogram',
+            'yatube_request_duration_seconds_count{view="posts:index"} 2',
+            'yatube_db_queries_bucket{view="posts:index",le="+Inf"} 2',
+        ):
+            with self.subTest(line=line):
+                self.assertIn(line, content.splitlines())
+
+    def test_metrics_is_staff_only(self):
+        """Тест: метрики недоступны анонимам и обычным пользователям."""
+        user_client = Client()
+        user_client.force_login(User.objects.create_user(username='User'))
+        for client in (self.guest, user_client):
+            with self.subTest(client=client):
+                self.assertEqual(client.get(METRICS_URL).status_code, 302)
+
+    def test_disabled_and_unsampled(self):
+        """Тест: без замера (выключен или не попал в выборку) - без замеров."""
+        for options in (
+            {'METRICS_ENABLED': False},
+            {'METRICS_SAMPLE_RATE': 0},
+        ):
+            with self.subTest(**options), self.settings(**options):
+                response = Client().get(INDEX_URL)
+                self.assertFalse(response.has_header('Server-Timing'))
+        self.assertNotIn('posts:index', registry.render())
@@ -0,0 +1,124 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+from posts.settings import NUMBERED_PAGES, POSTS_ON_PAGE
+
+SLUG = 'TestGroupSlug'
+NICK = 'AutoTestUser'
+INDEX_URL = reverse('posts:index')
+GROUP_URL = reverse('posts:group_list', args=[SLUG])
+PROFILE_URL = reverse('posts:profile', args=[NICK])
+POSTS_TOTAL = POSTS_ON_PAGE * (NUMBERED_PAGES + 1) + 1
+
+
+class CursorPaginatorTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=NICK)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=SLUG,
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(
+                author=cls.user,
+                text=f'Текст. Автотест. Пост № {i}',
+                group=cls.group
+            ) for i in range(POSTS_TOTAL)
+        )
+        cls.ordered_ids = list(
+            Post.objects.order_by('-pub_date', '-pk').values_list(
+                'pk', flat=True
+            )
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+
+    def walk(self, url, cursor, attr):
+        """Проходит ленту по курсорам, возвращая страницы по порядку."""
+        pages = []
+        while cursor is not None:
+            page = self.guest.get(url, {'cursor': cursor}).context['page_obj']
+            pages.append(page)
+            cursor = getattr(page, attr)
+        return pages
+
+    def test_cursor_walk_forward_and_back(self):
+        """Тест обхода ленты по курсорам в обе стороны."""
+        for url in (INDEX_URL, GROUP_URL, PROFILE_URL):
+            with self.subTest(url=url):
+                pages = self.walk(url, '', 'next_cursor')
+                self.assertEqual(
+                    [post.pk for page in pages for post in page],
+                    self.ordered_ids
+                )
+                self.assertFalse(pages[0].has_previous())
+                self.assertFalse(pages[-1].has_next())
+                back = self.walk(url, pages[-1].previous_cursor,
+                                 'previous_cursor')
+                self.assertEqual(
+                    [post.pk for page in reversed(back) for post in page],
+                    self.ordered_ids[:POSTS_TOTAL - 1]
+                )
+
+    def test_cursor_page_does_not_count(self):
+        """Тест отсутствия COUNT(*) при выборке страницы по курсору."""
+        page = self.guest.get(INDEX_URL, {'cursor': ''}).context['page_obj']
+        self.assertEqual(len(page), POSTS_ON_PAGE)
+        self.assertNotIn('count', page.paginator.__dict__)
+
+    def test_invalid_cursor_returns_first_page(self):
+        """Тест битого курсора: отдается первая страница."""
+        for cursor in ('', 'garbage', 'bnxub25l'):
+            with self.subTest(cursor=cursor):
+                page = self.guest.get(
+                    INDEX_URL, {'cursor': cursor}
+                ).context['page_obj']
+                self.assertEqual(
+                    [post.pk for post in page],
+                    self.ordered_ids[:POSTS_ON_PAGE]
+                )
+
+    def test_numbered_pages_lead_to_cursor(self):
+        """Тест навигации: первые страницы по номеру, дальше по курсору."""
+        for number in range(1, NUMBERED_PAGES):
+            with self.subTest(number=number):
+                response = self.guest.get(INDEX_URL, {'page': number})
+                self.assertIsNone(response.context['page_obj'].next_cursor)
+                self.assertContains(response, f'?page={number + 1}"')
+        response = self.guest.get(INDEX_URL, {'page': NUMBERED_PAGES})
+        cursor = response.context['page_obj'].next_cursor
+        self.assertContains(response, f'?cursor={cursor}"')
+        self.assertNotContains(response, f'?page={NUMBERED_PAGES + 1}"')
+        self.assertNotContains(response, 'Последняя')
+        page = self.guest.get(INDEX_URL, {'cursor': cursor}).context[
+            'page_obj'
+        ]
+        self.assertEqual(
+            [post.pk for post in page],
+            self.ordered_ids[
+                POSTS_ON_PAGE * NUMBERED_PAGES:
+                POSTS_ON_PAGE * (NUMBERED_PAGES + 1)
+            ]
+        )
+        self.assertTrue(page.has_other_pages())
+
+    def test_page_far_beyond_count_returns_last_page(self):
+        """Тест номера страницы далеко за концом ленты: последняя страница."""
+        for number in (NUMBERED_PAGES + 3, 10 ** 20):
+            with self.subTest(number=number):
+                response = self.guest.get(INDEX_URL, {'page': number})
+                self.assertEqual(response.status_code, 200)
+                page = response.context['page_obj']
+                self.assertEqual(page.number, NUMBERED_PAGES + 2)
+                self.assertEqual(
+                    [post.pk for post in page],
+                    self.ordered_ids[POSTS_ON_PAGE * (NUMBERED_PAGES + 1):]
+                )
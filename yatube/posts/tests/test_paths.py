@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.template import engines
+from django.test import TestCase, override_settings
+from django.urls import reverse, set_script_prefix
+
+from core import paths
+from core.warmup import warm_up_templates
+from posts.models import Group, Post, User
+
+CACHED_TEMPLATES = [{
+    **settings.TEMPLATES[0],
+    'OPTIONS': {
+        **settings.TEMPLATES[0]['OPTIONS'],
+        'loaders': [(
+            'django.template.loaders.cached.Loader',
+            settings.TEMPLATES[0]['OPTIONS']['loaders'],
+        )],
+    },
+}]
+
+
+class PathsTest(TestCase):
+
+    def test_build_matches_reverse(self):
+        """Тест: пути core.paths совпадают с reverse()."""
+        CASES = [
+            ('posts:post_detail', 42),
+            ('posts:profile', 'user.name+tag@-_'),
+            ('posts:profile', 'Пользователь'),
+            ('posts:group_list', 'some-group_1'),
+        ]
+        self.addCleanup(set_script_prefix, '/')
+        for prefix in ('/', '/yatube/'):
+            set_script_prefix(prefix)
+            for name, value in CASES:
+                with self.subTest(prefix=prefix, name=name, value=value):
+                    self.assertEqual(
+                        paths.build(name, value),
+                        reverse(name, args=[value])
+                    )
+
+    def test_model_urls(self):
+        """Тест адресов поста, его автора и группы."""
+        user = User.objects.create_user(username='AutoTestUser')
+        group = Group.objects.create(title='Группа', slug='test-slug')
+        post = Post.objects.create(author=user, group=group, text='Текст')
+        CASES = [
+            (post.get_absolute_url(), reverse(
+                'posts:post_detail', args=[post.pk]
+            )),
+            (post.get_author_url(), reverse(
+                'posts:profile', args=[user.username]
+            )),
+            (group.get_absolute_url(), reverse(
+                'posts:group_list', args=[group.slug]
+            )),
+        ]
+        for url, expected in CASES:
+            with self.subTest(expected=expected):
+                self.assertEqual(url, expected)
+
+    @override_settings(TEMPLATES=CACHED_TEMPLATES)
+    def test_warm_up_templates(self):
+        """Тест прогрева кэширующего загрузчика шаблонов."""
+        self.assertGreater(warm_up_templates(), 0)
+        loader = engines['django'].engine.template_loaders[0]
+        for name in ('posts/index.html', 'includes/post_card.html'):
+            with self.subTest(name=name):
+                self.assertIn(name, loader.get_template_cache)
+
+    def test_no_warm_up_without_cache(self):
+        """Тест: без кэширующего загрузчика прогрев ничего не делает."""
+        self.assertEqual(warm_up_templates(), 0)
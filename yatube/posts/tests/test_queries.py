@@ -0,0 +1,99 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.counters import rebuild_counters
+from posts.models import Group, Post, User
+from posts.settings import POSTS_ON_PAGE
+
+SLUG = 'TestGroupSlug'
+NICK = 'AutoTestUser'
+INDEX_URL = reverse('posts:index')
+GROUP_URL = reverse('posts:group_list', args=[SLUG])
+PROFILE_URL = reverse('posts:profile', args=[NICK])
+
+
+class FeedQueriesTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=NICK)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=SLUG,
+            description='Тестовое описание',
+        )
+        for i in range(POSTS_ON_PAGE + 1):
+            Post.objects.create(
+                author=User.objects.create_user(username=f'{NICK}{i}'),
+                group=Group.objects.create(
+                    title=f'Группа {i}', slug=f'{SLUG}{i}', description='-'
+                ),
+                text=f'Текст. Автотест. Пост № {i}',
+            )
+        Post.objects.bulk_create(
+            Post(author=cls.user, group=cls.group, text=f'Пост № {i}')
+            for i in range(POSTS_ON_PAGE + 1)
+        )
+        rebuild_counters()
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+
+    def test_feed_query_count(self):
+        """
+        Тест фиксированного числа запросов к БД на страницу ленты,
+        не зависящего от числа авторов и групп на странице.
+        """
+        CASES = [
+            # id из ленты + посты + COUNT(*) для навигации
+            (INDEX_URL, 3),
+            # группа/автор + id из ленты + посты + счётчик постов
+            (GROUP_URL, 4),
+            (PROFILE_URL, 4),
+        ]
+        for url, queries in CASES:
+            with self.subTest(url=url):
+                with self.assertNumQueries(queries):
+                    self.guest.get(url)
+                with self.assertNumQueries(queries - 1):
+                    self.guest.get(url, {'page': 2})
+
+    def test_post_detail_query_count(self):
+        """
+        Тест числа запросов на странице поста: валидатор условного GET,
+        пост и счётчик автора.
+        """
+        post = self.user.posts.first()
+        url = reverse('posts:post_detail', args=[post.pk])
+        with self.assertNumQueries(3):
+            self.guest.get(url)
+        with self.assertNumQueries(2):
+            etag = self.guest.get(url)['ETag']
+        with self.assertNumQueries(1):
+            self.guest.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_feed_plans_use_indexes(self):
+        """Тест выборки лент по индексам без отдельной сортировки."""
+        out = StringIO()
+        call_command('explain_feeds', repeat=1, stdout=out)
+        with_indexes, without_indexes = out.getvalue().split('Без индексов')
+        for feed in ('index', 'group_posts', 'profile', 'admin'):
+            with self.subTest(feed=feed):
+                self.assertIn(feed, with_indexes)
+        if connection.vendor == 'sqlite':
+            self.assertNotIn('TEMP B-TREE', with_indexes)
+            self.assertIn('TEMP B-TREE', without_indexes)
+
+    def test_explain_feeds_refuses_server_database(self):
+        """Тест: без --copy сравнение на сервере СУБД не запускается."""
+        with mock.patch.object(connection, 'vendor', 'postgresql'):
+            with self.assertRaises(CommandError):
+                call_command('explain_feeds', repeat=1, stdout=StringIO())
@@ -0,0 +1,78 @@
+from django.core.management import call_command
+from django.template.defaultfilters import linebreaks_filter, truncatechars
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Post, User
+from posts.settings import EXCERPT_LENGTH
+
+PROFILE_URL = reverse('posts:profile', args=['author'])
+
+SHORT = 'Первая строка\nвторая <b>строка</b> & «кавычки»'
+LONG = 'Длинный текст поста\n\n' * EXCERPT_LENGTH
+
+
+class RenderingTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+
+    def test_matches_filters(self):
+        """Тест: готовый HTML совпадает с фильтрами шаблонов."""
+        CASES = [(SHORT, False), (LONG, True)]
+        for text, truncated in CASES:
+            with self.subTest(truncated=truncated):
+                post = Post.objects.create(author=self.author, text=text)
+                post.refresh_from_db()
+                self.assertEqual(
+                    post.text_html, linebreaks_filter(text, autoescape=True)
+                )
+                self.assertEqual(
+                    post.excerpt_html,
+                    linebreaks_filter(
+                        truncatechars(text, EXCERPT_LENGTH), autoescape=True
+                    )
+                )
+                self.assertEqual(post.is_truncated, truncated)
+
+    def test_text_escaped(self):
+        """Тест: HTML из текста поста экранируется."""
+        post = Post.objects.create(author=self.author, text=SHORT)
+        self.assertNotIn('<b>', post.text_html)
+        self.assertIn('&lt;b&gt;', post.text_html)
+
+    def test_rendered_on_update_fields(self):
+        """Тест: save(update_fields=['text']) обновляет и готовый HTML."""
+        post = Post.objects.create(author=self.author, text=SHORT)
+        post.text = LONG
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertTrue(post.is_truncated)
+        self.assertIn('Длинный текст поста', post.text_html)
+
+    def test_rendered_on_bulk_create(self):
+        """Тест: bulk_create сохраняет готовый HTML."""
+        Post.objects.bulk_create(
+            Post(author=self.author, text=text) for text in (SHORT, LONG)
+        )
+        self.assertFalse(Post.objects.filter(text_html='').exists())
+        self.assertEqual(Post.objects.filter(is_truncated=True).count(), 1)
+
+    def test_profile_uses_excerpt(self):
+        """Тест: профиль выводит анонс и ссылку «читать продолжение»."""
+        post = Post.objects.create(author=self.author, text=LONG)
+        response = self.client.get(PROFILE_URL)
+        self.assertContains(response, post.excerpt_html)
+        self.assertContains(response, 'читать продолжение')
+
+    def test_render_posts_command(self):
+        """Тест: render_posts строит HTML постов без него."""
+        post = Post.objects.create(author=self.author, text=SHORT)
+        Post.objects.filter(pk=post.pk).update(text_html='', excerpt_html='')
+        call_command('render_posts', missing=True, batch_size=1, stdout=None)
+        post.refresh_from_db()
+        self.assertEqual(
+            post.text_html, linebreaks_filter(SHORT, autoescape=True)
+        )
+        self.assertEqual(post.excerpt_html, post.text_html)
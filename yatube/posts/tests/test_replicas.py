@@ -0,0 +1,98 @@
+import os
+import tempfile
+
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.routers import STICKY_COOKIE
+from posts.models import Post, User
+
+REPLICA = 'replica'
+NICK = 'AutoTestUser'
+INDEX_URL = reverse('posts:index')
+PROFILE_URL = reverse('posts:profile', args=[NICK])
+POST_CREATE_URL = reverse('posts:post_create')
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], DATABASE_REPLICA_LAG=5)
+class ReplicaRoutingTest(TransactionTestCase):
+    """Основная БД - тестовая, реплика - отдельный файл SQLite."""
+    databases = {'default', REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        descriptor, cls.replica_path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descriptor)
+        connections.databases[REPLICA] = {
+            **connections.databases['default'], 'NAME': cls.replica_path
+        }
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections.databases[REPLICA]
+        del connections._connections.replica
+        os.remove(cls.replica_path)
+
+    def replicate(self):
+        """Копирует основную БД в реплику, как это сделала бы репликация."""
+        for alias in ('default', REPLICA):
+            connections[alias].ensure_connection()
+        connections['default'].connection.backup(
+            connections[REPLICA].connection
+        )
+
+    def setUp(self):
+        self.user = User.objects.create_user(username=NICK)
+        self.author = Client()
+        self.author.force_login(self.user)
+        self.guest = Client()
+        self.replicate()
+
+    def test_reads_from_replica(self):
+        """Тест чтения лент с реплики: правка видна после репликации."""
+        Post.objects.create(author=self.user, text='Свежий пост')
+        for url in (INDEX_URL, PROFILE_URL):
+            with self.subTest(url=url):
+                self.assertNotContains(self.guest.get(url), 'Свежий пост')
+        self.replicate()
+        for url in (INDEX_URL, PROFILE_URL):
+            with self.subTest(url=url):
+                self.assertContains(self.guest.get(url), 'Свежий пост')
+
+    def test_replica_pages_without_validators(self):
+        """Тест: страницы с реплики отдаются без ETag и Last-Modified."""
+        post = Post.objects.create(author=self.user, text='Свежий пост')
+        self.replicate()
+        post_url = reverse('posts:post_detail', args=[post.pk])
+        for url in (INDEX_URL, PROFILE_URL, post_url):
+            with self.subTest(url=url):
+                response = self.guest.get(url)
+                self.assertContains(response, 'Свежий пост')
+                self.assertNotIn('ETag', response)
+                self.assertNotIn('Last-Modified', response)
+
+    def test_writer_reads_own_writes(self):
+        """Тест: после своей правки автор читает с основной БД."""
+        response = self.author.post(POST_CREATE_URL, {'text': 'Свежий пост'})
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertContains(self.author.get(PROFILE_URL), 'Свежий пост')
+        self.assertNotContains(self.guest.get(PROFILE_URL), 'Свежий пост')
+
+    def test_sticky_cookie_expires(self):
+        """Тест: по истечении допустимого отставания - снова реплика."""
+        self.author.post(POST_CREATE_URL, {'text': 'Свежий пост'})
+        self.author.cookies[STICKY_COOKIE] = '0'
+        self.assertNotContains(self.author.get(PROFILE_URL), 'Свежий пост')
+
+    def test_other_views_read_primary(self):
+        """Тест: страницы вне DATABASE_REPLICA_VIEWS читают основную БД."""
+        post = Post.objects.create(author=self.user, text='Свежий пост')
+        response = self.author.get(
+            reverse('posts:post_edit', args=[post.pk])
+        )
+        self.assertContains(response, 'Свежий пост')
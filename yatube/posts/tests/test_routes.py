@@ -9,6 +9,8 @@ CASES = [
     ('group_list', [GROUP], f'/group/{GROUP}/'),
     ('profile', [USER], f'/profile/{USER}/'),
     ('post_create', None, '/create/'),
+    ('search', None, '/search/'),
+    ('export', None, '/export/'),
     ('post_edit', [POST_ID], f'/posts/{POST_ID}/edit/'),
     ('post_detail', [POST_ID], f'/posts/{POST_ID}/'),
 ]
@@ -0,0 +1,118 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from posts.search import search_posts
+
+NICK = 'AutoTestUser'
+SEARCH_URL = reverse('posts:search')
+ADMIN_POSTS_URL = reverse('admin:posts_post_changelist')
+
+
+class SearchTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_superuser(
+            username=NICK, email='test@example.com', password='password'
+        )
+        cls.best = Post.objects.create(
+            author=cls.user, text='Кошка, кошка и ещё раз кошка'
+        )
+        cls.other = Post.objects.create(
+            author=cls.user, text='Собака встретила кошку. Кошка убежала'
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Кошка номер {i}') for i in range(5)
+        )
+        Post.objects.create(author=cls.user, text='Про собак')
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+
+    def test_search_ranks_matches(self):
+        """Тест выдачи совпадений без учёта регистра, лучшие первыми."""
+        posts, _ = search_posts('КОШКА', limit=20)
+        self.assertEqual(len(posts), 7)
+        self.assertEqual(posts[0], self.best)
+        self.assertTrue(all(isinstance(post, Post) for post in posts))
+
+    def test_search_requires_all_terms(self):
+        """Тест поиска по нескольким словам и спецсимволам FTS."""
+        CASES = [
+            ('собака кошка', [self.other]),
+            ('"кошка" OR', []),
+            ('NEAR(', []),
+            ('', []),
+            ('собака\x00кошка', [self.other]),
+            ('\x00\x1f', []),
+        ]
+        for query, expected in CASES:
+            with self.subTest(query=query):
+                self.assertEqual(search_posts(query)[0], expected)
+
+    def test_search_page_with_control_characters(self):
+        """Тест страницы поиска по запросу с NUL и управляющими символами."""
+        response = self.guest.get(SEARCH_URL, {'q': 'собака\x00\x07'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['posts'], [self.other])
+
+    def test_index_follows_post_changes(self):
+        """Тест синхронизации индекса при правке и удалении поста."""
+        post = Post.objects.create(author=self.user, text='Жираф')
+        self.assertEqual(search_posts('жираф')[0], [post])
+        post.text = 'Слон'
+        post.save()
+        self.assertEqual(search_posts('жираф')[0], [])
+        self.assertEqual(search_posts('слон')[0], [post])
+        post.delete()
+        self.assertEqual(search_posts('слон')[0], [])
+
+    def test_search_cursor_pagination(self):
+        """
+        Тест обхода результатов поиска по курсорам: 25 совпадений на
+        трёх страницах, все найдены, без повторов.
+        """
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Ещё кошка № {i}') for i in range(18)
+        )
+        expected = set(Post.objects.exclude(
+            text='Про собак'
+        ).values_list('pk', flat=True))
+        self.assertEqual(len(expected), 25)
+        found, pages, cursor = [], 0, ''
+        while cursor is not None:
+            response = self.guest.get(
+                SEARCH_URL, {'q': 'кошка', 'cursor': cursor}
+            )
+            found.extend(post.pk for post in response.context['posts'])
+            cursor = response.context['next_cursor']
+            pages += 1
+            self.assertLessEqual(len(response.context['posts']), 10)
+        self.assertEqual(pages, 3)
+        self.assertEqual(len(found), len(set(found)))
+        self.assertEqual(set(found), expected)
+        self.assertEqual(
+            found, [post.pk for post in search_posts('кошка', limit=50)[0]]
+        )
+
+    @override_settings(POSTS_SEARCH_BACKEND='posts.search.SimpleBackend')
+    def test_simple_backend(self):
+        """Тест запасного бэкенда поиска без полнотекстового индекса."""
+        posts, _ = search_posts('встретила кошку')
+        self.assertEqual(posts, [self.other])
+        for query in ('', '  ', '\x00'):
+            with self.subTest(query=query):
+                self.assertEqual(search_posts(query)[0], [])
+
+    def test_admin_search_uses_index(self):
+        """Тест поиска в админке через индекс."""
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(ADMIN_POSTS_URL, {'q': 'собака'})
+        self.assertEqual(
+            set(response.context['cl'].result_list), {self.other}
+        )
@@ -0,0 +1,63 @@
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from core.auth import get_user, session_tag
+from core.cache import TieredCache
+from posts.models import User
+
+ABOUT_URL = reverse('about:tech')
+CREATE_URL = reverse('posts:post_create')
+
+
+class CachedSessionUserTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_user_cached_per_session(self):
+        """Тест: сессия и пользователь повторно читаются без БД."""
+        self.client.get(ABOUT_URL)
+        with self.assertNumQueries(0):
+            response = self.client.get(ABOUT_URL)
+        self.assertEqual(response.wsgi_request.user, self.user)
+
+    def test_password_change_logs_out_sessions(self):
+        """Тест: смена пароля завершает закэшированные сессии."""
+        self.client.get(CREATE_URL)
+        # Копия: объект из setUpTestData общий для тестов класса
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('новый-пароль')
+        user.save()
+        response = self.client.get(CREATE_URL)
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    def test_logout_in_other_process(self):
+        """
+        Тест: сброс тега сессии другим процессом действует сразу, хотя
+        пользователь остался в памяти этого процесса.
+        """
+        self.client.get(CREATE_URL)
+        User.objects.filter(pk=self.user.pk).update(
+            password=make_password('новый-пароль')
+        )
+        other = TieredCache('other', {'OPTIONS': {'SHARED': 'shared'}})
+        other.invalidate_tags(session_tag(self.user.pk))
+        response = self.client.get(CREATE_URL)
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    def test_guest_without_session(self):
+        """Тест: гость без cookie сессии не загружает её."""
+        request = RequestFactory().get(ABOUT_URL)
+        request.session = self.client.session.__class__()
+        with self.assertNumQueries(0):
+            self.assertIsInstance(get_user(request), AnonymousUser)
+        self.assertIsNone(request.session.session_key)
@@ -0,0 +1,214 @@
+import json
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts import export, shards
+from posts.counters import feed_count
+from posts.models import FeedEntry, Group, Post, User
+from posts.search import search_posts
+
+SHARDS = ['shard0', 'shard1']
+SLUG = 'TestGroupSlug'
+INDEX_URL = reverse('posts:index')
+GROUP_URL = reverse('posts:group_list', args=[SLUG])
+POST_CREATE_URL = reverse('posts:post_create')
+POSTS_PER_AUTHOR = 7
+
+
+@override_settings(POSTS_SHARDS=SHARDS, POSTS_PAGE_CACHE_TIMEOUT=0)
+class ShardingTest(TransactionTestCase):
+    """Основная БД и два шарда - отдельные тестовые БД SQLite."""
+    databases = {'default', *SHARDS}
+
+    @classmethod
+    def setUpClass(cls):
+        for alias in SHARDS:
+            connections.databases[alias] = {
+                **connections.databases['default'], 'TEST': {}
+            }
+            connections.ensure_defaults(alias)
+            connections.prepare_test_settings(alias)
+            connections[alias].creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        for alias in SHARDS:
+            connections[alias].creation.destroy_test_db(
+                connections[alias].settings_dict['NAME'], verbosity=0
+            )
+            del connections.databases[alias]
+            delattr(connections._connections, alias)
+
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(title='Группа', slug=SLUG)
+        self.authors = [
+            User.objects.create_user(username=f'author{number}')
+            for number in range(2)
+        ]
+        # Посты авторов вперемешку: ленты должны слить шарды по дате
+        self.posts = [
+            Post.objects.create(
+                author=author, group=self.group, text=f'Пост {number}'
+            )
+            for number in range(POSTS_PER_AUTHOR)
+            for author in self.authors
+        ]
+
+    def test_posts_live_in_author_shard(self):
+        """Тест записи постов и ленты в шард автора, шард - из id."""
+        self.assertNotEqual(
+            *[shards.shard_for_author(author.pk) for author in self.authors]
+        )
+        for post in self.posts:
+            shard = shards.shard_for_author(post.author_id)
+            with self.subTest(post=post.pk):
+                self.assertEqual(shards.database_for_post(post.pk), shard)
+                self.assertTrue(
+                    Post.objects.using(shard).filter(pk=post.pk).exists()
+                )
+                self.assertTrue(
+                    FeedEntry.objects.using(shard).filter(
+                        pk=post.pk
+                    ).exists()
+                )
+        self.assertFalse(Post.objects.using('default').exists())
+
+    def test_users_and_groups_mirrored(self):
+        """Тест копирования пользователей и групп во все шарды."""
+        self.authors[0].first_name = 'Пётр'
+        self.authors[0].save()
+        for shard in SHARDS:
+            with self.subTest(shard=shard):
+                self.assertEqual(
+                    User.objects.using(shard).get(
+                        pk=self.authors[0].pk
+                    ).first_name,
+                    'Пётр'
+                )
+                self.assertTrue(
+                    Group.objects.using(shard).filter(slug=SLUG).exists()
+                )
+        self.authors[1].delete()
+        for shard in SHARDS:
+            with self.subTest(shard=shard):
+                self.assertFalse(
+                    Post.objects.using(shard).filter(
+                        author_id=self.authors[1].pk
+                    ).exists()
+                )
+
+    def test_feeds_merge_shards(self):
+        """Тест слияния лент из шардов по дате публикации."""
+        expected = [post.pk for post in reversed(self.posts)]
+        for url in (INDEX_URL, GROUP_URL):
+            for page, ids in ((1, expected[:10]), (2, expected[10:])):
+                with self.subTest(url=url, page=page):
+                    response = self.client.get(url, {'page': page})
+                    self.assertEqual(
+                        [post.pk for post in response.context['page_obj']],
+                        ids
+                    )
+            with self.subTest(url=url, cursor=True):
+                first = self.client.get(url, {'cursor': ''})
+                response = self.client.get(url, {
+                    'cursor': first.context['page_obj'].next_cursor
+                })
+                self.assertEqual(
+                    [post.pk for post in response.context['page_obj']],
+                    expected[10:]
+                )
+
+    def test_single_shard_pages(self):
+        """Тест профиля, страницы поста и правки поста из шарда автора."""
+        author = self.authors[1]
+        client = Client()
+        client.force_login(author)
+        response = client.get(
+            reverse('posts:profile', args=[author.username])
+        )
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']],
+            [post.pk for post in reversed(self.posts)
+             if post.author == author]
+        )
+        self.assertEqual(response.context['posts_count'], POSTS_PER_AUTHOR)
+        post = self.posts[1]
+        self.assertContains(
+            client.get(reverse('posts:post_detail', args=[post.pk])),
+            post.text
+        )
+        client.post(
+            reverse('posts:post_edit', args=[post.pk]), {'text': 'Правка'}
+        )
+        self.assertEqual(
+            Post.objects.using(shards.shard_for_author(author.pk)).get(
+                pk=post.pk
+            ).text,
+            'Правка'
+        )
+
+    def test_create_and_count(self):
+        """Тест создания поста через форму и счётчиков по всем шардам."""
+        client = Client()
+        client.force_login(self.authors[0])
+        client.post(POST_CREATE_URL, {'text': 'Новый пост'})
+        self.assertEqual(shards.count_posts(), 2 * POSTS_PER_AUTHOR + 1)
+        self.assertEqual(feed_count(), 2 * POSTS_PER_AUTHOR + 1)
+        self.assertEqual(
+            feed_count(author=self.authors[0]), POSTS_PER_AUTHOR + 1
+        )
+        self.assertContains(self.client.get(INDEX_URL), 'Новый пост')
+
+    def test_import_into_author_shards(self):
+        """Тест импорта постов в шарды их авторов."""
+        stdin = StringIO('\n'.join(
+            json.dumps({
+                'text': f'Импорт {number}',
+                'author': author.username,
+                'group': SLUG,
+            })
+            for number in range(3)
+            for author in self.authors
+        ))
+        call_command('import_posts', stdin=stdin, stdout=StringIO())
+        for author in self.authors:
+            shard = shards.shard_for_author(author.pk)
+            with self.subTest(author=author.username):
+                imported = Post.objects.using(shard).filter(
+                    author=author, text__startswith='Импорт'
+                )
+                self.assertEqual(imported.count(), 3)
+                for pk in imported.values_list('pk', flat=True):
+                    self.assertEqual(shards.database_for_post(pk), shard)
+                self.assertEqual(
+                    feed_count(author=author), POSTS_PER_AUTHOR + 3
+                )
+        self.assertFalse(Post.objects.using('default').exists())
+        self.assertEqual(feed_count(group=self.group),
+                         2 * (POSTS_PER_AUTHOR + 3))
+
+    def test_search_and_export_read_all_shards(self):
+        """Тест поиска и выгрузки постов из всех шардов."""
+        expected = sorted(post.pk for post in self.posts)
+        found, cursor = [], ''
+        while cursor is not None:
+            posts, cursor = search_posts('Пост', cursor, limit=5)
+            found += [post.pk for post in posts]
+        self.assertEqual(sorted(found), expected)
+        self.assertEqual(len(found), len(set(found)))
+        self.assertEqual(
+            [json.loads(line)['id'] for line in b''.join(
+                export.stream()
+            ).decode().splitlines()],
+            expected
+        )
@@ -0,0 +1,139 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.tasks import run_pending
+from posts import static_site
+from posts.models import Group, Post, User
+from posts.settings import POSTS_ON_PAGE
+
+SLUG = 'test-slug'
+OTHER_SLUG = 'other-slug'
+
+
+class StaticSiteTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Группа', slug=SLUG)
+        cls.other_group = Group.objects.create(
+            title='Другая группа', slug=OTHER_SLUG
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Текст поста'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.root = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def read(self, name):
+        with open(os.path.join(self.root, name), encoding='utf-8') as file:
+            return file.read()
+
+    def build(self, **kwargs):
+        return static_site.build(self.root, processes=1, **kwargs)
+
+    def test_full_build(self):
+        """Тест: сборка записывает все публичные страницы."""
+        result = self.build()
+        CASES = [
+            'index.html',
+            f'group/{SLUG}/index.html',
+            f'group/{OTHER_SLUG}/index.html',
+            'profile/author/index.html',
+            f'posts/{self.post.pk}/index.html',
+            'about/author/index.html',
+            'about/tech/index.html',
+        ]
+        for name in CASES:
+            with self.subTest(name=name):
+                self.assertTrue(
+                    os.path.exists(os.path.join(self.root, name))
+                )
+        self.assertIn('Текст поста', self.read('index.html'))
+        self.assertEqual(result['rendered'], len(CASES))
+        self.assertEqual(
+            set(json.loads(self.read(static_site.MANIFEST))), set(CASES)
+        )
+
+    def test_pages_of_feed(self):
+        """Тест: каждая страница ленты пишется в свой файл."""
+        Post.objects.bulk_create(
+            Post(author=self.author, text=f'Пост {number}')
+            for number in range(POSTS_ON_PAGE)
+        )
+        self.build()
+        self.assertIn('Текст поста', self.read('page-2.html'))
+        self.assertFalse(
+            os.path.exists(os.path.join(self.root, 'page-3.html'))
+        )
+
+    def test_incremental_build(self):
+        """Тест: повторная сборка отрисовывает только затронутые правкой."""
+        self.build()
+        self.assertEqual(self.build()['rendered'], 0)
+        self.post.text = 'Новый текст'
+        self.post.save()
+        result = self.build()
+        # Общая лента, группа, профиль автора и страница поста
+        self.assertEqual(result['rendered'], 4)
+        self.assertIn(
+            'Новый текст', self.read(f'posts/{self.post.pk}/index.html')
+        )
+
+    def test_group_change_rebuilds_site(self):
+        """Тест: правка группы меняет все страницы с её постами."""
+        self.build()
+        self.group.title = 'Новое название'
+        self.group.save()
+        # Карточки постов группы сбрасывает очередь задач
+        run_pending()
+        result = self.build()
+        self.assertEqual(result['unchanged'], 2)
+        self.assertIn('Новое название', self.read('index.html'))
+
+    def test_removed_pages(self):
+        """Тест: файлы удаленного поста и группы удаляются."""
+        self.build()
+        post_id = self.post.pk
+        self.post.delete()
+        self.other_group.delete()
+        result = self.build()
+        self.assertEqual(result['removed'], 3)
+        CASES = [
+            f'posts/{post_id}/index.html',
+            f'group/{OTHER_SLUG}/index.html',
+            'profile/author/index.html',
+        ]
+        for name in CASES:
+            with self.subTest(name=name):
+                self.assertFalse(
+                    os.path.exists(os.path.join(self.root, name))
+                )
+
+    def test_unsafe_username(self):
+        """Тест: профиль вне каталога сборки не записывается."""
+        self.assertIsNone(static_site.file_name('/profile/../'))
+        self.assertEqual(
+            static_site.file_name('/profile/%D0%B0/', 2),
+            'profile/а/page-2.html'
+        )
+
+    def test_command(self):
+        """Тест: build_static_site с --full отрисовывает все страницы."""
+        with open(os.devnull, 'w') as devnull:
+            for full in (False, True):
+                call_command(
+                    'build_static_site', root=self.root, processes=1,
+                    full=full, stdout=devnull
+                )
+        self.assertIn('Текст поста', self.read('index.html'))
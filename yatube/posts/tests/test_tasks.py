@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import tasks
+from core.models import Task
+
+CALLS = []
+
+
+@tasks.task
+def remember(value, twice=False):
+    CALLS.append(value * 2 if twice else value)
+
+
+@tasks.task
+def explode():
+    raise ValueError('Сбой задачи')
+
+
+@override_settings(
+    TASKS_EAGER=False, TASKS_MAX_ATTEMPTS=3, TASKS_RETRY_DELAY=10,
+    TASKS_LOCK_TIMEOUT=60
+)
+class TaskQueueTest(TestCase):
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_delay_enqueues(self):
+        """Тест постановки задачи в очередь и её выполнения воркером."""
+        remember.delay(21, twice=True)
+        self.assertEqual(CALLS, [])
+        self.assertEqual(Task.objects.get().name, remember.task_name)
+        self.assertEqual(tasks.run_pending(), 1)
+        self.assertEqual(CALLS, [42])
+        self.assertFalse(Task.objects.exists())
+
+    def test_rollback_drops_task(self):
+        """Тест: задача из откаченной транзакции не выполняется."""
+        try:
+            with transaction.atomic():
+                remember.delay(1)
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertFalse(Task.objects.exists())
+
+    def test_countdown(self):
+        """Тест: отложенная задача не выполняется раньше срока."""
+        tasks.enqueue(remember.task_name, [1], countdown=60)
+        self.assertEqual(tasks.run_pending(), 0)
+        self.assertEqual(CALLS, [])
+
+    def test_retry_with_backoff(self):
+        """Тест повтора упавшей задачи с растущей задержкой."""
+        explode.delay()
+        delays = []
+        for attempt in range(1, 3):
+            start = timezone.now()
+            tasks.run_pending()
+            task = Task.objects.get()
+            self.assertEqual(task.status, Task.PENDING)
+            self.assertEqual(task.attempts, attempt)
+            self.assertIn('Сбой задачи', task.last_error)
+            delays.append((task.run_at - start).total_seconds())
+            Task.objects.update(run_at=start)
+        self.assertTrue(8 <= delays[0] <= 12.5)
+        self.assertTrue(16 <= delays[1] <= 24.5)
+        tasks.run_pending()
+        task = Task.objects.get()
+        self.assertEqual(task.status, Task.FAILED)
+        self.assertEqual(tasks.run_pending(), 0)
+
+    def test_stale_task_reclaimed(self):
+        """Тест повторной выдачи задачи, чей воркер перестал отвечать."""
+        remember.delay(1)
+        self.assertIsNotNone(tasks.claim())
+        self.assertIsNone(tasks.claim())
+        Task.objects.update(
+            locked_at=timezone.now() - timedelta(seconds=61)
+        )
+        task = tasks.claim()
+        self.assertEqual(task.attempts, 2)
+        tasks.execute(task)
+        self.assertEqual(CALLS, [1])
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager(self):
+        """Тест немедленного выполнения задачи при TASKS_EAGER."""
+        remember.delay(7)
+        self.assertEqual(CALLS, [7])
+        self.assertFalse(Task.objects.exists())
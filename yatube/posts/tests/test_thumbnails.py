@@ -0,0 +1,104 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import (
+    Client, RequestFactory, TransactionTestCase, override_settings
+)
+from django.urls import reverse
+
+from posts import thumbnails
+from core.models import Task
+from core.views import media
+from posts.models import Post, User
+
+NICK = 'AutoTestUser'
+INDEX_URL = reverse('posts:index')
+POST_CREATE_URL = reverse('posts:post_create')
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, TASKS_EAGER=True)
+class ThumbnailsTest(TransactionTestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username=NICK)
+        self.author = Client()
+        self.author.force_login(self.user)
+
+    def upload(self, name='small.gif'):
+        return SimpleUploadedFile(name, SMALL_GIF, content_type='image/gif')
+
+    def test_thumbnail_created_on_upload(self):
+        """Тест создания миниатюры при загрузке и её вывода в ленте."""
+        self.author.post(POST_CREATE_URL, {
+            'text': 'Пост с картинкой', 'image': self.upload()
+        })
+        post = Post.objects.get()
+        # Суффикс storage - если такой файл остался от другого теста
+        self.assertRegex(
+            post.image.name, r'^posts/small\.[0-9a-f]{12}(_\w+)?\.gif$'
+        )
+        thumbnail = thumbnails.cached_thumbnail(post.image, 'card')
+        self.assertIsNotNone(thumbnail)
+        self.assertEqual((thumbnail.width, thumbnail.height), (960, 339))
+        self.assertIn(
+            thumbnail.url, self.author.get(INDEX_URL).content.decode()
+        )
+
+    def test_feed_never_resizes(self):
+        """Тест: лента без готовой миниатюры выводит оригинал, не ресайзит."""
+        # bulk_create не вызывает сигналы: миниатюра не создается, как
+        # если бы воркеры ещё не успели до неё дойти
+        Post.objects.bulk_create([Post(
+            author=self.user, text='Пост с картинкой', image=self.upload()
+        )])
+        post = Post.objects.get()
+        self.assertIsNone(thumbnails.cached_thumbnail(post.image, 'card'))
+        content = self.author.get(INDEX_URL).content.decode()
+        self.assertIn(post.image.url, content)
+        self.assertIsNone(thumbnails.cached_thumbnail(post.image, 'card'))
+
+    def test_thumbnail_in_task_queue(self):
+        """Тест создания миниатюры воркером очереди задач."""
+        with self.settings(TASKS_EAGER=False):
+            post = Post.objects.create(
+                author=self.user, text='Пост с картинкой', image=self.upload()
+            )
+            self.assertIsNone(
+                thumbnails.cached_thumbnail(post.image, 'card')
+            )
+            self.assertEqual(Task.objects.count(), 1)
+            call_command('run_workers', once=True, threads=1)
+        self.assertFalse(Task.objects.exists())
+        self.assertIsNotNone(thumbnails.cached_thumbnail(post.image, 'card'))
+
+    def test_media_far_future_cache(self):
+        """Тест отдачи картинок с заголовками вечного кэширования."""
+        post = Post.objects.create(
+            author=self.user, text='Пост с картинкой', image=self.upload()
+        )
+        # Без DEBUG маршрута media нет: картинки отдает фронтенд-сервер
+        path = post.image.url[len(settings.MEDIA_URL):]
+        response = media(RequestFactory().get(post.image.url), path)
+        self.assertEqual(response.status_code, 200)
+        for directive in ('public', 'max-age=31536000', 'immutable'):
+            with self.subTest(directive=directive):
+                self.assertIn(directive, response['Cache-Control'])
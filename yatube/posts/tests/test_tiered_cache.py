@@ -0,0 +1,142 @@
+import threading
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from core.cache import TieredCache, model_tag, render_metrics
+from posts.models import Group
+
+KEY = 'test:key'
+
+
+class TieredCacheTest(SimpleTestCase):
+
+    def setUp(self):
+        self.cache = TieredCache('tests', {'OPTIONS': {
+            'SHARED': 'shared', 'LOCAL_TIMEOUT': 60, 'LOCK_TIMEOUT': 5,
+            'SHARED_ONLY': ('generation:',),
+        }})
+        self.cache.clear()
+        self.cache.reset_stats()
+        self.addCleanup(self.cache.clear)
+        self.shared = caches['shared']
+
+    def compute(self, value):
+        def compute():
+            self.computed += 1
+            return value
+        self.computed = 0
+        return compute
+
+    def test_tiers(self):
+        """Тест: значение читается из памяти, при ее промахе - из файлов."""
+        self.cache.set(KEY, 'значение')
+        self.shared.delete(KEY)
+        self.assertEqual(self.cache.get(KEY), 'значение')
+        self.cache.local.clear()
+        self.assertIsNone(self.cache.get(KEY))
+        self.shared.set(KEY, 'из файлов')
+        self.assertEqual(self.cache.get(KEY), 'из файлов')
+        stats = self.cache.stats()
+        self.assertEqual(
+            (stats['local_hit'], stats['shared_hit'], stats['miss']),
+            (1, 1, 1)
+        )
+
+    def test_computed_once(self):
+        """Тест: get_or_compute вычисляет значение один раз."""
+        compute = self.compute(42)
+        for _ in range(3):
+            self.assertEqual(self.cache.get_or_compute(KEY, compute), 42)
+        self.assertEqual(self.computed, 1)
+        self.assertEqual(self.cache.get(KEY), 42)
+
+    def test_tags(self):
+        """Тест: инвалидация тега сбрасывает его значения."""
+        tag = model_tag(Group, 1)
+        self.assertEqual(tag, 'posts.group:1')
+        self.cache.get_or_compute(KEY, self.compute(1), tags=[tag])
+        self.cache.get_or_compute('other', lambda: 2, tags=['other'])
+        self.cache.invalidate_tags(tag)
+        self.assertIsNone(self.cache.get(KEY))
+        self.assertEqual(self.cache.get('other'), 2)
+        self.cache.get_or_compute(KEY, self.compute(1), tags=[tag])
+        self.assertEqual(self.computed, 1)
+
+    def test_other_process_invalidation(self):
+        """
+        Тест: инвалидация тега и запись ключа SHARED_ONLY другим
+        процессом (только в хранилище) видны сразу, без LOCAL_TIMEOUT.
+        """
+        tag = model_tag(Group, 1)
+        self.cache.get_or_compute(KEY, self.compute(1), tags=[tag])
+        self.cache.set('generation:index', 1)
+        other = TieredCache('other', {'OPTIONS': {'SHARED': 'shared'}})
+        other.invalidate_tags(tag)
+        self.shared.set('generation:index', 2)
+        self.assertIsNone(self.cache.get(KEY))
+        self.assertEqual(self.cache.get('generation:index'), 2)
+
+    def test_stale_while_revalidate(self):
+        """Тест: пока другой процесс вычисляет, отдается прежнее значение."""
+        self.cache.get_or_compute(KEY, lambda: 'старое', timeout=0, stale=60)
+        self.assertIsNone(self.cache.get(KEY))
+        self.shared.add(f'{KEY}:lock', 1)
+        compute = self.compute('новое')
+        self.assertEqual(
+            self.cache.get_or_compute(KEY, compute, timeout=0, stale=60),
+            'старое'
+        )
+        self.assertEqual(self.computed, 0)
+        self.shared.delete(f'{KEY}:lock')
+        self.assertEqual(
+            self.cache.get_or_compute(KEY, compute, stale=60), 'новое'
+        )
+        self.assertEqual(self.cache.stats()['stale'], 1)
+
+    def test_single_flight(self):
+        """Тест: без значения ждется результат вычисляющего процесса."""
+        self.shared.add(f'{KEY}:lock', 1)
+        other = TieredCache('other', {'OPTIONS': {'SHARED': 'shared'}})
+
+        def finish():
+            # Вычисляющий «процесс» сохраняет значение и снимает блокировку
+            self.shared.delete(f'{KEY}:lock')
+            other.get_or_compute(KEY, lambda: 'чужое')
+
+        timer = threading.Timer(0.1, finish)
+        timer.start()
+        self.addCleanup(timer.join)
+        compute = self.compute('свое')
+        self.assertEqual(self.cache.get_or_compute(KEY, compute), 'чужое')
+        self.assertEqual(self.computed, 0)
+        self.assertEqual(self.cache.stats()['wait'], 1)
+
+    def test_incr_in_shared_tier(self):
+        """Тест: incr меняет значение в хранилище и сбрасывает копию."""
+        self.cache.set(KEY, 10)
+        self.assertEqual(self.cache.incr(KEY, 5), 15)
+        self.assertEqual(self.shared.get(KEY), 15)
+        self.assertEqual(self.cache.get(KEY), 15)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_incr_computed_value(self):
+        """Тест: incr значения get_or_compute сохраняет его теги."""
+        tag = model_tag(Group, 1)
+        self.cache.get_or_compute(KEY, self.compute(10), tags=[tag])
+        self.assertEqual(self.cache.incr(KEY, 5), 15)
+        self.assertEqual(
+            self.cache.get_or_compute(KEY, self.compute(0), tags=[tag]), 15
+        )
+        self.cache.invalidate_tags(tag)
+        with self.assertRaises(ValueError):
+            self.cache.incr(KEY)
+
+    def test_render_metrics(self):
+        """Тест: статистика кэша по умолчанию выводится для Prometheus."""
+        caches['default'].get(KEY)
+        self.assertIn(
+            'yatube_cache_events_total{cache="default",event="miss"}',
+            render_metrics()
+        )
@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.urls import reverse
 
@@ -49,6 +50,7 @@ class ContextViewsTest(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.guest = Client()
         self.author = Client()
         self.author.force_login(self.user)
@@ -0,0 +1,68 @@
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+
+from . import page_cache, shards
+from .fragments import forget_cards
+from .models import Post
+from .settings import THUMBNAIL_SIZES
+
+
+class CachedThumbnailBackend(ThumbnailBackend):
+    """Бэкенд sorl-thumbnail, умеющий искать миниатюру без её создания."""
+
+    def prepare_options(self, source, options):
+        # Те же умолчания, что в ThumbnailBackend.get_thumbnail: от них
+        # зависит имя файла миниатюры
+        if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(thumbnail_settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        return options
+
+    def get_cached_thumbnail(self, file_, geometry_string, **options):
+        """Готовая миниатюра из хранилища ключ-значение либо None."""
+        source = ImageFile(file_)
+        name = self._get_thumbnail_filename(
+            source, geometry_string, self.prepare_options(source, options)
+        )
+        return default.kvstore.get(ImageFile(name, default.storage))
+
+
+backend = CachedThumbnailBackend()
+
+
+def cached_thumbnail(image, size):
+    """Миниатюра размера size из THUMBNAIL_SIZES, если она уже создана."""
+    if not image:
+        return None
+    geometry, options = THUMBNAIL_SIZES[size]
+    return backend.get_cached_thumbnail(image, geometry, **options)
+
+
+def generate(post_id):
+    """
+    Создает миниатюры картинки поста всех размеров THUMBNAIL_SIZES и
+    сбрасывает закэшированные карточки и страницы с этим постом.
+    """
+    post = Post.objects.using(
+        shards.database_for_post(post_id)
+    ).select_related('author', 'group').only(
+        'image', 'updated_at', 'author__username', 'group__slug'
+    ).filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    for geometry, options in THUMBNAIL_SIZES.values():
+        backend.get_thumbnail(post.image, geometry, **options)
+    # Карточки и страницы, отрисованные без миниатюры, устаревают
+    forget_cards([post])
+    scopes = [page_cache.INDEX, page_cache.author_scope(post.author.username)]
+    if post.group:
+        scopes.append(page_cache.group_scope(post.group.slug))
+    page_cache.bump(*scopes)
@@ -1,64 +1,151 @@
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
-from .forms import PostForm
+from core.db import retry_writes_on_lock
+
+from . import export, shards
+from .counters import feed_count
+from .feeds import feed
+from .forms import PostForm, PostImageForm
 from .models import Group, Post, User
+from .page_cache import (
+    INDEX, anonymous_page_cache, author_scope, feed_condition, group_scope,
+    post_condition
+)
+from .paginators import CountedPaginator, CursorPaginator
+from .search import search_posts
 from .settings import POSTS_ON_PAGE
 
 
-def paginate(request, posts, posts_per_page=POSTS_ON_PAGE):
-    return Paginator(posts, posts_per_page).get_page(request.GET.get('page'))
+def paginate(request, posts, count=None, posts_per_page=POSTS_ON_PAGE):
+    """
+    Страница ленты: по курсору, если он передан, иначе по номеру.
+    count - функция без аргументов, возвращающая число постов в ленте;
+    вызывается только для постраничной навигации по номерам.
+    """
+    cursor = request.GET.get('cursor')
+    if cursor is not None:
+        return CursorPaginator(posts, posts_per_page).get_page(cursor)
+    return CountedPaginator(posts, posts_per_page, count=count).get_page(
+        request.GET.get('page')
+    )
 
 
+@feed_condition(lambda: INDEX)
+@anonymous_page_cache(lambda: INDEX)
 def index(request):
     return render(request, 'posts/index.html', {
-        'page_obj': paginate(request, Post.objects.all())
+        'page_obj': paginate(request, feed(), feed_count)
     })
 
 
+@feed_condition(group_scope)
+@anonymous_page_cache(group_scope)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
     return render(request, 'posts/group_list.html', {
         'group': group,
-        'page_obj': paginate(request, group.posts.all())
+        'page_obj': paginate(
+            request,
+            feed(group=group),
+            lambda: feed_count(group=group)
+        )
     })
 
 
+@feed_condition(author_scope)
+@anonymous_page_cache(author_scope)
 def profile(request, username):
     author = get_object_or_404(User, username=username)
     return render(request, 'posts/profile.html', {
         'author': author,
-        'page_obj': paginate(request, author.posts.all())
+        'posts_count': feed_count(author=author),
+        'page_obj': paginate(
+            request,
+            feed(author=author),
+            lambda: feed_count(author=author)
+        )
     })
 
 
+@post_condition
 def post_detail(request, post_id):
+    post = get_object_or_404(
+        Post.objects.using(shards.database_for_post(post_id)).select_related(
+            'author', 'group'
+        ),
+        id=post_id
+    )
     return render(request, 'posts/post_detail.html', {
-        'post': get_object_or_404(Post, id=post_id)
+        'post': post,
+        'posts_count': feed_count(author=post.author),
+    })
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    posts, next_cursor = search_posts(
+        query, request.GET.get('cursor'), POSTS_ON_PAGE
+    )
+    return render(request, 'posts/search.html', {
+        'query': query,
+        'posts': posts,
+        'next_cursor': next_cursor,
     })
 
 
 @login_required
+@retry_writes_on_lock
 def post_create(request):
-    form = PostForm(request.POST or None)
-    if not form.is_valid():
-        return render(request, 'posts/create_post.html', {'form': form})
-    post = form.save(commit=False)
-    post.author = request.user
-    post.save()
+    post = Post(author=request.user)
+    form = PostForm(request.POST or None, instance=post)
+    image_form = PostImageForm(
+        request.POST or None, files=request.FILES or None, instance=post
+    )
+    # Обе формы заполняют один и тот же пост; проверяются обе, чтобы
+    # показать все ошибки сразу
+    if not all([form.is_valid(), image_form.is_valid()]):
+        return render(request, 'posts/create_post.html', {
+            'form': form, 'image_form': image_form
+        })
+    form.save()
     return redirect('posts:profile', request.user.username)
 
 
 @login_required
+@retry_writes_on_lock
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(
+        Post.objects.using(shards.database_for_post(post_id)), id=post_id
+    )
     if request.user != post.author:
         return redirect('posts:post_detail', post_id)
     form = PostForm(request.POST or None, instance=post)
-    if not form.is_valid():
+    image_form = PostImageForm(
+        request.POST or None, files=request.FILES or None, instance=post
+    )
+    if not all([form.is_valid(), image_form.is_valid()]):
         return render(request, 'posts/create_post.html', {
-            'form': form, 'post': post
+            'form': form, 'image_form': image_form, 'post': post
         })
     form.save()
     return redirect('posts:post_detail', post_id)
+
+
+@staff_member_required
+def export_posts(request):
+    """Потоковая выгрузка постов: ?format=jsonl|csv, ?gzip=1 - сжатие."""
+    fmt = request.GET.get('format', 'jsonl')
+    if fmt not in export.FORMATS:
+        return HttpResponseBadRequest('Неизвестный формат выгрузки')
+    compress = bool(request.GET.get('gzip'))
+    response = StreamingHttpResponse(
+        export.stream(fmt, compress),
+        content_type='application/gzip' if compress else export.FORMATS[fmt]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{export.filename(fmt, compress)}"'
+    )
+    return response
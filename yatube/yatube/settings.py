@@ -36,26 +36,38 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
+    # Первым: замеры охватывают все остальные middleware
+    'core.metrics.MetricsMiddleware',
+    'core.routers.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.auth.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+template_loaders = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Вне отладки шаблоны компилируются один раз на процесс:
+            # yatube.wsgi и yatube.asgi заполняют этот кэш при старте
+            'loaders': template_loaders if DEBUG else [
+                ('django.template.loaders.cached.Loader', template_loaders),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -78,9 +90,75 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Соединение живёт между запросами потока, секунды
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            # Сколько секунд ждать снятия блокировки записи
+            'timeout': 20,
+        },
     }
 }
 
+# Прагмы каждого нового соединения с SQLite: WAL - чтение не ждёт записи,
+# synchronous=NORMAL в WAL не теряет целостность при сбое, отображение
+# файла в память 256 МБ и страничный кэш 64 МБ (отрицательное - в КБ)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+}
+# Повторы транзакций core.db.retry_on_lock при «database is locked» и
+# начальная пауза перед повтором, секунды (удваивается)
+DATABASE_LOCK_RETRIES = 5
+DATABASE_LOCK_RETRY_DELAY = 0.05
+
+# Реплики основной БД только для чтения: файлы SQLite через запятую в
+# переменной окружения YATUBE_DB_REPLICAS (их наполняет репликация
+# вне Django). Без реплик всё читается из default
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+    filter(None, os.environ.get('YATUBE_DB_REPLICAS', '').split(',')), 1
+):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': name,
+        # В тестах реплика - та же тестовая БД
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+# Шардирование постов по автору: файлы SQLite через запятую в
+# YATUBE_DB_SHARDS (алиасы shard0, shard1...). Посты и записи лент
+# автора живут в его шарде, пользователи и группы копируются во все.
+# Номер шарда входит в id поста: порядок файлов менять нельзя. Схема
+# создается manage.py migrate --database=shardN, копии - sync_shards
+POSTS_SHARDS = []
+for number, name in enumerate(
+    filter(None, os.environ.get('YATUBE_DB_SHARDS', '').split(','))
+):
+    alias = f'shard{number}'
+    DATABASES[alias] = {**DATABASES['default'], 'NAME': name}
+    POSTS_SHARDS.append(alias)
+
+DATABASE_ROUTERS = [
+    'posts.shards.ShardRouter',
+    'core.routers.ReplicaRouter',
+]
+# Страницы, которые читают с реплик
+DATABASE_REPLICA_VIEWS = (
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'about:author',
+    'about:tech',
+)
+# Допустимое отставание реплик, секунды: столько после своей правки
+# пользователь читает с основной БД
+DATABASE_REPLICA_LAG = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -120,6 +198,100 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Кэш по умолчанию - двухуровневый (core.cache.TieredCache): LRU в
+# памяти процесса перед общим для процессов хранилищем shared. Копия в
+# памяти живет LOCAL_TIMEOUT секунд - на столько процесс может не видеть
+# правок кэша другими процессами. Вместо файлов хранилищем может быть
+# таблица SQLite: django.core.cache.backends.db.DatabaseCache
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.TieredCache',
+        'LOCATION': 'default',
+        'TIMEOUT': 60 * 5,
+        'OPTIONS': {
+            'SHARED': 'shared',
+            'LOCAL_MAX_ENTRIES': 1000,
+            'LOCAL_TIMEOUT': 5,
+            'LOCK_TIMEOUT': 10,
+            # Поколения страниц posts.page_cache: правка поста должна
+            # сразу сбрасывать закэшированные страницы во всех процессах
+            'SHARED_ONLY': ('posts:generation:',),
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        'TIMEOUT': 60 * 5,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+# manage.py test подменяет каталог кэша shared временным
+TEST_RUNNER = 'core.runner.TestRunner'
+
+# Сессии читаются из кэша shared и только при его промахе - из БД.
+# Хранилище без копий в памяти процессов: выход из аккаунта сразу виден
+# всем процессам. Сессии в подписанных cookie (signed_cookies) обошлись
+# бы без хранилища, но их нельзя отозвать на сервере. Гость без cookie
+# сессии её не загружает
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'shared'
+# Сколько секунд пользователь сессии хранится в кэше (core.auth); смена
+# пароля в другом процессе доходит до сессий за LOCAL_TIMEOUT кэша
+AUTH_USER_CACHE_TIMEOUT = 60 * 5
+
+# Время жизни кэша страниц лент для анонимных пользователей, секунды;
+# 0 выключает кэш (в отладке он мешал бы видеть правки шаблонов)
+POSTS_PAGE_CACHE_TIMEOUT = 0 if DEBUG else 60 * 10
+
+# Бэкенд поиска постов (путь к классу из posts.search); None - выбор
+# по СУБД: FTS5 для SQLite, tsvector для PostgreSQL
+POSTS_SEARCH_BACKEND = None
+# Конфигурация текстового поиска PostgreSQL
+POSTS_SEARCH_CONFIG = 'russian'
+
+# Потоков для запросов в yatube.asgi: у каждого своё соединение с БД,
+# столько медленных запросов могут выполняться одновременно
+ASGI_THREADS = 40
+
+# Статическая копия публичных страниц для анонимных пользователей
+# (posts.static_site), её собирает manage.py build_static_site в
+# STATIC_SITE_PROCESSES процессах (None - по числу процессоров).
+# Страницы отрисовываются запросами к хосту STATIC_SITE_HOST: он должен
+# быть в ALLOWED_HOSTS
+STATIC_SITE_ROOT = os.path.join(BASE_DIR, 'static_site')
+STATIC_SITE_PROCESSES = None
+STATIC_SITE_HOST = 'localhost'
+
+# Очередь отложенных задач (core.tasks) в таблице БД, их выполняет
+# manage.py run_workers. TASKS_EAGER выполняет задачи сразу при
+# постановке; повтор упавшей задачи - через TASKS_RETRY_DELAY секунд,
+# удваиваемых с каждой попыткой; задача, чей воркер не отвечает дольше
+# TASKS_LOCK_TIMEOUT секунд, выдается заново. В очереди - миниатюры
+# картинок и сброс карточек постов после переименования или удаления
+# группы и смены имени автора. Счётчики, записи ленты и поколения
+# страниц меняются в запросе: по ним автор сразу видит свою правку.
+# Шардированная лента сливается при чтении и записи в очередь не требует
+TASKS_EAGER = False
+TASKS_WORKERS = 2
+TASKS_POLL_INTERVAL = 1
+TASKS_MAX_ATTEMPTS = 5
+TASKS_RETRY_DELAY = 10
+TASKS_LOCK_TIMEOUT = 60 * 10
+
+# Замеры времени запросов и обращений к БД (core.metrics): False
+# исключает middleware; доля замеряемых запросов от 0 до 1
+METRICS_ENABLED = True
+METRICS_SAMPLE_RATE = 1 if DEBUG else 0.1
+# Заголовок Server-Timing с замерами: True - всем посетителям, False -
+# только персоналу (время запросов к БД выдает устройство сайта)
+METRICS_SERVER_TIMING = DEBUG
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
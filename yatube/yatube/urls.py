@@ -1,5 +1,8 @@
+from django.conf import settings
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from core.views import media, metrics
 
 urlpatterns = [
     path('about/', include('about.urls', namespace='about')),
@@ -9,6 +12,18 @@ urlpatterns = [
     path('auth/', include('users.urls', namespace='users')),
     # urls модуля для управления пользователями
     path('auth/', include('django.contrib.auth.urls')),
+    # Метрики для Prometheus, только для персонала
+    path('metrics', metrics, name='metrics'),
     # Главная страница
     path('', include('posts.urls', namespace='posts')),
 ]
+
+if settings.DEBUG:
+    # Загруженные картинки и их миниатюры; в продакшене их отдает
+    # фронтенд-сервер
+    urlpatterns += [
+        re_path(
+            rf'^{settings.MEDIA_URL.lstrip("/")}(?P<path>.*)$', media,
+            name='media'
+        ),
+    ]